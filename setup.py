@@ -335,7 +335,8 @@ def user_home():
         ],
         entry_points={
             'console_scripts': [
-                'xlines=xlines.cli:init_cli'
+                'xlines=xlines.cli:init_cli',
+                'xlinesd=xlines.daemon:init_daemon'
             ]
         },
         zip_safe=False
@@ -390,7 +391,8 @@ def user_home():
         ],
         entry_points={
             'console_scripts': [
-                'xlines=xlines.cli:init_cli'
+                'xlines=xlines.cli:init_cli',
+                'xlinesd=xlines.daemon:init_daemon'
             ]
         },
         zip_safe=False
@@ -0,0 +1,11 @@
+"""
+Summary.
+
+    pytest configuration and shared fixtures
+
+"""
+import os
+import sys
+
+# import the package from the working tree
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+"""
+Summary.
+
+    Tests of the asyncio API (acount_tree)
+
+"""
+import os
+import asyncio
+import concurrent.futures
+import pytest
+import xlines.aio
+from xlines.aio import acount_tree
+from xlines.api import CountSummary
+
+
+def write(path, lines):
+    with open(path, 'w') as f1:
+        f1.write('x\n' * lines)
+
+
+async def collect(roots, **kwargs):
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        return [x async for x in acount_tree(roots, executor=executor, **kwargs)]
+
+
+def test_acount_tree_counts(tmp_path):
+    for i in range(5):
+        write(str(tmp_path / 'f{}.txt'.format(i)), i + 1)
+    summary = CountSummary()
+
+    records = asyncio.run(collect(str(tmp_path), exclusions=[], summary=summary))
+    assert sorted(x['count'] for x in records) == [1, 2, 3, 4, 5]
+    assert (summary.total, summary.objects, summary.complete) == (15, 5, True)
+
+
+def test_acount_tree_raises_when_walk_fails(tmp_path, monkeypatch):
+    write(str(tmp_path / 'a.txt'), 1)
+
+    def failing_walk(*args, **kwargs):
+        yield os.path.join(str(tmp_path), 'a.txt')
+        raise FileNotFoundError('directories.list')
+
+    monkeypatch.setattr(xlines.aio, 'iter_fileobjects', failing_walk)
+
+    async def run():
+        return await asyncio.wait_for(collect(str(tmp_path), exclusions=[]), timeout=10)
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run())
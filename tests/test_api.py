@@ -0,0 +1,49 @@
+"""
+Summary.
+
+    Tests of the library API (count_tree, CountTree, iter_counts)
+
+"""
+import os
+import pytest
+import xlines
+from xlines.statics import local_config
+
+
+def write(path, lines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f1:
+        f1.write(''.join('line {}\n'.format(i) for i in range(lines)))
+
+
+@pytest.fixture
+def no_user_config(monkeypatch, tmp_path):
+    """No ~/.config/xlines; the command line setup has not run"""
+    monkeypatch.setitem(local_config['EXCLUSIONS'], 'EX_DIR_PATH', str(tmp_path / 'missing' / 'directories.list'))
+    monkeypatch.setitem(local_config['EXCLUSIONS'], 'EX_EXT_PATH', str(tmp_path / 'missing' / 'exclusions.list'))
+
+
+def test_count_tree_without_user_config(no_user_config, tmp_path):
+    write(str(tmp_path / 'src' / 'a.py'), 3)
+    write(str(tmp_path / 'src' / 'pkg' / 'b.py'), 4)
+
+    summary = xlines.count_tree(str(tmp_path / 'src')).run()
+    assert (summary.total, summary.objects, summary.complete) == (7, 2, True)
+
+
+def test_iter_counts_returns_summary(tmp_path):
+    write(str(tmp_path / 'a.txt'), 5)
+
+    def consume():
+        summary = yield from xlines.iter_counts(str(tmp_path))
+        return summary
+
+    gen = consume()
+    records = []
+    try:
+        while True:
+            records.append(next(gen))
+    except StopIteration as e:
+        summary = e.value
+    assert [x['count'] for x in records] == [5]
+    assert summary.total == 5
@@ -0,0 +1,140 @@
+"""
+Summary.
+
+    Tests of the content cache (--content-cache)
+
+"""
+import os
+import shutil
+import subprocess
+import tracemalloc
+import pytest
+from xlines import blobcache
+from xlines.blobcache import ContentCache, blob_sha, chunk_bounds, count_bytes, stream_chunks
+
+
+def git(top, *args):
+    subprocess.run(
+        ['git', '-C', top, '-c', 'user.email=test@example.com', '-c', 'user.name=test'] + list(args),
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+@pytest.fixture
+def work_tree(tmp_path):
+    if not shutil.which('git'):
+        pytest.skip('git not installed')
+    top = str(tmp_path / 'repo')
+    os.makedirs(top)
+    files = {
+        'plain.txt': 'a\nb\n',
+        'crlf.txt': 'x\ny\n',
+        'id.c': '$Id$\nint x;\n',
+        '.gitattributes': 'crlf.txt eol=crlf\n*.c ident\n'
+    }
+    for name, content in files.items():
+        with open(os.path.join(top, name), 'w') as f1:
+            f1.write(content)
+    git(top, 'init', '-q')
+    git(top, 'add', '.')
+    git(top, 'commit', '-q', '-m', 'initial')
+    for name in ('crlf.txt', 'id.c'):
+        os.remove(os.path.join(top, name))
+    git(top, 'checkout', '--', '.')
+    return top
+
+
+def test_index_sha_only_for_unconverted_files(work_tree, tmp_path):
+    cache = ContentCache(str(tmp_path / 'cache'))
+    plain = os.path.join(work_tree, 'plain.txt')
+
+    with open(plain, 'rb') as f1:
+        assert cache._index_sha(plain) == blob_sha(f1.read())
+    assert cache._index_sha(os.path.join(work_tree, 'crlf.txt')) is None
+    assert cache._index_sha(os.path.join(work_tree, 'id.c')) is None
+
+
+def test_converted_file_keyed_by_working_tree_bytes(work_tree, tmp_path):
+    cache = ContentCache(str(tmp_path / 'cache'))
+    path = os.path.join(work_tree, 'crlf.txt')
+    sha, entry, data = cache._lookup(path)
+
+    with open(path, 'rb') as f1:
+        data = f1.read()
+    assert b'\r\n' in data
+    assert sha == blob_sha(data)
+
+
+def test_chunk_bounds_cover_content_at_line_ends():
+    data = b''.join(b'line %d of some text\n' % i for i in range(200000))
+    bounds = list(chunk_bounds(data))
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+    assert all(data[end - 1:end] == b'\n' for _, end in bounds)
+
+
+def test_stream_chunks_match_chunk_bounds(monkeypatch):
+    data = b''.join(b'line %d of some text\n' % i for i in range(200000)) + b'no newline'
+    blocks = (data[i:i + 70001] for i in range(0, len(data), 70001))
+
+    assert list(stream_chunks(blocks)) == [data[a:b] for a, b in chunk_bounds(data)]
+
+
+@pytest.fixture
+def big_log(tmp_path):
+    path = str(tmp_path / 'big.log')
+    with open(path, 'wb') as f1:
+        for i in range(300):
+            f1.write(b''.join(b'%d event %d\n\n' % (i, j) for j in range(5000)))
+    return path
+
+
+def test_large_file_hashed_and_counted_in_blocks(big_log, tmp_path, monkeypatch):
+    size = os.path.getsize(big_log)
+    read = []
+    read_blocks = blobcache.read_blocks
+
+    def counted_blocks(f1, size):
+        for block in read_blocks(f1, size):
+            read.append(len(block))
+            yield block
+
+    monkeypatch.setattr(blobcache, 'read_blocks', counted_blocks)
+    cache = ContentCache(str(tmp_path / 'cache'))
+    tracemalloc.start()
+    try:
+        record = cache.count(big_log)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    with open(big_log, 'rb') as f1:
+        data = f1.read()
+    assert size > 4 * blobcache.CHUNK_FILE_MIN
+    assert sum(read) == size            # a miss reads the file once
+    assert peak < size / 4
+    assert cache.new[blob_sha(data)][:2] == count_bytes(data)
+    assert record['count'] == count_bytes(data)[0]
+
+
+def test_chunk_entries_keyed_apart_from_files(big_log, tmp_path):
+    cache = ContentCache(str(tmp_path / 'cache'))
+    cache.count(big_log)
+    cache.save()
+
+    with open(big_log, 'rb') as f1:
+        data = f1.read()
+    reloaded = ContentCache(cache.path)
+    chunks = [k for k in reloaded.entries if k != blob_sha(data)]
+    assert len(chunks) > 1 and all(k.startswith(blobcache.CHUNK_PREFIX) for k in chunks)
+
+    # a file whose content equals a chunk is not a hit on the chunk entry
+    small = str(tmp_path / 'chunk.txt')
+    with open(small, 'wb') as f1:
+        f1.write(next(stream_chunks(iter([data]))))
+    reloaded.count(small)
+    assert reloaded.misses == 1 and reloaded.hits == 0
+
+    reloaded.count(big_log)
+    assert reloaded.hits == 1
@@ -0,0 +1,90 @@
+"""
+Summary.
+
+    Tests of command line option validation
+
+"""
+import os
+import re
+import sys
+import time
+import pytest
+from xlines import cli, core, mp
+from xlines.cli import init_cli
+from xlines.oscodes_unix import exit_codes
+
+
+def run_cli(monkeypatch, *argv):
+    """Runs the xlines command line; returns its exit code"""
+    monkeypatch.setattr(sys, 'argv', ['xlines'] + list(argv))
+    with pytest.raises(SystemExit) as e:
+        init_cli()
+    return e.value.code
+
+
+@pytest.mark.parametrize('option', [
+    ['--top', '0'], ['--top=-3'], ['--max-depth=-1'], ['--dedupe-content', '--deadline', '5'],
+    ['--approx-above', '0'], ['--approx-above', '0.5']
+])
+def test_invalid_option_is_usage_error(monkeypatch, tmp_path, option):
+    assert run_cli(monkeypatch, '-s', str(tmp_path), '--no-daemon', *option) == exit_codes['E_BADARG']['Code']
+
+
+@pytest.mark.parametrize('option', [['--cache'], ['--content-cache', 'blobs']])
+def test_approx_above_rejected_with_caches(monkeypatch, tmp_path, option):
+    option = [str(tmp_path / x) if x == 'blobs' else x for x in option]
+    code = run_cli(monkeypatch, '-s', str(tmp_path), '--no-daemon', '--approx-above', '1K', *option)
+    assert code == exit_codes['E_BADARG']['Code']
+
+
+def test_total_with_estimated_counts_is_marked(monkeypatch, capsys, tmp_path):
+    (tmp_path / 'big.log').write_text('abcdefghij\n' * 2000)
+    (tmp_path / 'a.py').write_text('x = 1\n' * 5)
+    monkeypatch.setattr(os, 'get_terminal_size', lambda *args: os.terminal_size((120, 40)))
+
+    run_cli(monkeypatch, '-s', str(tmp_path), '--approx-above', '4K', '-T')
+    footer = re.sub(r'\x1b\[[0-9;]*m', '', capsys.readouterr().out)
+    assert re.search(r'Total \(2 objects\):\s+~2,005', footer)
+
+
+@pytest.mark.parametrize('option', [[], ['-m'], ['-T'], ['--sort', 'count'], ['--top', '5'], ['--max-depth', '1']])
+def test_stalled_file_reported_beneath_totals(monkeypatch, capsys, tmp_path, option):
+    (tmp_path / 'a.txt').write_text('x\n' * 3)
+    (tmp_path / 'slow.txt').write_text('y\n' * 4)
+    count_record = core.count_record
+
+    def stalling(path, *args):
+        if path.endswith('slow.txt'):
+            time.sleep(5)
+        return count_record(path, *args)
+
+    monkeypatch.setattr(os, 'get_terminal_size', lambda *args: os.terminal_size((120, 40)))
+    monkeypatch.setattr(core, 'IO_TIMEOUT', 0.2)
+    monkeypatch.setattr(core, 'WATCH_POLL', 0.05)
+    monkeypatch.setattr(core, 'count_record', stalling)
+    monkeypatch.setattr(mp, 'count_record', stalling)
+
+    run_cli(monkeypatch, '-s', str(tmp_path), '--no-daemon', *option)
+    out = re.sub(r'\x1b\[[0-9;]*m', '', capsys.readouterr().out)
+    assert re.search(r'Total \(1 objects\):\s+3', out)
+    assert 'SKIPPED (1 objects unreadable or stalled; not counted)' in out
+    assert 'slow.txt' in out.split('SKIPPED')[1]
+
+
+def test_estimate_does_not_contact_daemon(monkeypatch, tmp_path):
+    def connect(*args):
+        raise AssertionError('daemon contacted')
+
+    (tmp_path / 'a.py').write_text('x = 1\n' * 5)
+    monkeypatch.setattr(os, 'get_terminal_size', lambda *args: os.terminal_size((120, 40)))
+    monkeypatch.setattr(cli, 'connect', connect)
+    assert run_cli(monkeypatch, '-s', str(tmp_path), '--estimate', '0.5') == exit_codes['EX_OK']['Code']
+
+
+def test_output_not_opened_when_an_option_is_invalid(monkeypatch, tmp_path):
+    out = tmp_path / 'out.json'
+    out.write_text('previous results\n')
+    code = run_cli(monkeypatch, '-s', str(tmp_path), '--no-daemon', '--output', 'json:' + str(out), '--top', '0')
+
+    assert code == exit_codes['E_BADARG']['Code']
+    assert out.read_text() == 'previous results\n'
@@ -0,0 +1,111 @@
+"""
+Summary.
+
+    Tests of the counting and path helpers of the core module
+
+"""
+import io
+import os
+import sys
+import time
+import pytest
+from xlines import core
+from xlines.cli import open_listing
+
+
+@pytest.fixture
+def watchdog(monkeypatch):
+    monkeypatch.setattr(core, 'IO_TIMEOUT', 0.2)
+    monkeypatch.setattr(core, 'WATCH_POLL', 0.02)
+
+
+def test_watched_counts_fails_only_the_stalled_item(watchdog):
+    def func(item):
+        if item == 'b':
+            time.sleep(2)
+        return item.upper()
+
+    results = core.watched_counts(func, ['a', 'b', 'c'], size=lambda x: 0)
+    assert results == [('a', 'A'), ('b', None), ('c', 'C')]
+
+
+def test_watched_counts_item_finished_past_its_allowance_is_kept(watchdog, monkeypatch):
+    monkeypatch.setattr(core, 'WATCH_POLL', 1)
+
+    def func(item):
+        if item == 'a':
+            time.sleep(0.3)
+        return item.upper()
+
+    results = core.watched_counts(func, ['a', 'b'], size=lambda x: 0)
+    assert results == [('a', 'A'), ('b', 'B')]
+
+
+def test_runner_does_not_abandon_a_finished_item(watchdog):
+    runner = core._Runner(str.upper, ['a'], 0, lambda x: 0)
+    runner.current = (0, time.monotonic() - 10, 0.2)
+    runner.run()
+
+    assert runner.timed_out() is None
+    assert not runner.abandoned
+    assert runner.results == [('a', 'A')]
+
+
+def test_sample_of_empty_file_is_zero(tmp_path):
+    path = tmp_path / 'empty.log'
+    path.write_bytes(b'')
+    record = core.count_record(str(path), approx=0)
+    assert (record['count'], record['approx']) == (0, 0)
+
+
+def test_sample_of_truncated_file_is_zero(tmp_path):
+    path = tmp_path / 'gone.log'
+    path.write_bytes(b'')
+    with open(str(path), 'rb') as f1:
+        assert core.sample_lines(f1.fileno(), 10 * core.SAMPLE_BLOCK_SIZE) == (0, 0)
+
+
+@pytest.mark.parametrize('bufsize', [3, 65536])
+def test_read_paths_newline_delimited_with_crlf(bufsize):
+    listing = io.BytesIO(b'a.py\r\nsrc/b.py\n\nc d.py\r\nlast.py\r')
+    assert list(core.read_paths(listing, bufsize=bufsize)) == ['a.py', 'src/b.py', 'c d.py', 'last.py']
+
+
+@pytest.mark.parametrize('bufsize', [3, 65536])
+def test_read_paths_nul_delimited(bufsize):
+    listing = io.BytesIO(b'a.py\0new\nline.py\0cr\r.py\0\0raw\xff.py')
+    expected = ['a.py', 'new\nline.py', 'cr\r.py', 'raw\udcff.py']
+    assert list(core.read_paths(listing, nul=True, bufsize=bufsize)) == expected
+
+
+def test_read_paths_from_stdin(monkeypatch):
+    stdin = io.TextIOWrapper(io.BytesIO(b'x.py\0y.py\0'))
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    assert list(core.read_paths(open_listing('-'), nul=True)) == ['x.py', 'y.py']
+
+
+@pytest.fixture
+def roots(tmp_path):
+    for name in ('a/sub/f.py', 'b/g.py', 'h.py'):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x\n')
+    os.symlink(str(tmp_path / 'a'), str(tmp_path / 'a-link'))
+    return tmp_path
+
+
+def test_coalesce_roots_drops_duplicates(roots):
+    a, b = str(roots / 'a'), str(roots / 'b')
+    assert core.coalesce_roots([a, b, a + '/', str(roots / 'a-link')]) == [a, b]
+
+
+def test_coalesce_roots_folds_nested_roots(roots):
+    a, sub = str(roots / 'a'), str(roots / 'a' / 'sub')
+    assert core.coalesce_roots([sub, a, str(roots / 'a' / 'sub' / 'f.py')]) == [a]
+    assert core.coalesce_roots([str(roots), a, str(roots / 'h.py')]) == [str(roots)]
+
+
+def test_coalesce_roots_keeps_siblings_sharing_a_prefix(roots):
+    (roots / 'a2').mkdir()
+    a, a2 = str(roots / 'a'), str(roots / 'a2')
+    assert core.coalesce_roots([a2, a]) == [a2, a]
@@ -0,0 +1,30 @@
+"""
+Summary.
+
+    Tests of the xlinesd daemon
+
+"""
+import os
+import stat
+from xlines import daemon
+
+
+def test_socket_created_owner_only(tmp_path, monkeypatch):
+    path = str(tmp_path / 'xlinesd.sock')
+    modes = []
+
+    class Pool():
+        def terminate(self):
+            pass
+
+    monkeypatch.setattr(daemon, 'XlinesDaemon', lambda jobs: type('Daemon', (), {'pool': Pool()})())
+    monkeypatch.setattr(daemon.os, 'chmod', lambda *args: None)
+    monkeypatch.setattr(daemon._Server, 'serve_forever', lambda self: modes.append(os.stat(path).st_mode))
+    umask = os.umask(0o022)
+    try:
+        daemon.serve(path)
+        assert os.umask(0o022) == 0o022         # restored
+    finally:
+        os.umask(umask)
+
+    assert not stat.S_IMODE(modes[0]) & 0o077      # no access for group or others
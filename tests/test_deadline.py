@@ -0,0 +1,68 @@
+"""
+Summary.
+
+    Tests of time-budgeted scans (--deadline)
+
+"""
+import os
+import time
+import pytest
+from xlines.core import iter_fileobjects, iter_records
+from xlines.deadline import Deadline
+from xlines.mp import mp_records
+
+
+@pytest.fixture(scope='module')
+def mixed_tree(tmp_path_factory):
+    """
+        One large file of long lines walked first, then many small files
+        of short lines:  (root, total line count)
+    """
+    root = tmp_path_factory.mktemp('mixed')
+    total = 0
+    with open(str(root / 'big.log'), 'w') as f1:
+        lines = 200 * 1024 * 1024 // 200
+        f1.write(('x' * 199 + '\n') * lines)
+        total += lines
+    for i in range(6000):
+        d = root / 'src' / 'd{}'.format(i % 60)
+        os.makedirs(str(d), exist_ok=True)
+        lines = 5 + i % 30
+        with open(str(d / 'f{}.py'.format(i)), 'w') as f1:
+            f1.write('y = 1\n' * lines)
+        total += lines
+    return str(root), total
+
+
+@pytest.mark.parametrize('multiprocess', [False, True])
+def test_deadline_bounds_time_and_estimate(mixed_tree, multiprocess):
+    root, total = mixed_tree
+    seconds = 0.3
+    started = time.monotonic()
+    deadline = Deadline(seconds)
+    paths = deadline.paths(iter_fileobjects([root], [], []))
+    if multiprocess:
+        records = mp_records(paths, True, [], jobs=2, expires=deadline.expires)
+    else:
+        records = iter_records(paths, True, [], expires=deadline.expires)
+
+    counted = sum(1 for _ in deadline.records(records, drain=True))
+    elapsed = time.monotonic() - started
+    partial = deadline.partial()
+
+    assert elapsed < seconds + 0.25
+    assert counted > 1
+    if partial is not None:
+        estimate, fraction = partial
+        assert abs(estimate - total) / total < 0.1
+
+
+def test_deadline_complete_scan_is_not_partial(tmp_path):
+    for i in range(10):
+        with open(str(tmp_path / 'f{}.txt'.format(i)), 'w') as f1:
+            f1.write('a\n' * i)
+    deadline = Deadline(30)
+    records = iter_records(deadline.paths(iter_fileobjects([str(tmp_path)], [], [])), expires=deadline.expires)
+
+    assert sum(x['count'] for x in deadline.records(records, drain=True)) == 45
+    assert deadline.partial() is None
@@ -0,0 +1,121 @@
+"""
+Summary.
+
+    Tests of the directory cache (--cache)
+
+"""
+import io
+import os
+import pytest
+from xlines import dircache
+from xlines.core import count_record, iter_fileobjects, iter_records, linecount
+from xlines.dircache import DirectoryCache, count_text
+
+
+@pytest.mark.parametrize('content', ['a\n\n\nb\n', '\n\nx', 'x\r\n\r\n\ry\r', '', 'one line'])
+def test_count_text_matches_readlines_across_blocks(monkeypatch, content):
+    monkeypatch.setattr(dircache, 'TAIL_READ', 2)
+    lines = io.StringIO(content, newline=None).readlines()
+    expected = (len(lines), len([x for x in lines if x != '\n']))
+    assert count_text(io.TextIOWrapper(io.BytesIO(content.encode()))) == expected
+
+
+@pytest.mark.parametrize('whitespace', [True, False])
+def test_appended_tail_counted_once(tmp_path, whitespace):
+    root = tmp_path / 'logs'
+    root.mkdir()
+    log = root / 'app.log'
+    log.write_text('event = 1\n\n' * 120000)
+
+    def scan():
+        cache = DirectoryCache(
+            'test', lambda x: True, lambda x: count_record(x, whitespace), verify=True,
+            cache_dir=str(tmp_path / 'cache'), whitespace=whitespace
+        )
+        records = list(cache.records(str(root)))
+        cache.save()
+        return cache, records
+
+    scan()
+    with open(str(log), 'a') as f1:
+        f1.write('tail\n\n\nlast = 2\n')
+    cache, records = scan()
+
+    assert cache.appended == 1
+    assert [x['count'] for x in records] == [linecount(str(log), whitespace)]
+    assert records[0]['size'] == log.stat().st_size
+
+
+def totals_cache(tmp_path, counter=count_record):
+    return DirectoryCache('test', lambda x: True, counter, cache_dir=str(tmp_path / 'cache'))
+
+
+def plain_totals(root):
+    records = list(iter_records(iter_fileobjects([root], [], [])))
+    return sum(x['count'] for x in records), len(records)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    for name, lines in (('a/x.txt', 2), ('a/deep/y.txt', 3), ('b/z.txt', 4)):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('line\n' * lines)
+    return root
+
+
+def test_totals_of_unchanged_tree_reuse_subtree_aggregate(tree, tmp_path):
+    cache = totals_cache(tmp_path)
+    assert cache.totals(str(tree)) == plain_totals(str(tree)) == (9, 3)
+    cache.save()
+
+    def uncalled(path):
+        raise AssertionError('counted {}'.format(path))
+
+    cache = totals_cache(tmp_path, uncalled)
+    cache.entries[str(tree)]['count'] = 1000        # returned as stored when the subtree is reused
+    assert cache.totals(str(tree)) == (1000, 3)
+    assert cache.reused == 4
+
+
+def test_totals_follow_changed_subtree(tree, tmp_path):
+    cache = totals_cache(tmp_path)
+    cache.totals(str(tree))
+    cache.save()
+
+    (tree / 'a' / 'deep' / 'w.txt').write_text('line\n' * 5)
+    assert totals_cache(tmp_path).totals(str(tree)) == plain_totals(str(tree)) == (14, 4)
+
+
+def test_totals_not_reused_when_hard_link_reached_first(tree, tmp_path):
+    cache = totals_cache(tmp_path)
+    cache.totals(str(tree))
+    cache.save()
+
+    # a/ changes and is walked before the unchanged b/, reaching z.txt first
+    os.link(str(tree / 'b' / 'z.txt'), str(tree / 'a' / 'z-link.txt'))
+    assert totals_cache(tmp_path).totals(str(tree)) == plain_totals(str(tree)) == (9, 3)
+
+
+def test_missing_root_reported_as_failed(tree, tmp_path):
+    missing = str(tmp_path / 'missing')
+    cache = totals_cache(tmp_path)
+    assert list(cache.records(missing)) == []
+    assert cache.totals(missing) == (0, 0)
+    assert cache.io_fail == [missing, missing]
+    assert [x['count'] for x in cache.records(str(tree))] == [2, 3, 4]
+
+
+def test_scan_stopped_early_keeps_cache_entries(tree, tmp_path):
+    cache = totals_cache(tmp_path)
+    list(cache.records(str(tree)))
+    cache.save()
+
+    cache = totals_cache(tmp_path)
+    stream = cache.records(str(tree))
+    next(stream)
+    stream.close()
+    cache.save()
+
+    assert totals_cache(tmp_path).entries.keys() == cache.entries.keys() and len(cache.entries) == 4
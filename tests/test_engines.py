@@ -0,0 +1,152 @@
+"""
+Summary.
+
+    Engine equivalence:  every way of counting a tree reports the totals
+    of the plain walk, on a tree with hard links and symbolic links
+
+"""
+import os
+import pytest
+import xlines.core
+from xlines.checkpoint import ScanCheckpoint
+from xlines.core import count_record, illegal_directories, is_legal, iter_fileobjects, iter_records
+from xlines.dircache import DirectoryCache
+from xlines.shard import PartialResults, PartialResultSink, Shard
+
+
+def write(path, lines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f1:
+        f1.write(''.join('line {}\n'.format(i) for i in range(lines)))
+
+
+@pytest.fixture
+def linked_tree(tmp_path):
+    """
+        Tree where a walk which follows every name counts 9 objects; each
+        physical file object once is 5 objects, 18 lines
+    """
+    root = tmp_path / 'tree'
+    write(str(root / 'a.py'), 3)
+    write(str(root / 'sub' / 'b.txt'), 5)
+    write(str(root / 'sub' / 'deep' / 'c.md'), 2)
+    write(str(root / '.git' / 'config'), 7)
+    write(str(tmp_path / 'outside' / 'e.py'), 4)
+    write(str(tmp_path / 'outside' / 'f.py'), 4)
+    os.link(str(root / 'a.py'), str(root / 'sub' / 'hard.py'))
+    os.link(str(tmp_path / 'outside' / 'f.py'), str(root / 'sub' / 'deep' / 'f.py'))
+    os.symlink(str(root / 'sub' / 'b.txt'), str(root / 'b-link.txt'))
+    os.symlink(str(tmp_path / 'outside' / 'e.py'), str(root / 'e-link.py'))
+    os.symlink(str(tmp_path / 'outside' / 'e.py'), str(root / 'sub' / 'e-link2.py'))
+    os.symlink(str(root / 'sub'), str(root / 'sub-link'))
+    os.symlink(str(root / 'missing.py'), str(root / 'dangling.py'))
+    return str(root)
+
+
+def totals(records):
+    records = list(records)
+    return sum(x['count'] for x in records), len(records)
+
+
+def plain(root):
+    return totals(iter_records(iter_fileobjects([root], [], [])))
+
+
+def directory_cache(cache_dir, verify=False):
+    illegal_dirs = illegal_directories()
+    return DirectoryCache(
+        'test', lambda x: is_legal(x, [], illegal_dirs), count_record, verify, cache_dir=cache_dir
+    )
+
+
+def cached(root, cache_dir, verify=False):
+    cache = directory_cache(cache_dir, verify)
+    result = totals(cache.records(root))
+    cache.save()
+    return result
+
+
+def checkpointed(root, path, resume=False, stop=None):
+    """Totals of a checkpointed scan; stops after stop records when given"""
+    checkpoint = ScanCheckpoint(path, [root], 'test', [], resume=resume)
+    stream = checkpoint.records(lambda paths, failed: iter_records(paths, False, failed))
+    records = []
+    for record in stream:
+        if len(records) == stop:
+            stream.close()
+            break
+        records.append(record)
+    return totals(records)
+
+
+def test_plain_walk_counts_each_file_object_once(linked_tree):
+    assert plain(linked_tree) == (18, 5)
+
+
+@pytest.mark.parametrize('verify', [False, True])
+def test_directory_cache_matches_plain_walk(linked_tree, tmp_path, verify):
+    cache_dir = str(tmp_path / 'cache')
+    expected = plain(linked_tree)
+
+    assert cached(linked_tree, cache_dir, verify) == expected
+    assert cached(linked_tree, cache_dir, verify) == expected     # reused from the cache
+
+    cache = directory_cache(cache_dir, verify)
+    assert cache.totals(linked_tree) == expected
+
+
+def test_directory_cache_counts_link_left_when_original_removed(linked_tree, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    cached(linked_tree, cache_dir)
+
+    os.remove(os.path.join(linked_tree, 'a.py'))
+    assert cached(linked_tree, cache_dir) == plain(linked_tree) == (18, 5)
+
+
+def test_daemon_matches_plain_walk(linked_tree):
+    from xlines.daemon import XlinesDaemon
+
+    daemon = XlinesDaemon(jobs=1)
+    try:
+        for _ in range(2):
+            records = [x['record'] for x in daemon.count([linked_tree]) if 'record' in x]
+            assert totals(records) == plain(linked_tree)
+    finally:
+        daemon.pool.terminate()
+
+
+def test_checkpoint_matches_plain_walk(linked_tree, tmp_path):
+    assert checkpointed(linked_tree, str(tmp_path / 'scan.ckpt')) == plain(linked_tree)
+
+
+@pytest.mark.parametrize('stop', range(5))
+def test_resumed_checkpoint_matches_plain_walk(linked_tree, tmp_path, stop):
+    path = str(tmp_path / 'scan.ckpt')
+    checkpointed(linked_tree, path, stop=stop)
+    assert checkpointed(linked_tree, path, resume=True) == plain(linked_tree)
+
+
+@pytest.mark.parametrize('count', [1, 3])
+def test_merged_shards_match_plain_walk(linked_tree, tmp_path, count):
+    parts = []
+    for index in range(1, count + 1):
+        shard = Shard(index, count)
+        part = str(tmp_path / 'part-{}.xl'.format(index))
+        sink = PartialResultSink(part, shard, 'test', [linked_tree], True)
+        for record in iter_records(iter_fileobjects([linked_tree], [], [], select=shard.owns)):
+            sink.write(record)
+        sink.close()
+        parts.append(part)
+
+    assert totals(PartialResults(parts).records()) == plain(linked_tree)
+
+
+def test_shard_reads_only_file_objects_it_owns(linked_tree, monkeypatch):
+    shard = Shard(1, 3)
+    tested = []
+    binary_test = xlines.core.is_binary
+    monkeypatch.setattr(xlines.core, 'is_binary', lambda x: tested.append(x) or binary_test(x))
+
+    paths = list(iter_fileobjects([linked_tree], [], [], select=shard.owns))
+    assert set(paths) <= set(tested)
+    assert all(shard.owns(x) for x in tested)
@@ -0,0 +1,26 @@
+"""
+Summary.
+
+    Tests of the stratified sample estimate (--estimate)
+
+"""
+import os
+from xlines.core import iter_records
+from xlines.estimate import TreeEstimate
+
+
+def test_sampled_bytes_count_each_file_once(tmp_path):
+    for i in range(8):
+        with open(str(tmp_path / 'f{}.txt'.format(i)), 'w') as f1:
+            f1.write('x = 1\n' * (100 + i))
+    with open(str(tmp_path / 'blob.txt'), 'wb') as f1:
+        f1.write(b'\x00\xff' * 4096)
+
+    estimate = TreeEstimate(fraction=1.0, seed=1)
+    estimate.walk([str(tmp_path)], [])
+    total, _ = estimate.sample(iter_records)
+
+    text = sum(6 * (100 + i) for i in range(8))
+    assert estimate.size == text + 8192
+    assert estimate.sampled_bytes == text + 1024
+    assert total == sum(100 + i for i in range(8))
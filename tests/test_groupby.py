@@ -0,0 +1,89 @@
+"""
+Summary.
+
+    Tests of group-by summaries (--group-by) and per-root subtotals
+
+"""
+import os
+import re
+import time
+import pytest
+from xlines import groupby
+from xlines.core import iter_fileobjects, iter_records
+from xlines.groupby import GroupBy, RootSummary, print_groupby
+
+
+DAY = 86400
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Small tree:  (relative path, lines, age in days)"""
+    files = [
+        ('a.py', 3, 0), ('b.py', 5, 3), ('notes.md', 2, 40),
+        ('src/c.PY', 7, 400), ('src/d.js', 4, 0), ('src/Makefile', 6, 10)
+    ]
+    now = time.time()
+    for name, lines, age in files:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text('x\n' * lines)
+        os.utime(str(path), (now - age * DAY - 60, now - age * DAY - 60))
+    return str(tmp_path)
+
+
+def grouped(root, key):
+    g = GroupBy(key)
+    for record in iter_records(iter_fileobjects([root], [], [])):
+        g.write(record)
+    return g.results()
+
+
+def test_group_by_extension(tree):
+    assert grouped(tree, 'ext') == [
+        ('.py', 2, 8), ('.PY', 1, 7), ('(none)', 1, 6), ('.js', 1, 4), ('.md', 1, 2)
+    ]
+
+
+def test_group_by_language(tree):
+    assert grouped(tree, 'lang') == [('Python', 3, 15), ('Other', 1, 6), ('JavaScript', 1, 4), ('Markdown', 1, 2)]
+
+
+def test_group_by_directory(tree):
+    assert grouped(tree, 'dir') == [(os.path.join(tree, 'src'), 3, 17), (tree, 3, 10)]
+
+
+def test_group_by_owner(tree):
+    assert grouped(tree, 'owner') == [(groupby.owner_name(os.getuid()), 6, 27)]
+
+
+def test_group_by_mtime_bucket(tree):
+    assert grouped(tree, 'mtime-bucket') == [
+        ('< 1 day', 2, 7), ('> 1 year', 1, 7), ('< 1 month', 1, 6), ('< 1 week', 1, 5), ('< 1 year', 1, 2)
+    ]
+
+
+def test_unknown_key_rejected():
+    with pytest.raises(ValueError):
+        GroupBy('color')
+
+
+def test_root_summary_counts_nested_roots_once_in_total(tree):
+    roots = [tree, os.path.join(tree, 'src')]
+    summary = RootSummary(roots)
+    for record in iter_records(iter_fileobjects([tree], [], [])):
+        summary.write(record)
+
+    assert summary.results() == [(tree, 6, 27), (os.path.join(tree, 'src'), 3, 17)]
+    assert summary.totals() == (27, 6)
+
+
+def test_print_groupby_table_and_footer(tree, capsys):
+    g = GroupBy('lang')
+    for record in iter_records(iter_fileobjects([tree], [], [])):
+        g.write(record)
+    print_groupby([g], 60, 1000)
+
+    out = re.sub(r'\x1b\[[0-9;]*m', '', capsys.readouterr().out)
+    assert re.search(r'Python\s+3\s+15', out)
+    assert re.search(r'Total \(6 objects\):\s+27', out)
@@ -0,0 +1,30 @@
+"""
+Summary.
+
+    Tests of the Prometheus metrics exporter (--serve-metrics)
+
+"""
+import os
+from xlines.metrics import UNMATCHED_ROOT, MetricsExporter
+
+
+def record(path, count):
+    return {'path': path, 'count': count, 'size': count * 10, 'mtime': 0, 'uid': 0}
+
+
+def test_records_labelled_by_root_as_given(tmp_path):
+    root = tmp_path / 'tree'
+    root.mkdir()
+    os.symlink(str(root), str(tmp_path / 'link'))
+    outside = str(tmp_path / 'elsewhere' / 'c.py')
+
+    exporter = MetricsExporter([str(root)], [], refresh=60)
+    exporter.records = {
+        str(root / 'a.py'): record(str(root / 'a.py'), 2),
+        str(tmp_path / 'link' / 'b.py'): record(str(tmp_path / 'link' / 'b.py'), 3),
+        outside: record(outside, 4)
+    }
+    exporter.render()
+
+    assert 'xlines_lines{{root="{}"}} 5'.format(root) in exporter.text
+    assert 'xlines_lines{{root="{}"}} 4'.format(UNMATCHED_ROOT) in exporter.text
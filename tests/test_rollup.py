@@ -0,0 +1,56 @@
+"""
+Summary.
+
+    Tests of directory subtotals (--max-depth)
+
+"""
+import os
+import re
+import pytest
+from xlines.core import iter_fileobjects, iter_records
+from xlines.rollup import DirectoryRollup, print_rollup
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name, lines in (('top.py', 1), ('a/x.py', 2), ('a/b/y.py', 3), ('a/b/c/z.py', 4), ('d/w.py', 5)):
+        path = tmp_path / 'tree' / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x\n' * lines)
+    return str(tmp_path / 'tree')
+
+
+def rolled(root, depth, sort='path'):
+    rollup = DirectoryRollup([root], depth)
+    for record in iter_records(iter_fileobjects([root], [], [])):
+        rollup.write(record)
+    return rollup, [(os.path.relpath(label, root), node.count, node.objects) for label, node in rollup.rows(sort)]
+
+
+def test_subtotals_to_max_depth(tree):
+    rollup, rows = rolled(tree, 2)
+    assert rows == [('.', 15, 5), ('a', 9, 3), ('a/b', 7, 2), ('d', 5, 1)]
+    assert rollup.totals() == (15, 5)
+
+
+def test_roots_only_at_depth_zero(tree):
+    assert rolled(tree, 0)[1] == [('.', 15, 5)]
+
+
+def test_siblings_ordered_by_count(tree):
+    assert rolled(tree, 1, 'count')[1] == [('.', 15, 5), ('a', 9, 3), ('d', 5, 1)]
+
+
+def test_record_beneath_no_root_not_counted(tree):
+    rollup = DirectoryRollup([tree], 1)
+    rollup.write({'path': '/elsewhere/f.py', 'count': 9, 'size': 1})
+    assert rollup.totals() == (0, 0)
+
+
+def test_print_rollup_rows_and_footer(tree, capsys):
+    rollup, _ = rolled(tree, 1)
+    print_rollup(rollup, 80, 1000)
+
+    out = re.sub(r'\x1b\[[0-9;]*m', '', capsys.readouterr().out)
+    assert re.search(re.escape(os.path.join(tree, 'a')) + r'\s+9\n', out)
+    assert re.search(r'Total \(5 objects\):\s+15', out)
@@ -0,0 +1,42 @@
+"""
+Summary.
+
+    Tests of output sinks (--output FORMAT:PATH)
+
+"""
+import json
+import pytest
+from xlines.sinks import OutputSink, create_sinks, parse_output
+
+
+def test_output_sink_is_abstract():
+    with pytest.raises(TypeError):
+        OutputSink('-')
+
+
+def test_jsonl_sink_writes_one_record_per_line(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    sink = parse_output('jsonl:' + path)
+    for i in range(3):
+        sink.write({'path': 'f{}'.format(i), 'count': i})
+    sink.close()
+
+    with open(path) as f1:
+        assert [json.loads(x)['count'] for x in f1] == [0, 1, 2]
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        parse_output('xml:out.xml')
+
+
+def test_only_one_sink_on_stdout():
+    with pytest.raises(ValueError):
+        create_sinks(['json', 'csv:-'])
+
+
+def test_no_destination_opened_when_a_specification_is_invalid(tmp_path):
+    path = tmp_path / 'out.json'
+    with pytest.raises(ValueError):
+        create_sinks(['json:' + str(path), 'xml:' + str(tmp_path / 'out.xml')])
+    assert not path.exists()
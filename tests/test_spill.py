@@ -0,0 +1,66 @@
+"""
+Summary.
+
+    Tests of the external sort of result records (--memory-limit)
+
+"""
+import os
+import random
+import pytest
+from xlines import spill
+from xlines.spill import RECORD_OVERHEAD, SpillSorter, row_size
+
+
+def make_records(n):
+    rng = random.Random(7)
+    return [
+        {'path': '/tree/dir{}/file{:05d}.py'.format(i % 13, i), 'count': rng.randrange(50), 'size': rng.randrange(5000),
+         'mtime': 1700000000 + i, 'uid': 1000}
+        for i in range(n)
+    ]
+
+
+def expected(records, sort):
+    if sort == 'path':
+        return sorted(records, key=lambda x: x['path'])
+    field = 'size' if sort == 'size' else 'count'
+    return sorted(records, key=lambda x: (-x[field], x['path']))
+
+
+@pytest.mark.parametrize('sort', ['path', 'count', 'size'])
+def test_spilled_results_sorted_and_complete(tmp_path, monkeypatch, sort):
+    monkeypatch.setattr(spill, 'MAX_RUNS', 4)
+    records = make_records(500)
+    sorter = SpillSorter(sort, limit=10 * RECORD_OVERHEAD, tmpdir=str(tmp_path))
+    for record in records:
+        sorter.write(record)
+
+    assert len(sorter.runs) < 4 * 3        # fewer than 4 runs in each of the levels of 500 rows
+    assert list(sorter.results()) == expected(records, sort)
+    assert sorter.objects == 500 and sorter.total == sum(x['count'] for x in records)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_compaction_rewrites_each_record_a_logarithmic_number_of_times(tmp_path, monkeypatch):
+    monkeypatch.setattr(spill, 'MAX_RUNS', 4)
+    written = []
+    write_run = SpillSorter._write_run
+
+    def counted(self, rows):
+        rows = list(rows)
+        written.append(len(rows))
+        return write_run(self, rows)
+
+    monkeypatch.setattr(SpillSorter, '_write_run', counted)
+    sorter = SpillSorter('path', limit=1, tmpdir=str(tmp_path))
+    for record in make_records(1024):
+        sorter.write(record)
+
+    # one spill per record, then log4(1024) merges of each record
+    assert sum(written) == 1024 * 6
+    assert [x['path'] for x in sorter.results()] == sorted(x['path'] for x in make_records(1024))
+
+
+def test_record_overhead_covers_a_buffered_row():
+    row = ('/tree/file.py', 1234, 56789, 1700000000, 1000, None)
+    assert RECORD_OVERHEAD + len(row[0]) >= row_size(row)
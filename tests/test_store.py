@@ -0,0 +1,50 @@
+"""
+Summary.
+
+    Tests of the columnar result store
+
+"""
+import random
+from xlines.store import ResultStore
+
+
+def make_records():
+    paths = [
+        '/srv/app/main.py', '/srv/app/lib/util.py', '/srv/app-old/x.py', '/srv/app.py', '/srv/app/Z.txt',
+        '/srv/app/lib/a b.py', '/srv/café/menu.txt', '/srv/raw/\udcff.bin', 'relative.py', 'docs/readme.md'
+    ]
+    return [
+        {'path': x, 'count': i * 7, 'size': i * 100, 'mtime': 1700000000 + i, 'uid': 1000 + i}
+        for i, x in enumerate(paths)
+    ]
+
+
+def test_iteration_in_path_order_with_records_intact():
+    records = make_records()
+    shuffled = list(records)
+    random.Random(3).shuffle(shuffled)
+
+    store = ResultStore()
+    for record in shuffled:
+        store.write(record)
+
+    assert len(store) == len(records)
+    assert list(store) == sorted(records, key=lambda x: x['path'])
+
+
+def test_record_rebuilt_by_index():
+    store = ResultStore()
+    records = make_records()
+    for record in records:
+        store.write(record)
+
+    assert [store.record(i) for i in range(len(records))] == records
+
+
+def test_directories_interned_once():
+    store = ResultStore()
+    for i in range(100):
+        store.write({'path': '/srv/app/lib/f{}.py'.format(i), 'count': i})
+
+    assert store.dir_name == ['', 'srv', 'app', 'lib']
+    assert sum(x['count'] for x in store) == sum(range(100))
@@ -12,3 +12,8 @@
 # global logger
 logd.local_config = local_config
 logger = logd.getLogger(__version__)
+
+
+# library api
+from xlines.api import CountSummary, CountTree, count_tree, iter_counts
+from xlines.aio import acount_tree
@@ -0,0 +1,169 @@
+"""
+Summary.
+
+    Asyncio API -- line counts of filesystem trees for asyncio services
+
+    acount_tree is an async generator.  The walk runs in a thread and
+    hands batches of paths to the event loop through a bounded queue;
+    batches are counted on an executor.  Both stages are bounded, so a
+    consumer which stops reading stalls the walk and the counters instead
+    of buffering results (backpressure), and cancelling the consuming
+    task stops both.  Every scan in a process shares one walker thread
+    pool and one counting process pool unless an executor is provided:
+
+        async for record in xlines.acount_tree(['src'], summary=summary):
+            ...
+
+Module Functions:
+    :acount_tree:  async generator yielding result records
+    :shutdown_executors:  shuts down the shared executors
+
+"""
+import asyncio
+import threading
+import collections
+import concurrent.futures
+from xlines.statics import local_config
+from xlines.core import absolute_paths, count_record, iter_fileobjects, watched_counts
+from xlines.exclusions import ExcludedTypes
+from xlines.mp import cpu_cores
+from xlines.api import CountSummary
+
+
+# paths per batch handed from the walker to a counter
+BATCH = 256
+
+_lock = threading.Lock()
+_executors = {}
+
+
+def _shared(kind):
+    """Shared walker thread pool or counting process pool"""
+    with _lock:
+        if kind not in _executors:
+            if kind == 'walk':
+                _executors[kind] = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='xlines-walk')
+            else:
+                cores = 4 if cpu_cores() >= 4 else cpu_cores()
+                _executors[kind] = concurrent.futures.ProcessPoolExecutor(cores)
+        return _executors[kind]
+
+
+def shutdown_executors():
+    """Shuts down the executors shared by all scans of this process"""
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False)
+        _executors.clear()
+
+
+def _count_batch(paths, whitespace):
+    """Executor task; returns [(path, result record or None)]"""
+    return watched_counts(lambda x: count_record(x, whitespace), paths)
+
+
+def _walk(loop, queue, stop, roots, exclusions, exclude, abspath):
+    """
+        Walker thread; puts batches of paths on the queue, blocking while
+        it is full, then None.  None is put however the walk ends, so the
+        consumer never waits on a walk which raised; the exception is
+        raised to the consumer through the walker's future.  Returns early
+        once stop is set
+    """
+    def put(item):
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while not stop.is_set():
+            try:
+                return future.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                continue
+        future.cancel()
+
+    try:
+        batch = []
+        for path in iter_fileobjects(roots, exclusions, exclude, abspath):
+            if stop.is_set():
+                return
+            batch.append(path)
+            if len(batch) >= BATCH:
+                put(batch)
+                batch = []
+        if batch:
+            put(batch)
+    finally:
+        put(None)
+
+
+async def acount_tree(roots, exclusions=None, exclude=(), whitespace=True, abspath=None,
+                      executor=None, inflight=4, queue_size=8, summary=None):
+    """
+        Line count of one or more filesystem trees without blocking the
+        event loop
+
+    Args:
+        :roots (str | list): filesystem paths (files or directories)
+        :exclusions (list): file type extensions to be excluded
+            (DEFAULT: the user's exclusions.list)
+        :exclude (list): path substrings to be excluded
+        :whitespace (bool): when False, omit whitespace lines from count
+        :abspath (bool): yield absolute paths (DEFAULT: absolute when
+            any root is absolute)
+        :executor (Executor): runs count batches (DEFAULT: a process
+            pool shared by every scan of this process)
+        :inflight (int): maximum batches being counted at once
+        :queue_size (int): maximum batches walked ahead of the counters
+        :summary (CountSummary): when provided, updated with totals;
+            complete is set once every root has been counted
+
+    Returns:
+        async generator yielding result records (dict)
+
+    """
+    roots = [roots] if isinstance(roots, str) else list(roots)
+    abspath = absolute_paths(roots) if abspath is None else abspath
+    summary = summary if summary is not None else CountSummary()
+
+    if exclusions is None:
+        exclusions = ExcludedTypes(local_config['EXCLUSIONS']['EX_EXT_PATH'], []).types
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(queue_size)
+    stop = threading.Event()
+    executor = executor or _shared('count')
+    walker = loop.run_in_executor(
+        _shared('walk'), _walk, loop, queue, stop, roots, list(exclusions), list(exclude), abspath
+    )
+    pending = collections.deque()
+    walked = False
+
+    try:
+        while True:
+            # keep counters busy without waiting on the walk while results are ready
+            while not walked and len(pending) < inflight and (not pending or not queue.empty()):
+                batch = await queue.get()
+                if batch is None:
+                    walked = True
+                    await walker            # raises the exception of a failed walk
+                else:
+                    pending.append(loop.run_in_executor(executor, _count_batch, batch, whitespace))
+
+            if not pending:
+                break
+
+            for path, record in await pending.popleft():
+                if record is None:
+                    summary.io_fail.append(path)
+                    continue
+                summary.total += record['count']
+                summary.objects += 1
+                summary.size += record['size']
+                yield record
+
+        summary.complete = True
+
+    finally:
+        stop.set()
+        for future in pending:
+            future.cancel()
+        while not queue.empty():
+            queue.get_nowait()
@@ -0,0 +1,151 @@
+"""
+Summary.
+
+    Library API -- line counts of filesystem trees for use from Python
+
+    Uses the same walk, exclusion, and counting engines as the xlines
+    command line, but never writes to stdout, reads the terminal, or
+    exits the interpreter.  Results are result records (dict) streamed as
+    they are counted:
+
+        {'path': '/src/pkg/mod.py', 'count': 120, 'size': 4096,
+         'mtime': 1577836800, 'uid': 1000}
+
+    Example:
+
+        import xlines
+
+        tree = xlines.count_tree(['src', 'tests'], jobs=4)
+        for record in tree:
+            print(record['path'], record['count'])
+        print(tree.summary.total, tree.summary.objects)
+
+        summary = xlines.count_tree('src').run()
+
+Module Classes:
+    :CountSummary:  cumulative totals of a count
+    :CountTree:  iterable line count of one or more roots
+
+Module Functions:
+    :count_tree:  counts filesystem trees; returns a CountTree
+    :iter_counts:  generator form of count_tree
+
+"""
+import os
+from xlines.statics import local_config
+from xlines.core import absolute_paths, iter_fileobjects, iter_records
+from xlines.exclusions import ExcludedTypes
+from xlines.mp import mp_records
+
+
+class CountSummary():
+    """
+        Cumulative totals of a count; final once results are exhausted
+    """
+    __slots__ = ('total', 'objects', 'size', 'io_fail', 'complete')
+
+    def __init__(self):
+        self.total = 0              # lines counted
+        self.objects = 0            # file objects counted
+        self.size = 0               # bytes of file objects counted
+        self.io_fail = []           # paths which failed to count
+        self.complete = False       # True once every root has been counted
+
+    def __repr__(self):
+        return 'CountSummary(total={}, objects={}, size={}, io_fail={}, complete={})'.format(
+            self.total, self.objects, self.size, len(self.io_fail), self.complete
+        )
+
+
+class CountTree():
+    """
+        Single pass, iterable line count of one or more roots.  Iterating
+        yields result records as they are counted and updates summary
+    """
+    def __init__(self, roots, exclusions=None, exclude=(), whitespace=True, jobs=None, abspath=None):
+        """
+        Args:
+            :roots (str | list): filesystem paths (files or directories)
+            :exclusions (list): file type extensions to be excluded, such
+                as ['.pyc', '.png'] (DEFAULT: the user's exclusions.list)
+            :exclude (list): path substrings to be excluded
+            :whitespace (bool): when False, omit whitespace lines from count
+            :jobs (int): worker processes; None or 1 counts in-process
+            :abspath (bool): yield absolute paths (DEFAULT: absolute when
+                any root is absolute, as the command line does)
+        """
+        self.roots = [roots] if isinstance(roots, str) else list(roots)
+        self.exclusions = exclusions
+        self.exclude = list(exclude)
+        self.whitespace = whitespace
+        self.jobs = jobs
+        self.abspath = absolute_paths(self.roots) if abspath is None else abspath
+        self.summary = CountSummary()
+        self._started = False
+
+        for root in self.roots:
+            if not os.path.exists(root):
+                raise FileNotFoundError('No such file or directory: {}'.format(root))
+
+    def _exclusions(self):
+        if self.exclusions is not None:
+            return list(self.exclusions)
+        return ExcludedTypes(local_config['EXCLUSIONS']['EX_EXT_PATH'], []).types
+
+    def __iter__(self):
+        if self._started:
+            raise RuntimeError('CountTree results may be iterated only once')
+        self._started = True
+
+        summary = self.summary
+        paths = iter_fileobjects(self.roots, self._exclusions(), self.exclude, self.abspath)
+
+        if self.jobs and self.jobs > 1:
+            records = mp_records(paths, self.whitespace, summary.io_fail, self.jobs)
+        else:
+            records = iter_records(paths, self.whitespace, summary.io_fail)
+
+        for record in records:
+            summary.total += record['count']
+            summary.objects += 1
+            summary.size += record['size']
+            yield record
+        summary.complete = True
+
+    def run(self):
+        """
+            Counts all roots without retaining per-file results
+
+        Returns:
+            CountSummary object
+
+        """
+        for _ in self:
+            pass
+        return self.summary
+
+
+def count_tree(roots, exclusions=None, exclude=(), whitespace=True, jobs=None, abspath=None):
+    """
+        Line count of one or more filesystem trees.  See CountTree for
+        arguments
+
+    Returns:
+        CountTree object; iterate for result records (dict), then read
+        its summary (CountSummary), or call run() for totals only
+
+    """
+    return CountTree(roots, exclusions, exclude, whitespace, jobs, abspath)
+
+
+def iter_counts(roots, exclusions=None, exclude=(), whitespace=True, jobs=None, abspath=None):
+    """
+        Generator form of count_tree.  Yields result records (dict); the
+        CountSummary is the generator's return value:
+
+            summary = yield from xlines.iter_counts(roots)
+
+    """
+    tree = CountTree(roots, exclusions, exclude, whitespace, jobs, abspath)
+    yield from tree
+    return tree.summary
@@ -0,0 +1,443 @@
+"""
+Summary.
+
+    Content Cache Module -- portable line count cache keyed by file content
+
+    Entries are keyed by the git blob SHA-1 of a file's content.  Inside a
+    git work tree the key of a clean, tracked file is read from the index
+    (batched `git ls-files` and `git check-attr` calls per repository, no
+    file reads) when its working tree bytes are the blob:  files checked
+    out through end of line conversion or a filter (clean/smudge, LFS,
+    ident, working-tree-encoding) are hashed instead.  Other files are
+    hashed in the same blob format, so keys agree across checkouts,
+    machines, and CI runners.  Each entry holds the line count,
+    the count without whitespace lines, and the binary verdict.
+
+    The cache is one append-only text file, one entry per line:
+
+        <blob sha1> <lines> <lines sans whitespace> <binary 0|1>
+        c:<blob sha1> <lines> <lines sans whitespace> 0      (chunk)
+
+    New entries are appended in a single write at the end of a run, so
+    caches written by parallel jobs merge by concatenation:
+
+        $ cat cache-job1 cache-job2 > xlines.cache
+
+    Large files are also divided into content-defined chunks which end at
+    line boundaries, each cached under the blob SHA-1 of its content with
+    the prefix c: (chunks are not binary tested; whole files are).  When
+    a large file changes in a few places only the chunks which changed
+    are counted; the counts of the rest are summed from the cache.  Large
+    files are read once, in blocks:  the file is hashed while it is
+    chunked, so neither a miss nor memory grows beyond a plain count
+
+Module Classes:
+    :ContentCache:  batched content-addressed lookup and count
+
+"""
+import io
+import os
+import zlib
+import itertools
+import hashlib
+import inspect
+import subprocess
+from xlines import logger
+from xlines.core import open_fileobject
+
+
+# attributes which make the working tree bytes of a file differ from its blob
+CHECKOUT_ATTRIBUTES = ['filter', 'ident', 'working-tree-encoding']
+
+TEXTCHARS = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+
+# files of at least this size (bytes) are counted in chunks
+CHUNK_FILE_MIN = 4194304
+
+# bounds of chunk size (bytes); a single line may exceed the maximum
+CHUNK_MIN = 65536
+CHUNK_MAX = 1048576
+
+# a newline ends a chunk when the CRC-32 of the bytes before it has these
+# bits clear; one newline in 16 past the minimum chunk size qualifies
+CHUNK_MASK = 0xf
+CHUNK_WINDOW = 32
+
+# bytes read at a time from files hashed or chunked in blocks
+READ_BLOCK = 1048576
+
+# key prefix of chunk entries
+CHUNK_PREFIX = 'c:'
+
+
+def blob_sha(data):
+    """git blob SHA-1 of a bytes-like object (same as git hash-object)"""
+    sha = hashlib.sha1(b'blob %d\0' % len(data))
+    sha.update(data)
+    return sha.hexdigest()
+
+
+def chunk_end(data, start, final=True):
+    """
+        End offset of the content-defined chunk of data beginning at start
+
+    Args:
+        :data (bytes): file content, or the part of it read so far
+        :start (int): offset of the chunk
+        :final (bool): False when data may continue beyond its end
+
+    Returns:
+        end offset (int), or None when data ends before the chunk end is
+        determined (final False only)
+
+    """
+    size = len(data)
+    pos, limit = start + CHUNK_MIN, start + CHUNK_MAX
+
+    while pos < size:
+        nl = data.find(b'\n', pos)
+        if nl < 0:
+            break
+        if nl >= limit:
+            # no qualifying newline; end at the last line within the maximum
+            return (data.rfind(b'\n', start, limit) + 1) or nl + 1
+        if not zlib.crc32(data[max(nl - CHUNK_WINDOW, start):nl]) & CHUNK_MASK:
+            return nl + 1
+        pos = nl + 1
+    return size if final else None
+
+
+def chunk_bounds(data):
+    """
+        Content-defined chunks of file content.  Past CHUNK_MIN bytes, a
+        chunk ends at the first newline whose preceding CHUNK_WINDOW bytes
+        hash to a qualifying value, so boundaries follow content:  an edit
+        changes the chunks around it while boundaries elsewhere realign.
+        Only newlines beyond the minimum are examined, which keeps the
+        pass far cheaper than decoding the lines
+
+    Returns:
+        generator object yielding (start, end) byte offsets; every chunk
+        but the last ends with a newline
+
+    """
+    start = 0
+    while start < len(data):
+        end = chunk_end(data, start)
+        yield start, end
+        start = end
+
+
+def stream_chunks(blocks):
+    """
+        Content-defined chunks (see chunk_bounds) of content read in blocks.
+        Only the chunk being delimited is held in memory
+
+    Args:
+        :blocks (iter): successive blocks of file content (bytes)
+
+    Returns:
+        generator object yielding chunk content (bytes)
+
+    """
+    buf, final = bytearray(), False
+
+    while True:
+        end = chunk_end(buf, 0, final) if buf else None
+        if end is not None:
+            yield bytes(buf[:end])
+            del buf[:end]
+        elif final:
+            return
+        else:
+            block = next(blocks, None)
+            if block is None:
+                final = True
+            else:
+                buf += block
+
+
+def read_blocks(f1, size):
+    """
+        Reads the first size bytes of an open binary file object in blocks
+        of READ_BLOCK bytes; raises OSError when the file is truncated
+        while read
+
+    Returns:
+        generator object yielding bytes
+
+    """
+    while size:
+        block = f1.read(min(size, READ_BLOCK))
+        if not block:
+            raise OSError('File truncated while read: {}'.format(f1.name))
+        size -= len(block)
+        yield block
+
+
+def count_bytes(data):
+    """
+        Line counts of file content with the same semantics as linecount:
+        default text decoding and universal newlines
+
+    Returns:
+        (lines, lines sans whitespace lines), TYPE: tuple
+
+    """
+    lines = io.TextIOWrapper(io.BytesIO(data)).readlines()
+    return len(lines), len([x for x in lines if x != '\n'])
+
+
+class ContentCache():
+    """
+        Content-addressed line count cache shared between runs and hosts
+    """
+    def __init__(self, path):
+        """
+        Args:
+            :path (str): cache file; created on first save
+        """
+        self.path = path
+        self.entries = self._load()
+        self.new = {}
+        self.tops = {}          # directory -> git work tree top level
+        self.indexes = {}       # work tree top level -> {path: blob sha}
+        self.hits = 0
+        self.misses = 0
+        self.chunk_hits = 0
+        self.chunk_misses = 0
+
+    def _load(self):
+        entries = {}
+        try:
+            with open(self.path) as f1:
+                for line in f1:
+                    fields = line.split()
+                    if len(fields) == 4 and len(fields[0].replace(CHUNK_PREFIX, '', 1)) == 40:
+                        entries[fields[0]] = (int(fields[1]), int(fields[2]), fields[3] == '1')
+        except OSError:
+            pass
+        except ValueError:
+            logger.warning('%s: skipped malformed content cache entry in %s' % (inspect.stack()[0][3], self.path))
+        return entries
+
+    def save(self):
+        """Appends entries added during this run in a single write"""
+        if not self.new:
+            return True
+        lines = ''.join(
+            '{} {} {} {}\n'.format(k, v[0], v[1], int(v[2])) for k, v in self.new.items()
+        )
+        try:
+            with open(self.path, 'a') as f1:
+                f1.write(lines)
+        except OSError:
+            logger.exception('%s: Problem appending to content cache %s' % (inspect.stack()[0][3], self.path))
+            return False
+        self.new = {}
+        return True
+
+    def _worktree(self, directory):
+        """Top level directory of the git work tree containing directory"""
+        if directory not in self.tops:
+            if os.path.exists(os.path.join(directory, '.git')):
+                self.tops[directory] = directory
+            else:
+                parent = os.path.dirname(directory)
+                self.tops[directory] = None if parent == directory else self._worktree(parent)
+        return self.tops[directory]
+
+    def _git_index(self, top):
+        """
+            Blob SHA-1 of each clean tracked file of a git work tree whose
+            working tree bytes are the blob, read with batched git calls
+            per repository.  Files with end of line conversion (text or eol
+            attributes, core.autocrlf) or a checkout filter are omitted
+
+        """
+        def git(args, stdin=None):
+            out = subprocess.run(
+                ['git', '-C', top] + args, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            ).stdout
+            return [x.decode('utf-8', 'surrogateescape') for x in out.split(b'\0') if x]
+
+        index = {}
+        try:
+            # <mode> <sha> <stage>\ti/<eol> w/<eol> attr/<text eol attributes>\t<path>
+            for entry in git(['ls-files', '-z', '-s', '--eol']):
+                meta, eol, path = entry.split('\t', 2)
+                converted = eol.split()[:2]
+                attr = eol[eol.find('attr/') + 5:].strip()
+                if converted[0][2:] == converted[1][2:] and attr in ('', '-text'):
+                    index[path] = meta.split()[1]
+            for path in git(['ls-files', '-z', '-m']):
+                index.pop(path, None)
+
+            # attribute output:  <path> NUL <attribute> NUL <value> NUL
+            paths = ''.join(x + '\0' for x in index).encode('utf-8', 'surrogateescape')
+            attrs = git(['check-attr', '-z', '--stdin'] + CHECKOUT_ATTRIBUTES, paths)
+            for i in range(0, len(attrs) - 2, 3):
+                if attrs[i + 2] not in ('unspecified', 'unset'):
+                    index.pop(attrs[i], None)
+        except (OSError, ValueError, IndexError):
+            logger.info('%s: git unavailable; hashing content of %s' % (inspect.stack()[0][3], top))
+            return {}
+        return {os.path.join(top, k): v for k, v in index.items()}
+
+    def _index_sha(self, path):
+        top = self._worktree(os.path.dirname(path))
+        if top is None:
+            return None
+        if top not in self.indexes:
+            self.indexes[top] = self._git_index(top)
+        return self.indexes[top].get(path)
+
+    def _cached(self, sha):
+        return self.entries.get(sha) or self.new.get(sha)
+
+    def _lookup(self, path):
+        """
+            Returns (blob sha | None, cached entry | None, content bytes |
+            None).  Content is kept only for files below CHUNK_FILE_MIN
+            bytes; larger files not keyed by the git index are not read
+            here (sha None), but hashed by count as they are chunked
+
+        """
+        abspath = os.path.abspath(path)
+        sha = self._index_sha(abspath)
+        data = None
+
+        if sha is None:
+            with open_fileobject(abspath, 'rb') as f1:
+                if os.fstat(f1.fileno()).st_size >= CHUNK_FILE_MIN:
+                    return None, None, None
+                data = f1.read()
+                sha = blob_sha(data)
+
+        return sha, self._cached(sha), data
+
+    def _count_chunks(self, blocks, digest=None):
+        """
+            Line counts of large file content read in blocks, summed over
+            its chunks; only chunks absent from the cache are counted
+
+        Args:
+            :blocks (iter): successive blocks of file content (bytes)
+            :digest (hashlib object): when provided, updated with the content
+
+        Returns:
+            (lines, lines sans whitespace lines), TYPE: tuple
+
+        """
+        lines, nows = 0, 0
+        for chunk in stream_chunks(blocks):
+            if digest is not None:
+                digest.update(chunk)
+            key = CHUNK_PREFIX + blob_sha(chunk)
+            entry = self._cached(key)
+            if entry is None:
+                self.chunk_misses += 1
+                entry = self.new[key] = count_bytes(chunk) + (False,)
+            else:
+                self.chunk_hits += 1
+            lines += entry[0]
+            nows += entry[1]
+        return lines, nows
+
+    def _count_large(self, f1, size, sha=None):
+        """
+            Cache entry of a file of at least CHUNK_FILE_MIN bytes, read
+            once in blocks:  chunks are counted through the cache while
+            the blob SHA-1 of the file is computed, unless given by the
+            git index
+
+        Returns:
+            cache entry, TYPE: tuple
+
+        """
+        blocks = read_blocks(f1, size)
+        first = next(blocks, b'')
+
+        if first[:1024].translate(None, TEXTCHARS):
+            # binary; not hashed unless keyed by the git index already
+            self.misses += 1
+            if sha is not None:
+                self.new[sha] = (0, 0, True)
+            return 0, 0, True
+
+        digest = None if sha else hashlib.sha1(b'blob %d\0' % size)
+        lines, nows = self._count_chunks(itertools.chain([first], blocks), digest)
+        sha = sha or digest.hexdigest()
+
+        entry = self._cached(sha)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = self.new[sha] = (lines, nows, False)
+        return entry
+
+    def count(self, path, whitespace=True):
+        """
+            Line count of a single file object through the cache
+
+        Returns:
+            result record (dict) | None if the file object is binary
+
+        """
+        sha, entry, data = self._lookup(path)
+
+        if entry is not None:
+            self.hits += 1
+        else:
+            if data is None:
+                # a large file, or a miss keyed by the git index:  read once
+                with open_fileobject(path, 'rb') as f1:
+                    size = os.fstat(f1.fileno()).st_size
+                    if size >= CHUNK_FILE_MIN:
+                        entry = self._count_large(f1, size, sha)
+                    else:
+                        data = f1.read()
+                        sha = sha or blob_sha(data)
+            if entry is None:
+                self.misses += 1
+                binary = bool(data[:1024].translate(None, TEXTCHARS))
+                entry = self.new[sha] = (0, 0, True) if binary else count_bytes(data) + (False,)
+
+        if entry[2]:
+            return None
+
+        st = os.stat(path)
+        return {
+            'path': path,
+            'count': entry[0] if whitespace else entry[1],
+            'size': st.st_size,
+            'mtime': int(st.st_mtime),
+            'uid': st.st_uid
+        }
+
+    def records(self, paths, whitespace=True, io_fail=None):
+        """
+            Line counts of a stream of file objects.  Binary file objects
+            are omitted from results; new entries are saved at the end
+
+        Args:
+            :paths (iter): filesystem paths of file objects; binary content
+                need not be filtered beforehand
+            :whitespace (bool): when False, omit whitespace lines from count
+            :io_fail (list): when provided, collects paths which failed
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        for path in paths:
+            try:
+                record = self.count(path, whitespace)
+            except Exception:
+                if io_fail is not None:
+                    io_fail.append(path)
+                continue
+            if record is not None:
+                yield record
+        self.save()
@@ -0,0 +1,330 @@
+"""
+Summary.
+
+    Checkpoint Module -- resumable scans of very large trees
+
+    The scan walks one directory at a time from a stack, with the
+    traversal rules of walk_fileobjects:  each physical file object is
+    counted once, and symbolic links to files are counted after the walk
+    of their root when no other path reached the file object.  Result
+    records of a directory are appended to a records log once every file
+    object in it has been counted.  The (device, inode) pairs walked are
+    appended to an inode log as they are first seen.  At intervals, and
+    when the scan stops, the checkpoint state is replaced atomically
+    (temporary file, fsync, rename):  the frontier of directories not yet
+    walked, the file objects listed but not yet logged, the symbolic
+    links deferred, the lengths of both logs, and the totals so far.  The
+    logs are flushed to disk before any state which refers to them, so a
+    process killed at any point leaves a consistent checkpoint; entries
+    logged after the last state are discarded on resume, and the file
+    objects of directories not logged are counted again.
+
+    Files written for --checkpoint FILE:
+
+        FILE            checkpoint state (JSON)
+        FILE.records    records log; one JSON array per result record
+        FILE.inodes     inode log; (device, inode) pairs walked
+
+Module Classes:
+    :ScanCheckpoint:  checkpointed, resumable walk and count
+
+"""
+import os
+import json
+import time
+import struct
+import inspect
+import itertools
+import tempfile
+from xlines import logger
+from xlines.core import illegal_directories, is_legal, linked_fileobject, list_directory, relpath_normalize
+from xlines.inodes import InodeSet
+
+
+# seconds between checkpoint saves
+CHECKPOINT_INTERVAL = 30
+
+VERSION = 2
+
+# inode log entry:  device, inode
+INODE = struct.Struct('<QQ')
+
+
+class _LoggedInodes():
+    """InodeSet whose new members are also appended to an inode log"""
+    def __init__(self, log):
+        self.inodes = InodeSet()
+        self.log = log
+
+    def restore(self, data):
+        """Adds the members logged in data (bytes) without logging them again"""
+        for dev, ino in INODE.iter_unpack(data):
+            self.inodes.add(dev, ino)
+
+    def add(self, dev, ino):
+        if not self.inodes.add(dev, ino):
+            return False
+        self.log.write(INODE.pack(dev, ino))
+        return True
+
+
+class ScanCheckpoint():
+    """
+        Walk and count of one or more roots which saves its progress to a
+        checkpoint file and resumes from it
+    """
+    def __init__(self, path, container, signature, illegal, exclude=[], abspath=True, resume=False,
+                 follow_symlinks=False, one_file_system=False):
+        """
+        Args:
+            :path (str): checkpoint state file
+            :container (list): filesystem paths (files or directories)
+            :signature (str): hash of runtime options; a checkpoint is
+                only resumed with the options which wrote it
+            :illegal (list): file type extensions to be excluded
+            :exclude (list): path substrings to be excluded (--exclude)
+            :abspath (bool): absolute paths in result records when True
+            :resume (bool): continue from an existing checkpoint
+            :follow_symlinks (bool): descend symbolic links to directories
+            :one_file_system (bool): do not cross from a root onto other devices
+        """
+        self.path = path
+        self.log_path = path + '.records'
+        self.inode_path = path + '.inodes'
+        self.container = list(container)
+        self.signature = signature
+        self.illegal = illegal
+        self.illegal_dirs = illegal_directories()
+        self.exclude = exclude
+        self.abspath = abspath
+        self.follow_symlinks = follow_symlinks
+        self.one_file_system = one_file_system
+        self.saved = time.monotonic()
+
+        if resume:
+            state = self._load()
+        else:
+            state = {'frontier': [[x, None, None, None] for x in reversed(self.container)], 'links': [],
+                     'log_size': 0, 'inode_log_size': 0, 'lines': 0, 'objects': 0, 'size': 0, 'io_fail': []}
+
+        # frontier entries [path, device, root device, files]:
+        #   [root, None, None, None]        root not yet walked
+        #   [directory, dev, root dev, None]  directory not yet listed
+        #   [None, None, None, paths]       file objects listed, not yet logged
+        #   [None, None, None, None]        end of a root; deferred links counted
+        self.stack = [list(x) for x in state['frontier']]
+        self.links = state['links']         # symbolic links deferred to the end of the root
+        self.log_size = state['log_size']
+        self.inode_log_size = state['inode_log_size']
+        self.lines = state['lines']
+        self.objects = state['objects']
+        self.size = state['size']
+        self.io_fail = state['io_fail']
+        self.groups = itertools.count()
+        self.inflight = {}          # path -> group
+        self.remaining = {}         # group -> file objects not yet counted
+        self.buffered = {}          # group -> (result records, failed paths)
+        self.listed = {}            # group -> paths of its file objects
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.log = self._open(self.log_path, self.log_size, resume)
+        self.inode_log = self._open(self.inode_path, self.inode_log_size, resume)
+        self.seen = _LoggedInodes(self.inode_log)
+        if resume:
+            with open(self.inode_path, 'rb') as f1:
+                self.seen.restore(f1.read(self.inode_log_size))
+
+    def _open(self, path, size, resume):
+        """Opens a log for appending past its first size bytes"""
+        log = open(path, 'ab' if resume else 'wb')
+        log.truncate(size)
+        log.seek(size)
+        return log
+
+    def _load(self):
+        try:
+            with open(self.path) as f1:
+                state = json.load(f1)
+        except FileNotFoundError:
+            raise ValueError('No checkpoint to resume at {}'.format(self.path))
+        except ValueError:
+            raise ValueError('Unreadable checkpoint {}'.format(self.path))
+
+        if state.get('version') != VERSION or state.get('signature') != self.signature:
+            raise ValueError('Checkpoint {} was written by a scan with other paths or options'.format(self.path))
+        for path, size in ((self.log_path, state['log_size']), (self.inode_path, state['inode_log_size'])):
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                raise ValueError('Checkpoint log {} is incomplete'.format(path))
+        return state
+
+    def save(self):
+        """Atomically replaces the checkpoint state with current progress"""
+        for log in (self.log, self.inode_log):
+            log.flush()
+            os.fsync(log.fileno())
+        self.log_size = self.log.tell()
+        self.inode_log_size = self.inode_log.tell()
+
+        # file objects being counted are counted again in full; their inodes are logged already
+        frontier = [[None, None, None, self.listed[x]] for x in self.remaining] + self.stack
+        state = {
+            'version': VERSION,
+            'signature': self.signature,
+            'frontier': frontier,
+            'links': self.links,
+            'log_size': self.log_size,
+            'inode_log_size': self.inode_log_size,
+            'lines': self.lines,
+            'objects': self.objects,
+            'size': self.size,
+            'io_fail': self.io_fail,
+            'complete': not frontier
+        }
+
+        try:
+            fd, tmp = tempfile.mkstemp(prefix='.checkpoint-', dir=os.path.dirname(os.path.abspath(self.path)))
+            with os.fdopen(fd, 'w') as f1:
+                json.dump(state, f1, separators=(',', ':'))
+                f1.flush()
+                os.fsync(f1.fileno())
+            os.replace(tmp, self.path)
+        except OSError:
+            logger.exception('%s: Problem writing checkpoint %s' % (inspect.stack()[0][3], self.path))
+        self.saved = time.monotonic()
+
+    def _display(self, path):
+        return os.path.abspath(path) if self.abspath else relpath_normalize(os.path.relpath(path))
+
+    def _countable(self, path):
+        """Exclusions of iter_fileobjects"""
+        return not any(x in path for x in self.exclude) and is_legal(path, self.illegal, self.illegal_dirs)
+
+    def _list(self, entry):
+        """
+            Walks one frontier entry (see __init__), with the traversal
+            rules of walk_fileobjects
+
+        Returns:
+            countable file objects (paths), TYPE: list
+
+        """
+        path, dev, device, files = entry
+
+        if files is not None:
+            return files
+        if path is None:
+            links, self.links = self.links, []
+            files = [self._display(x) for x in links if linked_fileobject(x, self.seen)]
+        elif dev is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return []
+            if not self.seen.add(st.st_dev, st.st_ino):
+                return []
+            if os.path.isfile(path):
+                files = [path]
+            else:
+                self.stack.append([None, None, None, None])
+                self.stack.append([path, st.st_dev, st.st_dev, None])
+                return []
+        else:
+            found, subdirs, links = list_directory(path, dev, device, self.seen, self.follow_symlinks,
+                                                   self.one_file_system)
+            self.stack.extend([x, d, device, None] for x, d in reversed(subdirs))
+            self.links.extend(links)
+            files = [self._display(x) for x in found]
+        return [x for x in files if self._countable(x)]
+
+    def _paths(self):
+        """Walks the frontier; yields paths of file objects to count"""
+        while self.stack:
+            files = self._list(self.stack.pop())
+            if files:
+                group = next(self.groups)
+                self.remaining[group] = len(files)
+                self.buffered[group] = ([], [])
+                self.listed[group] = files
+                for path in files:
+                    self.inflight[path] = group
+                    yield path
+
+    def _counted(self, path, record):
+        """Logs the records of a group of file objects once all are counted"""
+        group = self.inflight.pop(path, None)
+        if group is None:
+            return
+        records, failed = self.buffered[group]
+        if record is None:
+            failed.append(path)
+        else:
+            records.append(record)
+        self.remaining[group] -= 1
+
+        if not self.remaining[group]:
+            del self.remaining[group], self.buffered[group], self.listed[group]
+            lines = []
+            for r in records:
+                lines.append(json.dumps([r['path'], r['count'], r['size'], r['mtime'], r['uid'], r.get('approx')]))
+                self.lines += r['count']
+                self.objects += 1
+                self.size += r['size']
+            if lines:
+                self.log.write(('\n'.join(lines) + '\n').encode('utf-8', 'surrogateescape'))
+            self.io_fail.extend(failed)
+
+    def replay(self):
+        """
+            Result records logged by previous runs of this scan
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        with open(self.log_path, 'rb') as f1:
+            for line in f1.read(self.log_size).decode('utf-8', 'surrogateescape').splitlines():
+                path, count, size, mtime, uid, approx = json.loads(line)
+                record = {'path': path, 'count': count, 'size': size, 'mtime': mtime, 'uid': uid}
+                if approx is not None:
+                    record['approx'] = approx
+                yield record
+
+    def records(self, counter, io_fail=None):
+        """
+            Result records of previous runs, then of the rest of the scan.
+            Progress is saved every CHECKPOINT_INTERVAL seconds and when
+            the stream ends or is closed
+
+        Args:
+            :counter (callable): counter(paths, io_fail) -> iterable of
+                result records, such as record_stream
+            :io_fail (list): when provided, collects paths which failed
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        failed = []
+        if io_fail is not None:
+            io_fail.extend(self.io_fail)
+        yield from self.replay()
+
+        def drain():
+            while failed:
+                path = failed.pop()
+                self._counted(path, None)
+                if io_fail is not None:
+                    io_fail.append(path)
+
+        try:
+            for record in counter(self._paths(), failed):
+                drain()
+                self._counted(record['path'], record)
+                yield record
+                if time.monotonic() - self.saved >= CHECKPOINT_INTERVAL:
+                    self.save()
+            drain()
+        finally:
+            self.save()
+            self.log.close()
+            self.inode_log.close()
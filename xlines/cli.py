@@ -28,6 +28,7 @@
 import sys
 import re
 import json
+import signal
 import inspect
 import argparse
 import subprocess
@@ -39,10 +40,27 @@
 from xlines.statics import local_config
 from xlines.help_menu import menu_body
 from xlines.square import border_map
-from xlines.mp import multiprocessing_main
-from xlines.core import absolute_paths, linecount, locate_fileobjects
+from xlines.mp import multiprocessing_main, mp_records
+from xlines.core import absolute_paths, count_record, locate_fileobjects
+from xlines.core import iter_fileobjects, iter_records, illegal_directories, is_legal
+from xlines.core import coalesce_roots, filter_fileobjects, read_paths
 from xlines.core import remove_illegal, print_footer, print_header
 from xlines.exclusions import ExcludedTypes
+from xlines.sinks import create_sinks
+from xlines.groupby import GroupBy, RootSummary, print_groupby
+from xlines.rollup import DirectoryRollup, print_rollup
+from xlines.topn import TopN, print_top
+from xlines.spill import SpillSorter, parse_size
+from xlines.deadline import Deadline
+from xlines.estimate import TreeEstimate, DEFAULT_FRACTION, print_estimate
+from xlines.dircache import DirectoryCache, cache_signature
+from xlines.blobcache import ContentCache
+from xlines.dedupe import ContentDedupe, print_duplicates
+from xlines.checkpoint import ScanCheckpoint
+from xlines.shard import Shard, PartialResultSink, PartialResults, parse_shard
+from xlines.daemon import connect, daemon_records
+from xlines.watch import watch
+from xlines.metrics import MetricsExporter, parse_address, serve_metrics
 from xlines.configure import display_exclusions, main_menupage
 from xlines.colormap import ColorMap
 from xlines.variables import *
@@ -193,14 +211,41 @@ def options(parser, help_menu=False):
         TYPE: argparse object, parser argument set
 
     """
+    parser.add_argument("--approx-above", dest='approx_above', type=str, default=None, required=False)
+    parser.add_argument("--cache", dest='cache', action='store_true', default=False, required=False)
+    parser.add_argument("--checkpoint", dest='checkpoint', type=str, default=None, required=False)
+    parser.add_argument("--content-cache", dest='content_cache', type=str, default=None, required=False)
     parser.add_argument("-C", "--configure", dest='configure', action='store_true', required=False)
     parser.add_argument("-d", "--debug", dest='debug', action='store_true', default=False, required=False)
+    parser.add_argument("--dedupe-content", dest='dedupe_content', action='store_true', default=False, required=False)
+    parser.add_argument("--deadline", dest='deadline', type=float, default=None, required=False)
+    parser.add_argument("--estimate", dest='estimate', nargs='?', type=float, const=DEFAULT_FRACTION, default=None, required=False)
     parser.add_argument("-e", "--exclude", dest='exclude', nargs='*', default=[], required=False)
+    parser.add_argument("--files-from", dest='files_from', type=str, default=None, required=False)
+    parser.add_argument("--follow-symlinks", dest='follow_symlinks', action='store_true', default=False, required=False)
+    parser.add_argument("-g", "--group-by", dest='groupby', nargs='+', default=[], required=False)
     parser.add_argument("-h", "--help", dest='help', action='store_true', required=False)
     parser.add_argument("-l", "--list-exclusions", dest='exclusions', action='store_true', required=False)
+    parser.add_argument("--max-depth", dest='max_depth', type=int, default=None, required=False)
+    parser.add_argument("--memory-limit", dest='memory_limit', type=str, default=None, required=False)
     parser.add_argument("-m", "--multiprocess", dest='multiprocess', default=False, action='store_true', required=False)
+    parser.add_argument("-0", "--null", dest='null', action='store_true', default=False, required=False)
+    parser.add_argument("--one-file-system", dest='one_file_system', action='store_true', default=False, required=False)
+    parser.add_argument("-o", "--output", dest='output', action='append', default=[], required=False)
+    parser.add_argument("--per-root", dest='per_root', action='store_true', default=False, required=False)
+    parser.add_argument("--refresh", dest='refresh', type=float, default=None, required=False)
     parser.add_argument("-s", "--sum", dest='sum', nargs='*', default=os.getcwd(), required=False)
+    parser.add_argument("--resume", dest='resume', type=str, default=None, required=False)
+    parser.add_argument("--serve-metrics", dest='serve_metrics', type=str, default=None, required=False)
+    parser.add_argument("--shard", dest='shard', type=str, default=None, required=False)
+    parser.add_argument("--shard-file", dest='shard_file', type=str, default=None, required=False)
+    parser.add_argument("--sort", dest='sort', choices=['path', 'count', 'size'], default=None, required=False)
+    parser.add_argument("--no-daemon", dest='no_daemon', action='store_true', default=False, required=False)
     parser.add_argument("-n", "--no-whitespace", dest='whitespace', action='store_false', default=True, required=False)
+    parser.add_argument("-t", "--top", dest='top', type=int, default=None, required=False)
+    parser.add_argument("-T", "--total", dest='total', action='store_true', default=False, required=False)
+    parser.add_argument("--verify", dest='verify', action='store_true', default=False, required=False)
+    parser.add_argument("--watch", dest='watch', action='store_true', default=False, required=False)
     parser.add_argument("-V", "--version", dest='version', action='store_true', required=False)
     return parser.parse_known_args()
 
@@ -338,6 +383,196 @@ def normalize(self, path):
             return './' + path
 
 
+def record_stream(paths, whitespace, multiprocess, io_fail, approx=None, expires=None):
+    """
+        Streams result records for a stream of paths using either the
+        sequential or the multiprocessing line count engine
+
+    Returns:
+        generator object yielding result records (dict)
+
+    """
+    if multiprocess:
+        return mp_records(paths, whitespace, io_fail, approx=approx, expires=expires)
+    return iter_records(paths, whitespace, io_fail, approx, expires)
+
+
+def directory_cache(args, exclusions, ccache=None):
+    """
+        Creates the persistent directory cache (--cache) for the runtime
+        options which determine line count results
+
+    Returns:
+        DirectoryCache object | None when --cache not specified
+
+    """
+    if not args.cache:
+        return None
+
+    illegal_dirs = illegal_directories()
+
+    def countable(path):
+        return not any(x in path for x in args.exclude) and is_legal(path, exclusions.types, illegal_dirs, not ccache)
+
+    def counter(path):
+        if ccache:
+            return ccache.count(path, args.whitespace)
+        return count_record(path, args.whitespace)
+
+    signature = cache_signature(args.whitespace, exclusions.types, illegal_dirs, args.exclude)
+    return DirectoryCache(signature, countable, counter, args.verify, whitespace=args.whitespace)
+
+
+def scan_checkpoint(args, container, abspath, exclusions):
+    """
+        Creates the checkpoint of a resumable scan (--checkpoint FILE), or
+        reopens one to continue it (--resume FILE)
+
+    Returns:
+        ScanCheckpoint object; raises ValueError if a checkpoint cannot
+        be resumed with the paths and options given
+
+    """
+    if args.checkpoint and args.resume and args.checkpoint != args.resume:
+        raise ValueError('--resume continues checkpointing to the same file; give only one checkpoint file')
+
+    approx = parse_size(args.approx_above) if args.approx_above else None
+    signature = cache_signature(
+        [os.path.abspath(x) for x in container], abspath, args.whitespace, exclusions.types,
+        illegal_directories(), args.exclude, approx, args.follow_symlinks, args.one_file_system
+    )
+    return ScanCheckpoint(
+        args.resume or args.checkpoint, container, signature, exclusions.types, args.exclude, abspath,
+        resume=bool(args.resume), follow_symlinks=args.follow_symlinks, one_file_system=args.one_file_system
+    )
+
+
+def shard_sink(args, shard, requested, abspath, exclusions):
+    """
+        Creates the sink which writes the partial result file (--shard-file)
+        of one shard (--shard i/N) of a scan partitioned across hosts.  The
+        file is signed with the roots and the options which change results
+
+    Returns:
+        PartialResultSink object
+
+    """
+    approx = parse_size(args.approx_above) if args.approx_above else None
+    roots = [os.path.abspath(x) for x in requested] if abspath else list(requested)
+    signature = cache_signature(
+        roots, abspath, args.whitespace, exclusions.types, illegal_directories(), args.exclude, approx,
+        args.follow_symlinks, args.one_file_system
+    )
+    path = args.shard_file or 'part-{}-of-{}.xl'.format(shard.index, shard.count)
+    return PartialResultSink(path, shard, signature, list(requested), abspath)
+
+
+def merge_results(args, paths):
+    """
+        Opens the partial result files of every shard of a sharded scan
+        (xlines merge FILE [FILE ...])
+
+    Returns:
+        PartialResults object; raises ValueError if options which apply
+        only to a scan are given, or the files cannot be merged
+
+    """
+    scan_options = {
+        '--sum': isinstance(args.sum, list), '--files-from': args.files_from, '--cache': args.cache,
+        '--content-cache': args.content_cache, '--checkpoint': args.checkpoint, '--resume': args.resume,
+        '--dedupe-content': args.dedupe_content, '--deadline': args.deadline, '--estimate': args.estimate,
+        '--shard': args.shard, '--watch': args.watch, '--serve-metrics': args.serve_metrics,
+        '--follow-symlinks': args.follow_symlinks, '--one-file-system': args.one_file_system
+    }
+    given = [k for k, v in scan_options.items() if v]
+    if given:
+        raise ValueError('merge reports results already counted by each shard; remove {}'.format(', '.join(given)))
+    return PartialResults(paths)
+
+
+def open_listing(path):
+    """
+        Opens the file list named by --files-from ('-' reads stdin)
+
+    Returns:
+        binary file object
+
+    """
+    if path == '-':
+        return sys.stdin.buffer
+    return open(path, 'rb')
+
+
+def record_source(container, exclusions, args, abspath, io_fail, dircache=None, ccache=None, daemon=None,
+                  listing=None, deadline=None, dedupe=None, checkpoint=None, shard=None, merged=None):
+    """
+        Streams result records for all paths provided with --sum, or listed
+        by --files-from, from the directory cache or content cache when
+        enabled, or from a running xlinesd daemon; else by walking and
+        counting in-process.  With a Deadline, stops when time runs out;
+        with a ContentDedupe, each distinct content is counted once; with
+        a ScanCheckpoint, progress is saved and resumed; with a Shard, only
+        the file objects of the shard are counted.  With PartialResults
+        (xlines merge), streams the records counted by every shard
+
+    Returns:
+        generator object yielding result records (dict)
+
+    """
+    def cached_records():
+        # a deadline closes the stream early; the work done so far is kept
+        try:
+            for origin in container:
+                yield from dircache.records(origin, abspath)
+        finally:
+            io_fail.extend(dircache.io_fail)
+            dircache.save()
+            if ccache:
+                ccache.save()
+
+    def limit(paths):
+        return deadline.paths(paths) if deadline else paths
+
+    approx = parse_size(args.approx_above) if args.approx_above else None
+    expires = deadline.expires if deadline else None
+    # shard ownership is decided by path, before the binary test reads any file object
+    select = shard.owns if shard else None
+    traversal = {'follow_symlinks': args.follow_symlinks, 'one_file_system': args.one_file_system, 'select': select}
+
+    if merged:
+        records = merged.records()
+    elif listing:
+        paths = limit(filter_fileobjects(read_paths(listing, args.null), exclusions.types, args.exclude, not ccache,
+                                         select))
+        if ccache:
+            records = ccache.records(paths, args.whitespace, io_fail)
+        elif dedupe:
+            records = dedupe.records(paths, io_fail)
+        else:
+            records = record_stream(paths, args.whitespace, args.multiprocess, io_fail, approx, expires)
+    elif checkpoint:
+        records = checkpoint.records(
+            lambda paths, failed: record_stream(paths, args.whitespace, args.multiprocess, failed, approx), io_fail
+        )
+    elif dircache:
+        records = cached_records()
+    elif daemon:
+        records = daemon_records(daemon, container, args.whitespace, args.exclude, abspath, io_fail)
+    elif ccache:
+        paths = limit(iter_fileobjects(container, exclusions.types, args.exclude, abspath, binary=False, **traversal))
+        records = ccache.records(paths, args.whitespace, io_fail)
+    else:
+        paths = limit(iter_fileobjects(container, exclusions.types, args.exclude, abspath, **traversal))
+        if dedupe:
+            records = dedupe.records(paths, io_fail)
+        else:
+            records = record_stream(paths, args.whitespace, args.multiprocess, io_fail, approx, expires)
+
+    # streams counted from the deadline's walk end with it; drain what was counted
+    drain = bool(listing or not (checkpoint or dircache or daemon))
+    return deadline.records(records, drain) if deadline else records
+
+
 def remove_excluded(exclude_list, path_list):
     """Removes excluded paths from master path list"""
     rm = []
@@ -383,15 +618,94 @@ def init_cli():
     elif args.configure:
         main_menupage(ex_files, ex_dirs)
 
-    elif len(sys.argv) == 2 and (sys.argv[1] != '.'):
+    elif len(sys.argv) == 2 and (sys.argv[1] != '.') and not args.files_from:
         help_menu()
         sys.exit(exit_codes['EX_OK']['Code'])
 
     elif args.sum:
 
         ex = ExcludedTypes(ex_path=str(Path.home()) + '/.config/xlines/exclusions.list')
-        container = create_container(args.sum)
-        abspath = absolute_paths(container)
+        merged = None
+
+        if sys.argv[1] == 'merge':
+            # --- xlines merge FILE [FILE ...]: results of a sharded scan --
+            try:
+                merged = merge_results(args, unknown[1:])
+            except ValueError as e:
+                stdout_message(str(e), 'ERROR')
+                sys.exit(exit_codes['E_BADARG']['Code'])
+            requested = merged.roots
+            abspath = merged.abspath
+        else:
+            requested = create_container(args.sum if (isinstance(args.sum, list) or not args.files_from) else '.')
+            abspath = absolute_paths(requested)
+        container = coalesce_roots(requested)
+
+        # destinations (output files, checkpoint logs) are opened once every option is valid
+        try:
+            groups = [GroupBy(x) for x in args.groupby] + ([RootSummary(requested)] if args.per_root else [])
+            memory_limit = parse_size(args.memory_limit) if args.memory_limit else None
+            approx = parse_size(args.approx_above) if args.approx_above else None
+            ccache = ContentCache(args.content_cache) if args.content_cache else None
+            listing = open_listing(args.files_from) if args.files_from else None
+            dircache = None if listing else directory_cache(args, ex, ccache)
+            traversal = args.follow_symlinks or args.one_file_system
+            dedupe = ContentDedupe(args.whitespace, args.multiprocess, approx) if args.dedupe_content else None
+            checkpointing = bool(args.checkpoint or args.resume)
+            if checkpointing and (dircache or ccache or listing or dedupe):
+                raise ValueError('--checkpoint and --resume scans walk in-process; they cannot be combined with '
+                                 '--cache, --content-cache, --files-from, or --dedupe-content')
+            shard = Shard(*parse_shard(args.shard)) if args.shard else None
+            if shard and (dircache or checkpointing or dedupe or args.deadline):
+                raise ValueError('--shard scans count in-process and in full; they cannot be combined with '
+                                 '--cache, --checkpoint, --resume, --dedupe-content, or --deadline')
+            if shard and (args.watch or args.serve_metrics or args.estimate):
+                raise ValueError('--shard writes partial results of a full scan; --watch, --serve-metrics, '
+                                 'and --estimate are not sharded')
+            in_process = (dircache or ccache or listing or traversal or dedupe or checkpointing or shard or merged or
+                          approx)
+            metrics_address = parse_address(args.serve_metrics) if args.serve_metrics else None
+            if dircache and traversal:
+                raise ValueError('--cache walks do not support --follow-symlinks or --one-file-system')
+            if dedupe and (dircache or ccache):
+                raise ValueError('--dedupe-content cannot be combined with --cache or --content-cache')
+            if dedupe and args.deadline is not None:
+                raise ValueError('--dedupe-content groups every file object by size before counting; it cannot be '
+                                 'combined with --deadline')
+            if approx and (dircache or ccache):
+                raise ValueError('--cache and --content-cache hold exact counts; they cannot be combined with '
+                                 '--approx-above')
+            if approx is not None and approx <= 0:
+                raise ValueError('--approx-above must be a size greater than 0')
+            if args.top is not None and args.top <= 0:
+                raise ValueError('--top must be a positive number of file objects')
+            if args.max_depth is not None and args.max_depth < 0:
+                raise ValueError('--max-depth must be 0 (roots only) or greater')
+            if args.deadline is not None and args.deadline <= 0:
+                raise ValueError('--deadline must be a positive number of seconds')
+            if args.estimate is not None and not 0 < args.estimate <= 1:
+                raise ValueError('--estimate sample fraction must be greater than 0 and at most 1')
+            checkpoint = scan_checkpoint(args, container, abspath, ex) if checkpointing else None
+            sinks = create_sinks(args.output)
+            if shard:
+                sinks.append(shard_sink(args, shard, requested, abspath, ex))
+        except (ValueError, OSError) as e:
+            stdout_message(str(e), 'ERROR')
+            sys.exit(exit_codes['E_BADARG']['Code'])
+
+        # time budget starts once options are validated
+        deadline = Deadline(args.deadline) if args.deadline else None
+
+        if checkpoint:
+            # unwind on termination (instance reclaim, kill) so progress is saved
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+        # table output to the terminal unless another sink claims stdout
+        table = not any(x.stdout for x in sinks)
+
+        # the daemon counts for the table, ranked, rollup, and totals reports only
+        live = args.watch or metrics_address or args.estimate
+        daemon = None if (args.no_daemon or in_process or live) else connect()
 
         if args.debug:
             stdout_message(f'xlines command line option parameter detail', prefix='DEBUG')
@@ -401,14 +715,160 @@ def init_cli():
                 print('\t\to  {}'.format(i))
             print(f'\n\tcontainer is:\t{container}')
             print(f'\n\tobject "unknown" is:\t{unknown}')
+            print('\toutput sinks: {}'.format(args.output))
+            print('\tgroup-by keys: {}'.format(args.groupby))
             print('\tabspath bool is {}\n'.format(abspath))
+            print('\txlinesd daemon in use: {}\n'.format(daemon is not None))
             print('\tmultiprocess bool is {}\n'.format(args.multiprocess))
 
-        if args.multiprocess:
+        if args.watch:
+            # --- live table; recount files as they change --
+            io_fail = []
+            roots = [os.path.abspath(x) for x in container]
+            paths = iter_fileobjects(roots, ex.types, args.exclude)
+
+            try:
+                watch(
+                    container, ex.types, args.exclude, args.whitespace, abspath, MaxWidth(), _ct_threshold,
+                    record_stream(paths, args.whitespace, args.multiprocess, io_fail), io_fail
+                )
+            except OSError as e:
+                stdout_message(str(e), 'ERROR')
+                sys.exit(exit_codes['E_DEPENDENCY']['Code'])
+            sys.exit(exit_codes['EX_OK']['Code'])
+
+        elif metrics_address:
+            # --- Prometheus exposition; results kept current in memory --
+            exporter = MetricsExporter(container, ex.types, args.exclude, args.whitespace, args.refresh)
+            stdout_message('Serving line count metrics on http://{}:{}/metrics'.format(*metrics_address))
+
+            try:
+                serve_metrics(exporter, metrics_address)
+            except OSError as e:
+                stdout_message(str(e), 'ERROR')
+                sys.exit(exit_codes['E_BADARG']['Code'])
+            sys.exit(exit_codes['EX_OK']['Code'])
+
+        elif args.estimate:
+            # --- stratified sample estimate; metadata walk, sample read --
+            io_fail = []
+            estimate = TreeEstimate(args.estimate)
+            estimate.walk(container, ex.types, args.exclude, abspath)
+            estimate.sample(lambda paths: record_stream(paths, args.whitespace, args.multiprocess, io_fail))
+
+            if table:
+                print_estimate(estimate, MaxWidth().max_width, io_fail)
+            sys.exit(exit_codes['EX_OK']['Code'])
+
+        elif args.max_depth is not None:
+            # --- directory rollup; per-file results are never retained --
+            io_fail = []
+            rollup = DirectoryRollup(container, args.max_depth, abspath)
+
+            for record in record_source(container, ex, args, abspath, io_fail, dircache, ccache, daemon, listing,
+                                        deadline, dedupe, checkpoint, shard, merged):
+                for sink in sinks + groups + [rollup]:
+                    sink.write(record)
+
+            for sink in sinks:
+                sink.close()
+            partial = deadline.partial() if deadline else None
+
+            if table:
+                width = MaxWidth().calc_maxpath([x[0] for x in rollup.rows()])
+                print_rollup(rollup, width, _ct_threshold, args.sort or 'path', partial, io_fail)
+                print_groupby(groups, width, _ct_threshold)
+                if dedupe:
+                    print_duplicates(dedupe, width)
+            sys.exit(exit_codes['EX_OK']['Code'])
+
+        elif args.top:
+            # --- ranked results; bounded heap of size --top --
+            io_fail = []
+            top = TopN(args.top, args.sort or 'count')
+
+            for record in record_source(container, ex, args, abspath, io_fail, dircache, ccache, daemon, listing,
+                                        deadline, dedupe, checkpoint, shard, merged):
+                for sink in sinks + groups + [top]:
+                    sink.write(record)
+
+            for sink in sinks:
+                sink.close()
+            partial = deadline.partial() if deadline else None
+
+            if table:
+                width = MaxWidth().calc_maxpath([x['path'] for x in top.results()])
+                print_top(top, width, _ct_threshold, partial, io_fail)
+                print_groupby(groups, width, _ct_threshold)
+                if dedupe:
+                    print_duplicates(dedupe, width)
+            sys.exit(exit_codes['EX_OK']['Code'])
+
+        elif args.total:
+            # --- cumulative totals only --
+            io_fail = []
+            tcount, tobjects, tapprox = 0, 0, None
+
+            if dircache and not (sinks or groups or deadline):
+                for origin in container:
+                    count, objects = dircache.totals(origin)
+                    tcount, tobjects = tcount + count, tobjects + objects
+                io_fail.extend(dircache.io_fail)
+                dircache.save()
+            else:
+                for record in record_source(container, ex, args, abspath, io_fail, dircache, ccache, daemon, listing,
+                                            deadline, dedupe, checkpoint, shard, merged):
+                    tcount, tobjects = tcount + record['count'], tobjects + 1
+                    if 'approx' in record:
+                        tapprox = (tapprox or 0) + record['approx']
+                    for sink in sinks + groups:
+                        sink.write(record)
+
+            for sink in sinks:
+                sink.close()
+            partial = deadline.partial() if deadline else None
+
+            if table:
+                width = MaxWidth().max_width
+                print_footer(tcount, tobjects, width, partial, tapprox, io_fail)
+                print_groupby(groups, width, _ct_threshold)
+                if dedupe:
+                    print_duplicates(dedupe, width)
+            sys.exit(exit_codes['EX_OK']['Code'])
+
+        elif (memory_limit or approx or dircache or ccache or daemon or listing or deadline or traversal or dedupe or
+              checkpoint or shard or merged or args.sort in ('count', 'size')):
+            # --- sorted results; spill sorted runs to disk at --memory-limit --
+            io_fail = []
+            mw = MaxWidth()
+            width = mw.max_width
+            ordered = SpillSorter(args.sort or 'path', memory_limit)
+
+            for record in record_source(container, ex, args, abspath, io_fail, dircache, ccache, daemon, listing,
+                                        deadline, dedupe, checkpoint, shard, merged):
+                width = mw.calc_maxpath([record['path']])
+                for sink in sinks + groups + [ordered]:
+                    sink.write(record)
+
+            for sink in sinks:
+                sink.close()
+            partial = deadline.partial() if deadline else None
+
+            if table:
+                print_top(ordered, width, _ct_threshold, partial, io_fail)
+                print_groupby(groups, width, _ct_threshold)
+                if dedupe:
+                    print_duplicates(dedupe, width)
+            sys.exit(exit_codes['EX_OK']['Code'])
+
+        elif args.multiprocess:
             # --- run with concurrency --
             width, paths = longest_path(container, ex)
             paths = remove_excluded(args.exclude, paths)
-            multiprocessing_main(paths, width, _ct_threshold, args.whitespace, ex, args.debug)
+            multiprocessing_main(paths, width, _ct_threshold, args.whitespace, ex, args.debug, sinks + groups, table)
+
+            if table:
+                print_groupby(groups, width, _ct_threshold)
 
         elif not args.multiprocess:
 
@@ -418,14 +878,17 @@ def init_cli():
 
             paths = remove_excluded(args.exclude, paths)
 
-            print_header(width)
+            if table:
+                print_header(width)
             count_width = local_config['OUTPUT']['COUNT_COLUMN_WIDTH']
 
-            for path in paths:
+            # stalled file objects are abandoned (see watched_counts)
+            for record in iter_records(paths, args.whitespace, io_fail):
 
                 try:
 
-                    inc = linecount(path, args.whitespace)
+                    path = record['path']
+                    inc = record['count']
                     highlight = acct if inc > _ct_threshold else cm.aqu
                     tcount += inc    # total line count
                     tobjects += 1    # increment total number of objects
@@ -455,9 +918,14 @@ def init_cli():
 
                     # format tabular line totals with commas
                     output_str = f'{tab4}{lpath}{div}{fname}{tab}{ct_format}{"{:,}".format(inc):>10}{rst}'
-                    print(output_str)
 
-                    if args.debug:
+                    for sink in sinks + groups:
+                        sink.write(record)
+
+                    if table:
+                        print(output_str)
+
+                    if args.debug and table:
                         print(tab4*2 + 'lpath is {}'.format(lpath))
                         print(tab4*2 + 'fname is {}\n'.format(fname))
 
@@ -465,7 +933,12 @@ def init_cli():
                     io_fail.append(path)
                     continue
 
-            print_footer(tcount, tobjects, width)
+            for sink in sinks:
+                sink.close()
+
+            if table:
+                print_footer(tcount, tobjects, width, skipped=io_fail)
+                print_groupby(groups, width, _ct_threshold)
 
             if args.debug:
                 tab4 = '\t'.expandtabs(4)
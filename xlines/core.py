@@ -7,11 +7,16 @@
 import os
 import sys
 import re
+import stat
+import time
 import inspect
 import logging
+import itertools
+import threading
 from shutil import which
 from xlines.colors import Colors
 from xlines.statics import local_config
+from xlines.inodes import InodeSet
 from xlines._version import __version__
 from xlines.variables import *
 
@@ -60,7 +65,8 @@ def absolute_paths(path_list):
 
 def is_binary_external(filepath):
     try:
-        f = open(filepath, 'rb').read(1024)
+        with open_fileobject(filepath, 'rb') as f1:
+            f = f1.read(1024)
         textchars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
         fx = lambda bytes: bool(bytes.translate(None, textchars))
     except Exception:
@@ -68,10 +74,147 @@ def is_binary_external(filepath):
     return fx(f)
 
 
+# seconds a file object may take to count, plus its size at MIN_READ_RATE
+IO_TIMEOUT = 30
+MIN_READ_RATE = 4194304
+
+# seconds between watchdog checks of the file object being counted
+WATCH_POLL = 0.5
+
+# file objects counted per watched batch
+WATCH_BATCH = 256
+
+# paths of skipped file objects listed beneath the totals
+SKIPPED_SHOWN = 10
+
+
+def open_fileobject(path, mode='r'):
+    """
+        Opens a file object for reading without blocking.  A FIFO without
+        a writer, a socket, or a device node is refused instead of waited
+        on or read
+
+    Returns:
+        file object; raises OSError when path is not a regular file
+
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NONBLOCK', 0) | getattr(os, 'O_NOCTTY', 0))
+    try:
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            raise OSError('Not a regular file: {}'.format(path))
+        return open(fd, mode)
+    except BaseException:
+        os.close(fd)
+        raise
+
+
 def linecount(path, whitespace=True):
+    with open_fileobject(path) as f1:
+        lines = f1.readlines()
     if whitespace:
-        return len(open(path).readlines())
-    return len(list(filter(lambda x: x != '\n', open(path).readlines())))
+        return len(lines)
+    return len(list(filter(lambda x: x != '\n', lines)))
+
+
+def count_record(path, whitespace=True, approx=None):
+    """
+        Line count of a single file object, packaged with the file metadata
+        taken from the descriptor opened for counting (fstat, no extra path
+        lookup or read i/o)
+
+    Args:
+        :path (str): filesystem path to a file object
+        :whitespace (bool): when False, omit whitespace lines from count
+        :approx (int): size in bytes at or above which the line count is
+            estimated by block sampling (see sample_lines); None is exact
+
+    Returns:
+        result record, TYPE: dict
+        Format:
+
+        .. code-block:: json
+
+                {
+                    'path': '/var/lib/dpkg/info/xtrans-dev.list',
+                    'count': 531,
+                    'size': 24018,
+                    'mtime': 1577836800,
+                    'uid': 1000
+                }
+
+        Estimated counts add 'approx':  the 95% error bound in lines
+
+    """
+    with open_fileobject(path) as f1:
+        st = os.fstat(f1.fileno())
+        if approx is not None and st.st_size >= approx:
+            count, error = sample_lines(f1.fileno(), st.st_size, whitespace)
+            return {
+                'path': path,
+                'count': count,
+                'size': st.st_size,
+                'mtime': int(st.st_mtime),
+                'uid': st.st_uid,
+                'approx': error
+            }
+        lines = f1.readlines()
+    return {
+        'path': path,
+        'count': len(lines) if whitespace else len([x for x in lines if x != '\n']),
+        'size': st.st_size,
+        'mtime': int(st.st_mtime),
+        'uid': st.st_uid
+    }
+
+
+# block sampling of giant files:  number of blocks read, bytes per block
+SAMPLE_BLOCKS = 64
+SAMPLE_BLOCK_SIZE = 65536
+
+
+def sample_lines(fd, size, whitespace=True, blocks=SAMPLE_BLOCKS, block_size=SAMPLE_BLOCK_SIZE):
+    """
+        Estimates the line count of a large file object from the newline
+        density of evenly spaced blocks read with pread
+
+    Args:
+        :fd (int): open file descriptor
+        :size (int): size of the file object in bytes
+        :whitespace (bool): when False, omit empty lines from the estimate
+
+    Returns:
+        (estimated line count, 95% error bound in lines), TYPE: tuple;
+        (0, 0) when no data is read (empty, or truncated since its stat)
+
+    """
+    blocks = max(1, min(blocks, size // block_size))
+    stride = (size - block_size) / max(blocks - 1, 1)
+    densities = []
+
+    for i in range(blocks):
+        offset = int(i * stride)
+        if hasattr(os, 'pread'):
+            data = os.pread(fd, block_size, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            data = os.read(fd, block_size)
+        if not data:
+            continue
+        lines = data.count(b'\n')
+        if not whitespace:
+            lines -= len(re.findall(b'(?<=\n)\r?\n', data))
+        densities.append(lines / len(data))
+
+    n = len(densities)
+    if not n:
+        return 0, 0
+    mean = sum(densities) / n
+    variance = sum((x - mean) ** 2 for x in densities) / (n - 1) if n > 1 else 0.0
+
+    # finite population correction:  fraction of the file read
+    fpc = max(0.0, 1 - n * block_size / size)
+    error = 1.96 * (variance * fpc / n) ** 0.5 * size
+    return int(round(mean * size)), int(round(error))
 
 
 def remove_duplicates(duplicates):
@@ -97,6 +240,62 @@ def dedup(d):
     return [x for x in dedup(duplicates)]
 
 
+def is_binary(filepath):
+    """True if the first 1KB of a file object contains non-text bytes"""
+    try:
+        with open_fileobject(filepath, 'rb') as f1:
+            f = f1.read(1024)
+        textchars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+        fx = lambda bytes: bool(bytes.translate(None, textchars))
+        return fx(f)
+    except Exception:
+        return True
+
+
+def illegal_directories():
+    """
+        Directory names excluded from line counts (directories.list)
+
+    Returns:
+        excluded directory names, TYPE: list; the defaults when no
+        directories.list is configured or readable (library use, where
+        the command line setup of ~/.config/xlines has not run)
+
+    """
+    try:
+        with open(local_config['EXCLUSIONS']['EX_DIR_PATH']) as f1:
+            return [x.strip() for x in f1.readlines()]
+    except (KeyError, OSError):
+        return ['pycache', 'venv']
+
+
+def is_legal(fpath, illegal, illegal_dirs, binary=True):
+    """
+        Tests a single file object against directory, file type,
+        and binary content exclusions
+
+    Args:
+        :fpath (str): filesystem path ending with a file object
+        :illegal (list): file type extensions to be excluded
+        :illegal_dirs (list): directory names to be excluded
+        :binary (bool): when False, skip the binary content test
+
+    Returns:
+        True if file object is countable, TYPE: bool
+
+    """
+    fobject = os.path.split(fpath)[1]
+
+    # filter for illegal dirs first, then files, then binary
+    if list(filter(lambda x: x in fpath, illegal_dirs)):
+        return False
+
+    elif ('.' in fobject) and ('.' + fobject.split('.')[1] in illegal):
+        return False
+
+    return not (binary and is_binary(fpath))
+
+
 def remove_illegal(d, illegal):
     """
         Removes excluded file types
@@ -108,46 +307,310 @@ def remove_illegal(d, illegal):
     Returns:
         legal filesystem paths (str)
     """
-    def parse_list(path):
-        """Reads in list from file object"""
-        with open(path) as f1:
-            return [x.strip() for x in f1.readlines()]
+    illegal_dirs = illegal_directories()
+    return sorted(set(x for x in d if is_legal(x, illegal, illegal_dirs)))
 
-    def is_binary(filepath):
-        try:
-            f = open(filepath, 'rb').read(1024)
-            textchars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
-            fx = lambda bytes: bool(bytes.translate(None, textchars))
-            return fx(f)
-        except Exception:
-            return True
 
-    bad = []
+def iter_fileobjects(container, illegal, exclude=[], abspath=True, binary=True, follow_symlinks=False,
+                     one_file_system=False, select=None):
+    """
+    Summary.
 
-    try:
-        illegal_dirs = parse_list(local_config['EXCLUSIONS']['EX_DIR_PATH'])
-    except KeyError:
-        illegal_dirs = ['pycache', 'venv']
+        Streams countable file objects beneath each path provided. Applies
+        the same exclusions as remove_illegal and remove_excluded one path
+        at a time so the full list of paths is never held in memory
+
+    Args:
+        :container (list): filesystem paths (files or directories)
+        :illegal (list): file type extensions to be excluded
+        :exclude (list): path substrings to be excluded (--exclude)
+        :abspath (bool): yield absolute paths when True
+        :binary (bool): when False, binary content is not tested (left to
+            a consumer which reads the file object anyway)
+        :follow_symlinks (bool): descend symbolic links to directories
+        :one_file_system (bool): do not cross from a root onto other devices
+        :select (callable): when provided, only paths for which select(path)
+            is True are tested and yielded, such as Shard.owns; applied
+            before any file object is read
+
+    Returns:
+        generator object yielding filesystem paths (str); each physical
+        file object at most once across all roots
+
+    """
+    illegal_dirs = illegal_directories()
+    seen = InodeSet()
+
+    for origin in container:
+        for fpath in walk_fileobjects(origin, abspath, follow_symlinks, one_file_system, seen):
+            if any(x in fpath for x in exclude) or (select and not select(fpath)):
+                continue
+            if is_legal(fpath, illegal, illegal_dirs, binary):
+                yield fpath
+
+
+def is_beneath(path, ancestor):
+    """True if path lies strictly beneath the directory ancestor"""
+    return path.startswith(ancestor.rstrip(os.sep) + os.sep)
+
+
+def coalesce_roots(container):
+    """
+        Reduces the paths provided with --sum to the minimal set of roots
+        to walk:  duplicates (after normalization, including symlinks)
+        are dropped and roots nested beneath another directory root are
+        folded into it, so no file object is walked or counted twice
+
+    Args:
+        :container (list): filesystem paths (files or directories)
+
+    Returns:
+        roots to walk as provided, in order of first appearance, TYPE: list
+
+    """
+    real = [(os.path.realpath(x), x) for x in container]
+    dirs = [r for r, x in real if os.path.isdir(x)]
+    roots, seen = [], set()
+
+    for rpath, root in real:
+        if rpath in seen or any(is_beneath(rpath, d) for d in dirs):
+            continue
+        seen.add(rpath)
+        roots.append(root)
+    return roots
+
+
+def read_paths(stream, nul=False, bufsize=65536):
+    """
+        Streams filesystem paths from a file list such as the output of
+        git ls-files, find -print0, or a build system, reading one buffer
+        at a time so the list is never held in memory
+
+    Args:
+        :stream (file): binary file object (or sys.stdin.buffer)
+        :nul (bool): paths are NUL delimited (-z, -print0) when True,
+            else newline delimited
 
-    # filter for illegal or binary file object
-    for fpath in d:
+    Returns:
+        generator object yielding filesystem paths (str)
+
+    """
+    sep = b'\0' if nul else b'\n'
+    tail = b''
+
+    while True:
+        chunk = stream.read(bufsize)
+        if not chunk:
+            break
+        items = (tail + chunk).split(sep)
+        tail = items.pop()
+        for item in items:
+            if not nul:
+                item = item.rstrip(b'\r')
+            if item:
+                yield os.fsdecode(item)
+
+    if tail and not nul:
+        tail = tail.rstrip(b'\r')
+    if tail:
+        yield os.fsdecode(tail)
+
+
+def filter_fileobjects(paths, illegal, exclude=[], binary=True, select=None):
+    """
+        Applies the exclusions of iter_fileobjects to a stream of listed
+        paths without walking directories; paths which are not regular
+        files are dropped
+
+    Args:
+        :paths (iter): filesystem paths, such as returned by read_paths
+        :illegal (list): file type extensions to be excluded
+        :exclude (list): path substrings to be excluded (--exclude)
+        :binary (bool): when False, binary content is not tested
+        :select (callable): as for iter_fileobjects
+
+    Returns:
+        generator object yielding filesystem paths (str)
+
+    """
+    illegal_dirs = illegal_directories()
+
+    for fpath in paths:
+        if any(x in fpath for x in exclude) or '.git' in os.path.dirname(fpath):
+            continue
+        if select and not select(fpath):
+            continue
+        if os.path.isfile(fpath) and is_legal(fpath, illegal, illegal_dirs, binary):
+            yield fpath
+
+
+class _Runner(threading.Thread):
+    """
+        Applies a function to a batch of items, publishing the item in
+        progress.  current, results, and abandoned change together under
+        lock, so an item is either finished or abandoned, never both
+    """
+    def __init__(self, func, items, start, size, expires=None):
+        super().__init__(daemon=True)
+        self.func = func
+        self.items = items
+        self.size = size
+        self.expires = expires
+        self.lock = threading.Lock()
+        self.current = (start, time.monotonic(), IO_TIMEOUT)    # (index, started, seconds allowed)
+        self.results = []
+        self.abandoned = False
+        self.expired = False
+        self.finished = threading.Event()
+
+    def timed_out(self):
+        """
+            Abandons the item in progress when it has run past its
+            allowance; the thread stops once its current read returns
+
+        Returns:
+            index of the item abandoned | None
+
+        """
+        with self.lock:
+            index, started, allowed = self.current
+            if self.finished.is_set() or time.monotonic() - started <= allowed:
+                return None
+            self.abandoned = True
+            return index
+
+    def run(self):
+        for i in range(self.current[0], len(self.items)):
+            if self.expires is not None and time.monotonic() >= self.expires:
+                self.expired = True
+                break
+            item = self.items[i]
+            with self.lock:
+                if self.abandoned:
+                    return
+                self.current = (i, time.monotonic(), IO_TIMEOUT)
+            try:
+                # the stat is watched with IO_TIMEOUT; the read with its size allowance
+                allowed = IO_TIMEOUT + self.size(item) / MIN_READ_RATE
+                with self.lock:
+                    self.current = (i, self.current[1], allowed)
+                result = self.func(item)
+            except Exception:
+                result = None
+            with self.lock:
+                if self.abandoned:
+                    return
+                self.results.append((item, result))
+        with self.lock:
+            self.finished.set()
+
+
+def watched_counts(func, items, size=None, expires=None):
+    """
+        Applies func to each item of a batch in a helper thread watched
+        for stalls.  An item which takes longer than IO_TIMEOUT seconds
+        plus its size at MIN_READ_RATE (a FIFO, a hung network mount) is
+        abandoned along with its thread; the rest of the batch continues
+        in a new thread
+
+    Args:
+        :func (callable): func(item) -> result
+        :items (list): filesystem paths, or items for which size is given
+        :size (callable): size(item) -> bytes (DEFAULT: os.stat size)
+        :expires (float): time.monotonic() deadline; items not started
+            by then are left out of the results (not failed)
+
+    Returns:
+        [(item, result | None)], TYPE: list; None where func raised or
+        the item was abandoned
+
+    """
+    size = size or (lambda x: os.stat(x).st_size)
+    results, start = [], 0
+
+    while start < len(items):
+        runner = _Runner(func, items, start, size, expires)
+        runner.start()
+
+        stalled = None
+        while stalled is None and not runner.finished.wait(WATCH_POLL):
+            stalled = runner.timed_out()
+
+        with runner.lock:
+            done = list(runner.results)
+        results.extend(done)
+        start += len(done)
+        if stalled is None:
+            break
+
+        logger.warning('%s: abandoned stalled file object %s' % (inspect.stack()[0][3], items[stalled]))
+        results.append((items[stalled], None))
+        start = stalled + 1
+    return results
+
+
+# bytes per second assumed when deciding whether a file object can be
+# counted in the time remaining before a deadline
+DEADLINE_READ_RATE = 67108864
+
+
+def deadline_approx(approx, expires):
+    """
+        Size in bytes at or above which a count started now is estimated.
+        Before a deadline, a file object which cannot be read in the time
+        remaining at DEADLINE_READ_RATE is estimated by block sampling
+        (see sample_lines) rather than delaying the results; file objects
+        no larger than the blocks sampled are always counted
+
+    Args:
+        :approx (int): size threshold of --approx-above; None when exact
+        :expires (float): time.monotonic() deadline; None when unlimited
+
+    Returns:
+        size threshold (int) | None when every count is exact
+
+    """
+    if expires is None:
+        return approx
+    budget = max(int((expires - time.monotonic()) * DEADLINE_READ_RATE), SAMPLE_BLOCKS * SAMPLE_BLOCK_SIZE)
+    return budget if approx is None else min(approx, budget)
+
+
+def iter_records(paths, whitespace=True, io_fail=None, approx=None, expires=None):
+    """
+        Sequential line count of a stream of file objects.  File objects
+        whose reads stall are abandoned (see watched_counts)
 
-        fobject = os.path.split(fpath)[1]
+    Args:
+        :paths (iter): filesystem paths of file objects
+        :whitespace (bool): when False, omit whitespace lines from count
+        :io_fail (list): when provided, collects paths which failed to count
+        :approx (int): size in bytes at or above which counts are estimated
+        :expires (float): time.monotonic() deadline; no count is started
+            after it, and larger file objects are estimated to meet it
+            (see deadline_approx)
 
-        # filter for illegal dirs first, then files, then binary
-        if list(filter(lambda x: x in fpath, illegal_dirs)):
-            bad.append(fpath)
+    Returns:
+        generator object yielding result records (dict)
 
-        elif ('.' in fobject) and ('.' + fobject.split('.')[1] in illegal):
-            bad.append(fpath)
+    """
+    paths = iter(paths)
 
-        if is_binary(fpath):
-            bad.append(fpath)
+    def count(path):
+        return count_record(path, whitespace, deadline_approx(approx, expires))
 
-    return sorted(list(set(d) - set(bad)))
+    while True:
+        batch = list(itertools.islice(paths, WATCH_BATCH))
+        if not batch:
+            break
+        for path, record in watched_counts(count, batch, expires=expires):
+            if record is not None:
+                yield record
+            elif io_fail is not None:
+                io_fail.append(path)
 
 
-def locate_fileobjects(origin, abspath=True):
+def locate_fileobjects(origin, abspath=True, follow_symlinks=False, one_file_system=False):
     """
     Summary.
 
@@ -156,6 +619,8 @@ def locate_fileobjects(origin, abspath=True):
     Args:
         - origin (str): filesystem directory location
         - abspath (bool): return absolute paths relative to current cursor position
+        - follow_symlinks (bool): descend symbolic links to directories
+        - one_file_system (bool): skip directories on a device other than origin's
 
     Returns:
         - paths, TYPE: list
@@ -174,49 +639,148 @@ def locate_fileobjects(origin, abspath=True):
                 ]
 
     """
-    def relpath_normalize(path):
-        """
-        Prepends correct relative filesystem syntax if analyzed pwd
-        """
-        if pattern_hidden.match(path) or pattern_asci.match(path):
-            return './' + path
-        elif path.startswith('..'):
-            return path
+    return remove_duplicates(list(walk_fileobjects(origin, abspath, follow_symlinks, one_file_system)))
 
-    pattern_hidden = re.compile('^.[a-z]+')                    # hidden file (.xyz)
-    pattern_asci = re.compile('^[a-z]+', re.IGNORECASE)        # standalone, regular file
-    fobjects = []
 
-    if os.path.isfile(origin):
-        return [origin]
+pattern_hidden = re.compile('^.[a-z]+')                    # hidden file (.xyz)
+pattern_asci = re.compile('^[a-z]+', re.IGNORECASE)        # standalone, regular file
+
+
+def relpath_normalize(path):
+    """
+    Prepends correct relative filesystem syntax if analyzed pwd
+    """
+    if pattern_hidden.match(path) or pattern_asci.match(path):
+        return './' + path
+    return path
 
-    for root, dirs, files in os.walk(origin):
-        for file in [f for f in files if '.git' not in root]:
-            try:
 
-                if abspath:
-                    # absolute paths (default)
-                    _path = os.path.abspath(os.path.join(root, file))
-                else:
-                    # relative paths (optional)
-                    _path = os.path.relpath(os.path.join(root, file))
-                    _path = relpath_normalize(_path)
-
-                fobjects.append(_path)
-
-            except OSError:
-                logger.exception(
-                    '%s: Read error while examining local filesystem path (%s)' %
-                    (inspect.stack()[0][3], _path)
-                )
+def list_directory(root, dev, device, seen, follow_symlinks=False, one_file_system=False):
+    """
+        Lists one directory of a walk (see walk_fileobjects).  File
+        objects and subdirectories not walked already are added to seen
+
+    Args:
+        - root (str): directory path
+        - dev (int): device of root
+        - device (int): device of the walk's origin
+        - seen (InodeSet): (device, inode) of objects already walked
+        - follow_symlinks (bool): descend symbolic links to directories
+        - one_file_system (bool): skip directories on a device other than device
+
+    Returns:
+        (file object paths, [(subdirectory path, device)], symbolic link
+        paths), TYPE: tuple; empty when root cannot be listed
+
+    """
+    files, subdirs, links = [], [], []
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return files, subdirs, links
+
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                if entry.is_symlink() and not follow_symlinks:
+                    continue
+                st = entry.stat()
+                if one_file_system and st.st_dev != device:
+                    continue
+                if '.git' not in entry.path and seen.add(st.st_dev, st.st_ino):
+                    subdirs.append((entry.path, st.st_dev))
+            elif '.git' in root:
                 continue
-    return remove_duplicates(fobjects)
+            elif entry.is_symlink():
+                # after the walk, so a file object reached by its own path is yielded there
+                links.append(entry.path)
+            elif not entry.is_file(follow_symlinks=False):
+                # FIFO, socket, or device node (directory entry type; no stat)
+                continue
+            elif seen.add(dev, entry.inode()):
+                files.append(entry.path)
+
+        except OSError:
+            logger.exception(
+                '%s: Read error while examining local filesystem path (%s)' %
+                (inspect.stack()[0][3], entry.path)
+            )
+            continue
+    return files, subdirs, links
 
 
-def print_header(w):
+def linked_fileobject(path, seen):
+    """
+        True when the symbolic link path leads to a regular file object
+        not walked already (added to seen), or dangles (fails when counted)
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return True
+    return stat.S_ISREG(st.st_mode) and seen.add(st.st_dev, st.st_ino)
+
+
+def walk_fileobjects(origin, abspath=True, follow_symlinks=False, one_file_system=False, seen=None):
+    """
+        Generator form of locate_fileobjects; yields file object paths
+        while walking beneath origin.  Each physical file object is yielded
+        once:  hard links and symbolic links to a file object already
+        yielded are skipped, as are directories already walked (symbolic
+        link cycles, bind mounts of a walked directory)
+
+    Args:
+        - origin (str): filesystem directory location
+        - abspath (bool): return absolute paths relative to current cursor position
+        - follow_symlinks (bool): descend symbolic links to directories
+        - one_file_system (bool): skip directories on a device other than origin's
+        - seen (InodeSet): (device, inode) of objects already walked; share
+          one between roots to yield each physical file object once
+
+    Returns:
+        generator object yielding filesystem paths (str)
+
+    """
+    seen = InodeSet() if seen is None else seen
+
+    try:
+        st = os.stat(origin)
+    except OSError:
+        return
+
+    if not seen.add(st.st_dev, st.st_ino):
+        return
+
+    if os.path.isfile(origin):
+        yield origin
+        return
+
+    def display(path):
+        if abspath:
+            # absolute paths (default)
+            return os.path.abspath(path)
+        # relative paths (optional)
+        return relpath_normalize(os.path.relpath(path))
+
+    device = st.st_dev
+    stack = [(origin, device)]
+    links = []
+
+    while stack:
+        root, dev = stack.pop()
+        files, subdirs, dirlinks = list_directory(root, dev, device, seen, follow_symlinks, one_file_system)
+        for path in files:
+            yield display(path)
+        links.extend(dirlinks)
+        stack.extend(reversed(subdirs))
+
+    for path in links:
+        if linked_fileobject(path, seen):
+            yield display(path)
+
+
+def print_header(w, header_lhs='object', header_rhs='line count'):
     total_width = w + local_config['OUTPUT']['COUNT_COLUMN_WIDTH'] + 1
-    header_lhs = 'object'
-    header_rhs = 'line count'
     tab = '\t'.expandtabs(total_width - len(header_lhs) - len(header_rhs))
     tab4 = '\t'.expandtabs(4)
     print(tab4 + (horiz * (total_width)))
@@ -224,18 +788,30 @@ def print_header(w):
     print(tab4 + (horiz * (total_width)))
 
 
-def print_footer(total, object_count, w):
+def print_footer(total, object_count, w, partial=None, approx=None, skipped=None):
     """
     Print total number of objects and cumulative total line count
+
+    Args:
+        :partial (tuple): when results are incomplete (--deadline),
+            (estimated total line count | None, fraction of bytes stat'ed
+            which were counted | None)
+        :approx (int): summed error bound in lines of the estimated counts
+            (--approx-above) included in total; None when all are exact.
+            The total is then marked with '~'
+        :skipped (list): paths of file objects which could not be counted
+            (unreadable, or abandoned when stalled); the number skipped
+            and the first SKIPPED_SHOWN paths are printed beneath the total
     """
     total_width = w + local_config['OUTPUT']['COUNT_COLUMN_WIDTH'] + 1
 
     # add commas
     total_lines = '{:,}'.format(object_count)
+    marker = '' if approx is None else '~'
 
     # calc dimensions; no color codes
     msg = 'Total ({} objects):'.format(total_lines)
-    tab = '\t'.expandtabs(total_width - len(msg) - len(str(total)) - 1)
+    tab = '\t'.expandtabs(total_width - len(msg) - len(marker + str(total)) - 1)
 
     # redefine with color codes added
     msg = f'Total ({title + "{:,}".format(object_count) + rst} objects):'
@@ -245,4 +821,23 @@ def print_footer(total, object_count, w):
     print(tab4 + (horiz * (total_width)))
 
     # ending summary stats line
-    print(f'{tab4}{msg}{tab}{highlight + "{:,}".format(total) + rst:>10}' + '\n')
+    print(f'{tab4}{msg}{tab}{highlight + marker + "{:,}".format(total) + rst:>10}')
+
+    if partial is not None:
+        estimate, fraction = partial
+        seen = '' if fraction is None else '; {:.1%} of bytes stat\'ed were counted'.format(fraction)
+        print(f'{tab4}{yl}PARTIAL{rst} (deadline reached{seen})')
+
+        if estimate is not None:
+            msg = 'Estimated total:'
+            value = '~{:,}'.format(estimate)
+            tab = '\t'.expandtabs(total_width - len(msg) - len(value) + 1)
+            print(f'{tab4}{msg}{tab}{yl}{value}{rst}')
+
+    if skipped:
+        print(f'{tab4}{yl}SKIPPED{rst} ({len(skipped):,} objects unreadable or stalled; not counted)')
+        for path in sorted(skipped)[:SKIPPED_SHOWN]:
+            print(f'{tab4 * 2}{path}')
+        if len(skipped) > SKIPPED_SHOWN:
+            print(f'{tab4 * 2}... {len(skipped) - SKIPPED_SHOWN:,} more')
+    print()
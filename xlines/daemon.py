@@ -0,0 +1,350 @@
+"""
+Summary.
+
+    Daemon Module -- xlinesd background process answering line count
+    requests over a local Unix domain socket
+
+    The daemon keeps the state a cold xlines run rebuilds on every call:
+    parsed exclusion lists (reloaded only when the list files change), a
+    pre-forked worker pool, and an in-memory directory cache per set of
+    count options.  Repeat requests on the same tree list each directory
+    and stat each file, recounting only files whose identity changed.
+
+    Protocol (one request per connection, newline delimited JSON):
+
+        request:    {"op": "count", "paths": [...], "whitespace": true, "exclude": [...]}
+        response:   {"record": {...}}  (one line per file object)
+                    {"done": true, "io_fail": [...]}
+
+        request:    {"op": "status"}  |  {"op": "stop"}
+
+    Paths in requests and results are absolute.  The xlines CLI uses the
+    daemon when its socket accepts a connection and falls back to
+    in-process counting otherwise
+
+Module Classes:
+    :XlinesDaemon:  warm count state shared by all requests
+
+Module Functions:
+    :connect:  client connection to a running daemon, if any
+    :daemon_records:  client side stream of result records
+    :init_daemon:  xlinesd entry point
+
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+import multiprocessing
+from xlines import logger
+from xlines.statics import local_config
+from xlines.usermessage import stdout_message
+from xlines.core import count_record, illegal_directories, is_legal, relpath_normalize
+from xlines.exclusions import ExcludedTypes
+from xlines.dircache import DirectoryCache, cache_signature
+from xlines.mp import _count_batch, cpu_cores
+
+try:
+    from xlines.oscodes_unix import exit_codes
+except Exception:
+    from xlines.oscodes_win import exit_codes         # non-specific os-safe codes
+
+
+# paths per directory below which counting stays in the request thread
+POOL_THRESHOLD = 16
+
+
+def socket_path():
+    """Filesystem location of the daemon's Unix domain socket"""
+    return os.path.join(local_config['CONFIG']['CONFIG_DIR'], 'xlinesd.sock')
+
+
+def connect(path=None, timeout=0.5):
+    """
+        Connects to a running daemon
+
+    Returns:
+        connected socket object | None when no daemon is listening
+
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path or socket_path())
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def request(sock, message):
+    """
+        Sends one request; streams the decoded response lines
+
+    Returns:
+        generator object yielding response messages (dict)
+
+    """
+    with sock, sock.makefile('r', encoding='utf-8') as f1:
+        sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+        for line in f1:
+            yield json.loads(line)
+
+
+def daemon_records(sock, container, whitespace=True, exclude=[], abspath=True, io_fail=None):
+    """
+        Client side equivalent of walking and counting each path of the
+        container in-process; results are counted by the daemon
+
+    Args:
+        :sock (socket): connection returned by connect()
+        :container (list): filesystem paths (files or directories)
+        :whitespace (bool): when False, omit whitespace lines from count
+        :exclude (list): path substrings to be excluded (--exclude)
+        :abspath (bool): yield absolute paths when True, else relative
+        :io_fail (list): when provided, collects paths which failed
+
+    Returns:
+        generator object yielding result records (dict)
+
+    """
+    # file objects named directly are reported as given
+    named = {os.path.abspath(x): x for x in container if os.path.isfile(x)}
+    message = {
+        'op': 'count',
+        'paths': [os.path.abspath(x) for x in container],
+        'whitespace': whitespace,
+        'exclude': exclude
+    }
+
+    def display(path):
+        if path in named:
+            return named[path]
+        return path if abspath else relpath_normalize(os.path.relpath(path))
+
+    for response in request(sock, message):
+        if 'record' in response:
+            record = response['record']
+            record['path'] = display(record['path'])
+            yield record
+        elif 'error' in response:
+            logger.warning('daemon_records: xlinesd request failed: {}'.format(response['error']))
+        elif response.get('done'):
+            if io_fail is not None:
+                io_fail.extend(display(x) for x in response['io_fail'])
+            return
+
+
+class XlinesDaemon():
+    """
+        Warm count state shared by all requests served by the daemon
+    """
+    def __init__(self, jobs=None):
+        """
+        Args:
+            :jobs (int): number of pre-forked worker processes
+                (DEFAULT: up to 4 cores)
+        """
+        self.pool = multiprocessing.Pool(jobs or (4 if cpu_cores() >= 4 else cpu_cores()))
+        self.lock = threading.Lock()
+        self.caches = {}            # signature -> (DirectoryCache, lock)
+        self.stamps = None          # mtimes of exclusion lists in use
+        self.types = []
+        self.illegal_dirs = []
+        self.started = time.time()
+        self.requests = 0
+
+    def _exclusions(self):
+        """Exclusion lists; reparsed only when a list file has changed"""
+        lists = (local_config['EXCLUSIONS']['EX_EXT_PATH'], local_config['EXCLUSIONS']['EX_DIR_PATH'])
+        stamps = []
+        for path in lists:
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+
+        if stamps != self.stamps:
+            self.types = ExcludedTypes(lists[0], []).types
+            self.illegal_dirs = illegal_directories()
+            self.caches = {}
+            self.stamps = stamps
+        return self.types, self.illegal_dirs
+
+    def _mapper(self, whitespace):
+        def mapper(paths):
+            if len(paths) < POOL_THRESHOLD:
+                results = [_count_batch((paths, whitespace, None, None))]
+            else:
+                tasks = [(paths[i:i + 8], whitespace, None, None) for i in range(0, len(paths), 8)]
+                results = self.pool.imap(_count_batch, tasks)
+            for batch in results:
+                for path, record in batch:
+                    yield path, (False if record is None else record)
+        return mapper
+
+    def cache(self, whitespace, exclude):
+        """
+        Returns:
+            (DirectoryCache, lock) for the count options provided
+
+        """
+        with self.lock:
+            types, illegal_dirs = self._exclusions()
+            signature = cache_signature(whitespace, types, illegal_dirs, exclude)
+
+            if signature not in self.caches:
+                def countable(path):
+                    return not any(x in path for x in exclude) and is_legal(path, types, illegal_dirs)
+
+                dircache = DirectoryCache(
+                    signature,
+                    countable,
+                    lambda path: count_record(path, whitespace),
+                    verify=True,
+                    mapper=self._mapper(whitespace),
+                    whitespace=whitespace
+                )
+                self.caches[signature] = (dircache, threading.Lock())
+            self.requests += 1
+            return self.caches[signature]
+
+    def count(self, paths, whitespace=True, exclude=[]):
+        """
+            Counts each path requested through the warm directory cache
+
+        Returns:
+            generator object yielding response messages (dict)
+
+        """
+        dircache, lock = self.cache(whitespace, exclude)
+
+        with lock:
+            for origin in paths:
+                for record in dircache.records(origin, abspath=True):
+                    yield {'record': record}
+            io_fail, dircache.io_fail = dircache.io_fail, []
+            dircache.merge()
+        yield {'done': True, 'io_fail': io_fail}
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'uptime': int(time.time() - self.started),
+            'requests': self.requests,
+            'directories': sum(len(x[0].entries) for x in self.caches.values())
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves one request per connection"""
+    wbufsize = 65536
+
+    def _send(self, message):
+        self.wfile.write((json.dumps(message) + '\n').encode('utf-8'))
+
+    def handle(self):
+        daemon = self.server.daemon
+        try:
+            message = json.loads(self.rfile.readline())
+            op = message.get('op')
+
+            if op == 'count':
+                for response in daemon.count(message['paths'], message.get('whitespace', True), message.get('exclude', [])):
+                    self._send(response)
+            elif op == 'status':
+                self._send(daemon.status())
+            elif op == 'stop':
+                self._send({'done': True})
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                self._send({'error': 'unknown op {}'.format(op)})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send({'error': str(e)})
+        except OSError:
+            logger.info('xlinesd: client disconnected before response completed')
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path, jobs=None):
+    """Binds the daemon socket and serves requests until stopped"""
+    daemon = XlinesDaemon(jobs)
+    # owner only from creation; no other user may connect between bind and chmod
+    umask = os.umask(0o077)
+    try:
+        server = _Server(path, _Handler)
+    finally:
+        os.umask(umask)
+    server.daemon = daemon
+    os.chmod(path, 0o600)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        daemon.pool.terminate()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def detach():
+    """Forks into the background; returns True in the daemon process"""
+    if os.fork():
+        return False
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    fd = os.open(os.devnull, os.O_RDWR)
+    for stream in (0, 1, 2):
+        os.dup2(fd, stream)
+    return True
+
+
+def init_daemon():
+    """xlinesd entry point"""
+    parser = argparse.ArgumentParser(prog='xlinesd', description='xlines background count daemon')
+    parser.add_argument("-f", "--foreground", dest='foreground', action='store_true', default=False)
+    parser.add_argument("-j", "--jobs", dest='jobs', type=int, default=None)
+    parser.add_argument("--status", dest='status', action='store_true', default=False)
+    parser.add_argument("--stop", dest='stop', action='store_true', default=False)
+    args = parser.parse_args()
+
+    path = socket_path()
+    sock = connect(path)
+
+    if args.status or args.stop:
+        if sock is None:
+            stdout_message('xlinesd is not running', prefix='INFO')
+            sys.exit(exit_codes['E_DEPENDENCY']['Code'])
+        for response in request(sock, {'op': 'stop' if args.stop else 'status'}):
+            if args.status:
+                print(json.dumps(response, indent=4))
+        sys.exit(exit_codes['EX_OK']['Code'])
+
+    if sock is not None:
+        sock.close()
+        stdout_message('xlinesd already running ({})'.format(path), prefix='INFO')
+        sys.exit(exit_codes['EX_OK']['Code'])
+
+    # stale socket left by a daemon which did not exit cleanly
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if args.foreground or detach():
+        serve(path, args.jobs)
+        sys.exit(exit_codes['EX_OK']['Code'])
+
+    for _ in range(50):
+        if os.path.exists(path):
+            break
+        time.sleep(0.1)
+    stdout_message('xlinesd listening on {}'.format(path), prefix='OK')
+    sys.exit(exit_codes['EX_OK']['Code'])
@@ -0,0 +1,161 @@
+"""
+Summary.
+
+    Deadline Module -- time-budgeted scans returning partial results
+
+    The walk runs in a thread ahead of counting and stats each countable
+    file object it finds.  When the time budget is spent the walk stops
+    and no further paths are handed to the counters.  The counting engines
+    are given the deadline as well:  they start no count after it, and
+    estimate a file object too large to read in the time remaining by
+    block sampling (see core.deadline_approx), so results end close to the
+    deadline and every count finished is kept.  Results are reported as
+    partial, with an estimate of the total:  the bytes stat'ed but never
+    counted, by size bucket (powers of 4 bytes), times the lines per byte
+    of the files counted in the same bucket (or of all files counted,
+    where none were).  File objects the walk never reached are not part of
+    the estimate
+
+Module Classes:
+    :Deadline:  time budget applied to a path stream and a record stream
+
+"""
+import os
+import time
+import queue
+import threading
+
+
+# maximum paths walked ahead of counting
+QUEUE_LIMIT = 65536
+
+_DONE = object()
+
+
+class Deadline():
+    """
+        Time budget of a scan.  Wrap the path stream with paths() and the
+        result stream with records(); partial() describes the results
+        once the budget has been spent
+    """
+    def __init__(self, seconds):
+        """
+        Args:
+            :seconds (float): time budget measured from creation
+        """
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self.walked_bytes = None        # bytes stat'ed; None when not walked here
+        self.counted_bytes = 0
+        self.counted_lines = 0
+        self.walked = {}                # size bucket -> bytes stat'ed
+        self.counted = {}               # size bucket -> (bytes, lines) counted
+        self.finished = False           # every result produced before expiry
+
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def _bucket(self, size):
+        return size.bit_length() // 2
+
+    def paths(self, paths):
+        """
+            Walks paths in a thread, stat'ing each, until the deadline
+
+        Returns:
+            generator object yielding filesystem paths (str)
+
+        """
+        self.walked_bytes = 0
+        pending = queue.Queue(QUEUE_LIMIT)
+
+        def put(item):
+            while not self.expired():
+                try:
+                    return pending.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+
+        def walk():
+            try:
+                for path in paths:
+                    if self.expired():
+                        return
+                    try:
+                        size = os.stat(path).st_size
+                        self.walked_bytes += size
+                        bucket = self._bucket(size)
+                        self.walked[bucket] = self.walked.get(bucket, 0) + size
+                    except OSError:
+                        pass
+                    put(path)
+            finally:
+                put(_DONE)
+
+        threading.Thread(target=walk, daemon=True).start()
+
+        while True:
+            remaining = self.expires - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                path = pending.get(timeout=remaining)
+            except queue.Empty:
+                return
+            if path is _DONE:
+                return
+            yield path
+
+    def records(self, records, drain=False):
+        """
+            Passes result records through until the deadline, then closes
+            the record stream so counting engines stop
+
+        Args:
+            :records (iter): result records
+            :drain (bool): the stream is counted from paths() by an engine
+                given the deadline (it ends by itself once the walk stops);
+                records after the deadline were counted before it, and
+                are passed through instead of discarded
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        try:
+            for record in records:
+                bucket = self._bucket(record['size'])
+                size, lines = self.counted.get(bucket, (0, 0))
+                self.counted[bucket] = (size + record['size'], lines + record['count'])
+                self.counted_bytes += record['size']
+                self.counted_lines += record['count']
+                yield record
+                if not drain and self.expired():
+                    return
+            self.finished = not self.expired()
+        finally:
+            close = getattr(records, 'close', None)
+            if close:
+                close()
+
+    def partial(self):
+        """
+        Returns:
+            None when results are complete, else (estimated total line
+            count | None, fraction of bytes stat'ed which were counted |
+            None), TYPE: tuple; see core.print_footer
+
+        """
+        if self.finished:
+            return None
+        if not self.walked_bytes or not self.counted_bytes:
+            return (None, None)
+
+        fraction = min(self.counted_bytes / self.walked_bytes, 1.0)
+        ratio = self.counted_lines / self.counted_bytes
+        estimate = self.counted_lines
+
+        for bucket, walked in self.walked.items():
+            size, lines = self.counted.get(bucket, (0, 0))
+            estimate += max(walked - size, 0) * (lines / size if size else ratio)
+        return (int(estimate), fraction)
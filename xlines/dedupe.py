@@ -0,0 +1,233 @@
+"""
+Summary.
+
+    Dedupe Module -- counts each distinct file content once
+
+    Byte-identical copies (vendored libraries, generated code, copied
+    configuration) are found in stages which read as little as possible:
+    file objects are bucketed by size, and a file of unique size is
+    counted at once; candidates sharing a size are compared by a hash of
+    their first and last block, and only those still colliding are hashed
+    in full.  One file object of each distinct content is counted (the
+    first by path); the others are reported as duplicates.  Each stage
+    hands counts and hashes to the same workers, so hashing overlaps
+    counting
+
+Module Classes:
+    :ContentDedupe:  staged duplicate detection and count
+
+Module Functions:
+    :print_duplicates:  prints lines and bytes of duplicate content
+
+"""
+import os
+import hashlib
+import itertools
+import multiprocessing
+from xlines.statics import local_config
+from xlines.core import count_record, open_fileobject, print_header, watched_counts
+from xlines.mp import cpu_cores
+from xlines.variables import *
+
+
+# bytes hashed at each end of a file object by the partial hash
+PARTIAL_BLOCK = 4096
+
+# bytes read per call by the full hash
+READ_BLOCK = 1048576
+
+
+def _partial_hash(path, size):
+    """Hash of the first and last block; the whole content when small"""
+    with open_fileobject(path, 'rb') as f1:
+        fd = f1.fileno()
+        head = os.pread(fd, PARTIAL_BLOCK, 0)
+        tail = os.pread(fd, PARTIAL_BLOCK, max(size - PARTIAL_BLOCK, PARTIAL_BLOCK)) if size > PARTIAL_BLOCK else b''
+    return hashlib.sha1(head + tail).hexdigest()
+
+
+def _full_hash(path):
+    sha = hashlib.sha1()
+    with open_fileobject(path, 'rb') as f1:
+        for block in iter(lambda: f1.read(READ_BLOCK), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+# tasks per worker batch
+BATCH = 32
+
+
+def _dedupe_task(task):
+    op, path, size, whitespace, approx = task
+    if op == 'count':
+        return count_record(path, whitespace, approx)
+    if op == 'partial':
+        return _partial_hash(path, size)
+    return _full_hash(path)
+
+
+def _dedupe_worker(tasks):
+    """
+        Pool worker; tasks [(op, path, size, whitespace, approx)] where op
+        is count, partial, or full.  Returns [(op, path, size, result or
+        None if the task failed or stalled)]
+    """
+    return [t[:3] + (r,) for t, r in watched_counts(_dedupe_task, tasks, lambda t: t[2])]
+
+
+class ContentDedupe():
+    """
+        Counts the distinct contents of a stream of file objects, each
+        once, and totals the duplicates omitted
+    """
+    def __init__(self, whitespace=True, multiprocess=False, approx=None, jobs=None):
+        """
+        Args:
+            :whitespace (bool): when False, omit whitespace lines from count
+            :multiprocess (bool): run counts and hashes on a worker pool
+            :approx (int): size in bytes at or above which counts are estimated
+            :jobs (int): number of worker processes (DEFAULT: up to 4 cores)
+        """
+        self.whitespace = whitespace
+        self.multiprocess = multiprocess
+        self.approx = approx
+        self.jobs = jobs
+        self.duplicates = {}        # representative path -> [duplicate paths]
+        self.objects = 0            # duplicate file objects omitted
+        self.lines = 0              # lines of duplicate file objects
+        self.size = 0               # bytes of duplicate file objects
+        self.hashed_bytes = 0       # bytes read by full hashes
+
+    def _task(self, op, path, size):
+        return (op, path, size, self.whitespace, self.approx)
+
+    def _stage(self, tasks, run, io_fail):
+        """
+            Runs one stage of tasks; yields (op, path, size, result) for
+            tasks which succeeded, collecting paths of failed tasks
+        """
+        batches = [tasks[i:i + BATCH] for i in range(0, len(tasks), BATCH)]
+        for op, path, size, result in itertools.chain.from_iterable(run(_dedupe_worker, batches)):
+            if result is None:
+                if io_fail is not None:
+                    io_fail.append(path)
+                continue
+            yield op, path, size, result
+
+    def _collisions(self, groups):
+        """
+            Splits groups keyed by (size, digest) into colliding groups,
+            [(size, sorted paths)], and unique file objects, [(path, size)]
+        """
+        collide, unique = [], []
+        for (size, _), paths in groups.items():
+            if len(paths) > 1:
+                collide.append((size, sorted(paths)))
+            else:
+                unique.append((paths[0], size))
+        return collide, unique
+
+    def records(self, paths, io_fail=None):
+        """
+            Line counts of the distinct contents of a stream of file
+            objects.  The stream is consumed in full (sizes are compared
+            across all file objects) before the first hash or count
+
+        Args:
+            :paths (iter): filesystem paths of file objects
+            :io_fail (list): when provided, collects paths which failed
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        sizes = {}
+        for path in paths:
+            try:
+                sizes.setdefault(os.stat(path).st_size, []).append(path)
+            except OSError:
+                if io_fail is not None:
+                    io_fail.append(path)
+
+        if self.multiprocess:
+            cores = self.jobs or (4 if cpu_cores() >= 4 else cpu_cores())
+            with multiprocessing.Pool(cores) as pool:
+                yield from self._run(sizes, lambda fx, tasks: pool.imap_unordered(fx, tasks), io_fail)
+        else:
+            yield from self._run(sizes, map, io_fail)
+
+    def _run(self, sizes, run, io_fail):
+        # stage 1: count unique sizes (and empty files); partial hash of the rest
+        tasks = []
+        for size, paths in sizes.items():
+            op = 'partial' if (size and len(paths) > 1) else 'count'
+            tasks.extend(self._task(op, x, size) for x in paths)
+
+        partials = {}
+        for op, path, size, result in self._stage(tasks, run, io_fail):
+            if op == 'count':
+                yield result
+            else:
+                partials.setdefault((size, result), []).append(path)
+
+        # stage 2: count unique partial hashes; full hash of the rest.  A
+        # partial hash of a small file object covers its whole content
+        collide, unique = self._collisions(partials)
+        tasks = [self._task('count', path, size) for path, size in unique]
+        groups = {}
+        for size, paths in collide:
+            if size <= PARTIAL_BLOCK * 2:
+                groups[(size, paths[0])] = paths
+            else:
+                tasks.extend(self._task('full', x, size) for x in paths)
+
+        fulls = {}
+        for op, path, size, result in self._stage(tasks, run, io_fail):
+            if op == 'count':
+                yield result
+            else:
+                self.hashed_bytes += size
+                fulls.setdefault((size, result), []).append(path)
+        groups.update(fulls)
+
+        # stage 3: count one file object of each distinct content
+        collide, unique = self._collisions(groups)
+        heads = {paths[0]: paths[1:] for _, paths in collide}
+        tasks = [self._task('count', path, size) for path, size in unique]
+        tasks.extend(self._task('count', paths[0], size) for size, paths in collide)
+
+        for op, path, size, record in self._stage(tasks, run, io_fail):
+            copies = heads.get(path, [])
+            if copies:
+                self.duplicates[path] = copies
+                self.objects += len(copies)
+                self.lines += record['count'] * len(copies)
+                self.size += record['size'] * len(copies)
+            yield record
+
+
+def print_duplicates(dedupe, width):
+    """
+        Prints duplicate content totals in the style of the per-file
+        table footer
+
+    Args:
+        :dedupe (ContentDedupe): completed dedupe
+        :width (int): width in characters of the output pattern
+
+    """
+    total_width = width + local_config['OUTPUT']['COUNT_COLUMN_WIDTH'] + 1
+    tab4 = '\t'.expandtabs(4)
+
+    rows = [
+        ('Duplicate objects (distinct contents):', '{:,} ({:,})'.format(dedupe.objects, len(dedupe.duplicates))),
+        ('Duplicate lines (not in totals):', '{:,}'.format(dedupe.lines)),
+        ('Duplicate bytes:', '{:,}'.format(dedupe.size))
+    ]
+
+    print_header(width, 'duplicate content', 'counted once')
+    for label, value in rows:
+        tab = '\t'.expandtabs(total_width - len(label) - len(value))
+        print(f'{tab4}{label}{tab}{highlight}{value}{rst}')
+    print(tab4 + (horiz * total_width) + '\n')
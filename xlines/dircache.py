@@ -0,0 +1,564 @@
+"""
+Summary.
+
+    Directory Cache Module -- persistent, directory-level cache of line
+    counts used to skip unchanged subtrees on a rescan
+
+    Each directory entry holds the directory's mtime and inode, the line
+    counts of its countable files, the names of its subdirectories, and
+    the aggregated totals of the file objects its subtree counted.  On a rescan
+    a directory whose mtime and inode are unchanged is not listed again:
+    its cached file results are reused and only its subdirectories are
+    visited, so an unchanged tree costs one stat per directory.  Subtree
+    totals (totals) go further:  once every directory of an unchanged
+    subtree is validated by its stat, the stored aggregate of the subtree
+    is returned without visiting its file entries.  A directory mtime does
+    not change when an existing file is edited in place; --verify lists
+    every directory and stats every file, reusing counts only for files
+    whose inode, size and mtime still match.
+
+    Entries of large files also hold a checksum of the last block counted
+    when the file ends in a newline.  A listed file with the same inode
+    which has only grown (append-only logs) and whose block still matches
+    is not counted again:  only its new tail is read, and its line count
+    added to the cached count
+
+    Scans yield the file objects of walk_fileobjects:  each physical file
+    object once per scan, whether listed or reused from the cache, and
+    symbolic links to files after the walk of each root, only when the
+    file object linked was not reached by its own path.  A hard link
+    listed after its file object was counted is cached uncounted, and
+    counted only in a scan which reaches it first
+
+Module Classes:
+    :DirectoryCache:  cached walk and count of directory subtrees
+
+"""
+import io
+import os
+import re
+import json
+import stat
+import hashlib
+import inspect
+import tempfile
+from xlines import logger
+from xlines.statics import local_config
+from xlines.core import open_fileobject, relpath_normalize, watched_counts
+from xlines.inodes import InodeSet
+
+
+# version of the cache entry format
+VERSION = 3
+
+# bytes of the block checksummed at the end of a counted file
+TAIL_BLOCK = 4096
+
+# minimum file size (bytes) for which a tail checksum is kept
+TAIL_MIN = 1048576
+
+# characters decoded per read when counting an appended tail
+TAIL_READ = 1048576
+
+# newline ending an empty line:  one which follows another newline
+EMPTY_LINE = re.compile('\n(?=\n)')
+
+
+def cache_signature(*options):
+    """Hash of the runtime options which change line count results"""
+    return hashlib.sha1(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def count_text(f1):
+    """
+        Line counts of a text stream read in blocks of TAIL_READ characters,
+        with the semantics of linecount (readlines) from a line start
+
+    Returns:
+        (lines, lines sans whitespace lines), TYPE: tuple
+
+    """
+    lines, empty, last = 0, 0, '\n'
+    while True:
+        block = f1.read(TAIL_READ)
+        if not block:
+            break
+        lines += block.count('\n')
+        empty += len(EMPTY_LINE.findall(last + block))
+        last = block[-1]
+    if last != '\n':
+        lines += 1          # last line has no newline
+    return lines, lines - empty
+
+
+def tail_sum(fd, size):
+    """
+        Checksum of the last block below offset size of an open file
+
+    Returns:
+        hex digest (str), or None when the block does not end in a newline
+        (a later append would extend the last line counted)
+
+    """
+    start = max(0, size - TAIL_BLOCK)
+    block = os.pread(fd, size - start, start)
+    if len(block) != size - start or not block.endswith(b'\n'):
+        return None
+    return hashlib.sha1(block).hexdigest()[:16]
+
+
+class DirectoryCache():
+    """
+        Walks directory subtrees yielding result records, reusing cached
+        results for directories unchanged since the previous scan
+    """
+    def __init__(self, signature, countable, counter, verify=False, cache_dir=None, mapper=None,
+                 whitespace=True):
+        """
+        Args:
+            :signature (str): hash of runtime options (see cache_signature)
+            :countable (callable): countable(path) -> bool; exclusion test
+            :counter (callable): counter(path) -> result record (dict), or
+                None when the file object proves uncountable
+            :verify (bool): stat every file instead of trusting directory
+                mtimes; only files with unchanged identity reuse counts
+            :cache_dir (str): cache location (DEFAULT: ~/.config/xlines/cache)
+            :mapper (callable): mapper(paths) -> iterable of (path, result)
+                counting the changed files of one directory, where result
+                is a record, None if uncountable, or False if the count
+                failed (DEFAULT: sequential count with counter)
+            :whitespace (bool): whitespace option of counter; used to count
+                the tails appended to files
+        """
+        cache_dir = cache_dir or os.path.join(local_config['CONFIG']['CONFIG_DIR'], 'cache')
+        self.path = os.path.join(cache_dir, 'dircache-{}-v{}.json'.format(signature, VERSION))
+        self.countable = countable
+        self.counter = counter
+        self.verify = verify
+        self.mapper = mapper or self._map
+        self.whitespace = whitespace
+        self.entries = self._load()
+        self.visited = {}
+        self.roots = []
+        self.seen = InodeSet()      # (device, inode) walked by the current scan
+        self.links = []             # (path, display path) of symbolic links beneath a root
+        self.reused = 0
+        self.scanned = 0
+        self.appended = 0
+        self.io_fail = []
+
+    def _load(self):
+        try:
+            with open(self.path) as f1:
+                return json.load(f1)
+        except (OSError, ValueError):
+            return {}
+
+    def merge(self):
+        """
+            Folds the directories visited by scans into the cache entries,
+            dropping entries beneath roots scanned to completion which no
+            longer exist; the entries of a scan stopped early are kept
+            with those it visited.  The cache may then be reused for
+            further scans
+
+        Returns:
+            cache entries, TYPE: dict
+
+        """
+        def under_root(path):
+            return any(path == r or path.startswith(r.rstrip(os.sep) + os.sep) for r in self.roots)
+
+        entries = {k: v for k, v in self.entries.items() if not under_root(k)}
+        entries.update(self.visited)
+        self.entries, self.visited, self.roots = entries, {}, []
+        self.seen = InodeSet()
+        return entries
+
+    def save(self):
+        """Atomically replaces the persistent cache with the current state"""
+        entries = self.merge()
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix='.dircache-', dir=os.path.dirname(self.path))
+            with os.fdopen(fd, 'w') as f1:
+                json.dump(entries, f1, separators=(',', ':'))
+                f1.flush()
+                os.fsync(f1.fileno())
+            os.replace(tmp, self.path)
+        except OSError:
+            fx = inspect.stack()[0][3]
+            logger.exception('{}: Problem writing directory cache {}'.format(fx, self.path))
+            return False
+        return True
+
+    def _list(self, dirpath, display, old, dev):
+        """
+            Lists a changed directory, counting only files whose identity
+            differs from the cached entry.  Hard links to a file object
+            already walked by this scan are listed uncounted
+
+        Returns:
+            (files, skipped, subdirectory names, symbolic link names)
+
+        """
+        old_files = {x[0]: x for x in old['files']} if old else {}
+        old_skip = {x[0]: x for x in old['skip']} if old else {}
+        files, skip, dirs, links, pending, grown = [], [], [], [], [], []
+
+        for entry in sorted(os.scandir(dirpath), key=lambda x: x.name):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if '.git' not in entry.path:
+                        dirs.append(entry.name)
+                    continue
+                if '.git' in dirpath:
+                    continue
+                if entry.is_symlink():
+                    links.append(entry.name)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    # FIFO, socket, or device node
+                    continue
+
+                st = entry.stat(follow_symlinks=False)
+                ident = [st.st_ino, st.st_size, st.st_mtime_ns]
+                cached = old_files.get(entry.name)
+
+                if cached and cached[4:7] == ident:
+                    files.append(cached)
+                elif cached and self._grown(cached, st):
+                    grown.append((os.path.join(dirpath, entry.name), cached, ident, st.st_size - cached[5]))
+                elif old_skip.get(entry.name, [None])[1:] == ident:
+                    skip.append(old_skip[entry.name])
+                elif not self.countable(os.path.join(display, entry.name)):
+                    skip.append([entry.name] + ident)
+                elif (dev, st.st_ino) in self.seen:
+                    files.append([entry.name, None, int(st.st_mtime), st.st_uid] + ident + [None])
+                else:
+                    pending.append((entry.name, ident))
+
+            except Exception:
+                self.io_fail.append(os.path.join(display, entry.name))
+
+        # appended tails; a changed last block is counted again in full
+        for (path, cached, ident, _), result in watched_counts(lambda x: (self._append(*x[:2]),), grown,
+                                                               size=lambda x: x[3]):
+            if result is None:
+                self.io_fail.append(os.path.join(display, cached[0]))
+            elif result[0] is None:
+                pending.append((cached[0], ident))
+            else:
+                files.append(result[0])
+                self.appended += 1
+
+        self._count(dirpath, display, pending, files, skip)
+        return sorted(files), skip, dirs, links
+
+    def _count(self, dirpath, display, pending, files, skip):
+        """
+            Counts the pending (name, identity) files of one directory with
+            the mapper, adding their entries to files, or skip when they
+            prove uncountable
+        """
+        paths = [os.path.join(dirpath, x[0]) for x in pending]
+
+        for (name, ident), (path, r) in zip(pending, self.mapper(paths)):
+            if r is False:
+                self.io_fail.append(os.path.join(display, name))
+            elif r is None:
+                skip.append([name] + ident)
+            else:
+                files.append([name, r['count'], r['mtime'], r['uid']] + ident + [self._tail(path, r)])
+
+    def _grown(self, cached, st):
+        """True when a cached file with a tail checksum has only grown"""
+        return len(cached) > 7 and cached[7] is not None and cached[4] == st.st_ino and cached[5] < st.st_size
+
+    def _tail(self, path, record):
+        """Tail checksum of a newly counted large file, or None"""
+        if record['size'] < TAIL_MIN:
+            return None
+        try:
+            with open_fileobject(path, 'rb') as f1:
+                # a file which grew while it was counted holds lines beyond record['size']
+                if os.fstat(f1.fileno()).st_size != record['size']:
+                    return None
+                return tail_sum(f1.fileno(), record['size'])
+        except OSError:
+            return None
+
+    def _append(self, path, cached):
+        """
+            Counts only the tail appended to a file since its cached count,
+            provided the last block counted is unchanged.  The tail is read
+            in bounded blocks; run under watched_counts
+
+        Returns:
+            updated cache entry (list), or None when the file must be
+            counted in full
+
+        """
+        name, count, mtime, uid, ino, size, mtime_ns, checksum = cached[:8]
+        try:
+            with open_fileobject(path, 'rb') as f1:
+                fd = f1.fileno()
+                if tail_sum(fd, size) != checksum:
+                    return None
+                f1.seek(size)
+                text = io.TextIOWrapper(f1)
+                lines, nows = count_text(text)
+                text.detach()
+                end = f1.tell()
+                st = os.fstat(fd)
+                checksum = tail_sum(fd, end) if st.st_size == end else None
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        # identity of the bytes counted; a file still growing is extended again next scan
+        return [
+            name, count + (lines if self.whitespace else nows), int(st.st_mtime), st.st_uid,
+            st.st_ino, end, st.st_mtime_ns, checksum
+        ]
+
+    def _map(self, paths):
+        """
+            Default mapper; sequential count with the counter provided.
+            Stalled file objects are abandoned (see watched_counts)
+        """
+        for path, result in watched_counts(lambda x: (self.counter(x),), paths):
+            yield path, (False if result is None else result[0])
+
+    def _scan(self, dirpath, display, replay=True):
+        """
+            Scans one directory subtree.  Generator yielding result records
+            when replay is True; returns the directory's cache entry
+
+        """
+        st = os.stat(dirpath)
+        if not self.seen.add(st.st_dev, st.st_ino):
+            return None         # walked already (bind mount)
+        old = self.entries.get(dirpath)
+
+        if old and not self.verify and old['mtime'] == st.st_mtime_ns and old['ino'] == st.st_ino:
+            if not replay and self._unchanged(dirpath, display, old, st.st_dev):
+                return old
+            files, skip, dirs, links = old['files'], old['skip'], old['dirs'], old['links']
+            self.reused += 1
+        else:
+            files, skip, dirs, links = self._list(dirpath, display, old, st.st_dev)
+            self.scanned += 1
+
+        # files reached first by this scan; cached entries restore their inodes
+        counted = [x for x in files if self.seen.add(st.st_dev, x[4])]
+        for x in skip:
+            self.seen.add(st.st_dev, x[1])
+
+        uncounted = [x for x in counted if x[1] is None]
+        if uncounted:
+            files = [x for x in files if x not in uncounted]
+            skip = list(skip)
+            self._count(dirpath, display, [(x[0], x[4:7]) for x in uncounted], files, skip)
+            files.sort()
+            names = set(x[0] for x in counted)
+            counted = [x for x in files if x[0] in names]
+
+        self.links.extend((os.path.join(dirpath, x), os.path.join(display, x)) for x in links)
+
+        if replay:
+            for name, count, mtime, uid, ino, size, *_ in counted:
+                yield {
+                    'path': os.path.join(display, name),
+                    'count': count,
+                    'size': size,
+                    'mtime': mtime,
+                    'uid': uid
+                }
+
+        count = sum(x[1] for x in counted)
+        objects = len(counted)
+        size = sum(x[5] for x in counted)
+        # every file entry of the subtree counted; its totals stand for it in any scan reaching each first
+        whole = len(counted) == len(files)
+        subdirs = []
+
+        for name in dirs:
+            try:
+                child = yield from self._scan(os.path.join(dirpath, name), os.path.join(display, name), replay)
+            except OSError:
+                continue
+            subdirs.append(name)
+            if child is None:
+                whole = False
+                continue
+            whole = whole and child['whole']
+            count += child['count']
+            objects += child['objects']
+            size += child['size']
+
+        entry = {
+            'mtime': st.st_mtime_ns,
+            'ino': st.st_ino,
+            'files': files,
+            'skip': skip,
+            'dirs': subdirs,
+            'links': links,
+            'whole': whole,
+            'count': count,
+            'objects': objects,
+            'size': size
+        }
+        self.visited[dirpath] = entry
+        return entry
+
+    def _unchanged(self, dirpath, display, entry, dev):
+        """
+            Reuses the cached subtree of an unchanged directory whole when
+            a stat of each directory beneath it (no listing) matches its
+            entry, and the subtree's file objects are all counted by this
+            scan as by the scan which stored it:  none uncounted, reached
+            before, or linked twice within it.  Otherwise nothing is
+            changed and the subtree is scanned
+
+        Returns:
+            True when the subtree is reused; its aggregate then stands for
+            the scan of the subtree
+
+        """
+        if not entry.get('whole'):
+            return False
+
+        entries, inodes, links = {dirpath: entry}, set(), []
+        stack = [(dirpath, display, entry, dev)]
+
+        while stack:
+            path, shown, entry, dev = stack.pop()
+            for x in entry['files']:
+                if (dev, x[4]) in inodes or (dev, x[4]) in self.seen:
+                    return False
+                inodes.add((dev, x[4]))
+            for x in entry['skip']:
+                if (dev, x[1]) in inodes or (dev, x[1]) in self.seen:
+                    return False
+                inodes.add((dev, x[1]))
+            links.extend((os.path.join(path, x), os.path.join(shown, x)) for x in entry['links'])
+
+            for name in entry['dirs']:
+                subdir = os.path.join(path, name)
+                child = self.entries.get(subdir)
+                try:
+                    st = os.stat(subdir)
+                except OSError:
+                    return False
+                if not child or child['mtime'] != st.st_mtime_ns or child['ino'] != st.st_ino:
+                    return False
+                if (st.st_dev, st.st_ino) in inodes or (st.st_dev, st.st_ino) in self.seen:
+                    return False
+                inodes.add((st.st_dev, st.st_ino))
+                entries[subdir] = child
+                stack.append((subdir, os.path.join(shown, name), child, st.st_dev))
+
+        for dev, ino in inodes:
+            self.seen.add(dev, ino)
+        self.links.extend(links)
+        self.visited.update(entries)
+        self.reused += len(entries)
+        return True
+
+    def _display(self, path, abspath):
+        return path if abspath else relpath_normalize(os.path.relpath(path))
+
+    def _linked(self):
+        """
+            Counts the files reached through the symbolic links collected
+            by the scan of a root which no other path reached; links are
+            never cached, as the file object linked may change
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        links, self.links, pending = self.links, [], []
+
+        for path, display in links:
+            try:
+                st = os.stat(path)
+            except OSError:
+                # dangling link; fails as its walk equivalent does when counted
+                if self.countable(display):
+                    self.io_fail.append(display)
+                continue
+            if stat.S_ISREG(st.st_mode) and self.seen.add(st.st_dev, st.st_ino) and self.countable(display):
+                pending.append((path, display))
+
+        for (path, display), (_, r) in zip(pending, self.mapper([x[0] for x in pending])):
+            if r is False:
+                self.io_fail.append(display)
+            elif r is not None:
+                yield dict(r, path=display)
+
+    def _origin(self, origin):
+        """
+        Returns:
+            result record (dict) of a file object named as a root, or None
+            when uncountable or already walked by this scan
+
+        """
+        st = os.stat(origin)
+        if not (self.seen.add(st.st_dev, st.st_ino) and self.countable(origin)):
+            return None
+        return self.counter(origin)
+
+    def records(self, origin, abspath=True):
+        """
+            Cached equivalent of walking origin and counting each countable
+            file object beneath it
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        if os.path.isfile(origin):
+            record = self._origin(origin)
+            if record:
+                yield record
+            return
+
+        root = os.path.abspath(origin)
+        try:
+            yield from self._scan(root, self._display(root, abspath))
+        except OSError:
+            # missing root; fails as in the plain walk
+            self.io_fail.append(origin)
+            self.roots.append(root)
+            return
+        # not reached when the stream is closed early
+        self.roots.append(root)
+        yield from self._linked()
+
+    def totals(self, origin):
+        """
+            Subtree totals of origin without replaying per-file results
+
+        Returns:
+            (line count, object count), TYPE: tuple
+
+        """
+        if os.path.isfile(origin):
+            record = self._origin(origin)
+            return (record['count'], 1) if record else (0, 0)
+
+        root = os.path.abspath(origin)
+        self.roots.append(root)
+        scan = self._scan(root, root, replay=False)
+        try:
+            while True:
+                next(scan)
+        except OSError:
+            self.io_fail.append(origin)
+            return 0, 0
+        except StopIteration as e:
+            linked = [x['count'] for x in self._linked()]
+            subtree = e.value or {'count': 0, 'objects': 0}
+            return subtree['count'] + sum(linked), subtree['objects'] + len(linked)
@@ -0,0 +1,190 @@
+"""
+Summary.
+
+    Estimate Module -- statistical estimate of the total line count of a
+    tree from a stratified random sample of its file objects
+
+    The walk reads metadata only (one stat per file object).  File objects
+    are stratified by extension and size bucket (powers of 4 bytes); each
+    stratum keeps its object count, its byte total, and a bounded uniform
+    reservoir of members.  The sample is allocated to strata in proportion
+    to their bytes, only sampled files are read, and each stratum total is
+    a ratio estimate (lines per byte of its sample times its bytes).  The
+    confidence interval combines the ratio estimator variances of all
+    strata.  Zero byte files are known to hold no lines and are never read
+
+Module Classes:
+    :Stratum:  members of one extension and size bucket
+    :TreeEstimate:  stratified sample and estimate of a tree's line count
+
+Module Functions:
+    :print_estimate:  prints the estimate and its confidence interval
+
+"""
+import os
+import math
+import random
+from xlines.core import iter_fileobjects, is_binary, print_header
+from xlines.statics import local_config
+from xlines.variables import *
+
+
+# fraction of bytes read by default
+DEFAULT_FRACTION = 0.03
+
+# maximum members retained per stratum for sampling
+RESERVOIR = 1024
+
+# minimum sample per stratum, where it has as many members
+MIN_SAMPLE = 4
+
+# z score of the confidence interval reported
+Z95 = 1.96
+
+
+class Stratum():
+    """Object count, byte total, and reservoir sample of one stratum"""
+    __slots__ = ('objects', 'size', 'members')
+
+    def __init__(self):
+        self.objects = 0
+        self.size = 0
+        self.members = []       # (path, size)
+
+    def add(self, path, size, rng):
+        self.objects += 1
+        self.size += size
+        if len(self.members) < RESERVOIR:
+            self.members.append((path, size))
+        else:
+            i = rng.randrange(self.objects)
+            if i < RESERVOIR:
+                self.members[i] = (path, size)
+
+
+class TreeEstimate():
+    """
+        Stratified sample estimate of the total line count of a tree
+    """
+    def __init__(self, fraction=DEFAULT_FRACTION, seed=None):
+        """
+        Args:
+            :fraction (float): target fraction of bytes to read (0 - 1]
+            :seed (int): random seed for a reproducible sample
+        """
+        self.fraction = fraction
+        self.rng = random.Random(seed)
+        self.strata = {}
+        self.objects = 0
+        self.size = 0
+        self.sampled = 0
+        self.sampled_bytes = 0
+        self.total = None
+        self.error = None
+
+    def _stratum(self, path, size):
+        ext = os.path.splitext(path)[1].lower()
+        return (ext, size.bit_length() // 2)
+
+    def walk(self, container, illegal, exclude=[], abspath=True):
+        """Stats every countable file object; no file content is read"""
+        for path in iter_fileobjects(container, illegal, exclude, abspath, binary=False):
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                continue
+            self.objects += 1
+            self.size += size
+            if size:
+                self.strata.setdefault(self._stratum(path, size), Stratum()).add(path, size, self.rng)
+
+    def allocate(self):
+        """
+            Sample size of each stratum, proportional to its bytes
+
+        Returns:
+            {stratum key: sample size}, TYPE: dict
+
+        """
+        budget = self.fraction * self.size
+        allocation = {}
+        for key, s in self.strata.items():
+            wanted = math.ceil(budget * (s.size / self.size) / (s.size / s.objects)) if self.size else 0
+            allocation[key] = min(len(s.members), max(wanted, MIN_SAMPLE))
+        return allocation
+
+    def sample(self, counter):
+        """
+            Counts the sampled file objects and computes the estimate
+
+        Args:
+            :counter (callable): counter(paths) -> iterable of result
+                records; paths which fail are omitted (counted as zero,
+                as they are omitted from a full count)
+
+        """
+        plan = {}
+        for key, n in self.allocate().items():
+            plan[key] = self.rng.sample(self.strata[key].members, n)
+
+        text_paths = []
+        for members in plan.values():
+            for path, size in members:
+                self.sampled += 1
+                if not is_binary(path):
+                    text_paths.append(path)
+
+        # bytes read once per sampled file: all of a counted file, the
+        # binary probe of any other
+        lines = {x['path']: x['count'] for x in counter(text_paths)}
+        self.sampled_bytes = sum(size if path in lines else min(size, 1024) for m in plan.values() for path, size in m)
+
+        total, variance = 0.0, 0.0
+        for key, members in plan.items():
+            s = self.strata[key]
+            n = len(members)
+            y = [lines.get(path, 0) for path, _ in members]
+            x = [size for _, size in members]
+            ratio = sum(y) / sum(x)
+            total += ratio * s.size
+
+            # ratio estimator variance with finite population correction
+            if n > 1 and n < s.objects:
+                residual = sum((yi - ratio * xi) ** 2 for yi, xi in zip(y, x)) / (n - 1)
+                variance += s.objects ** 2 * (1 - n / s.objects) * residual / n
+
+        self.total = int(round(total))
+        self.error = int(round(Z95 * math.sqrt(variance)))
+        return self.total, self.error
+
+
+def print_estimate(estimate, width, skipped=None):
+    """
+        Prints the estimated total line count with its 95% confidence
+        interval in the style of the per-file table footer
+
+    Args:
+        :estimate (TreeEstimate): sampled estimate
+        :width (int): width in characters of the output pattern
+        :skipped (list): sampled paths which could not be counted
+
+    """
+    total_width = width + local_config['OUTPUT']['COUNT_COLUMN_WIDTH'] + 1
+    tab4 = '\t'.expandtabs(4)
+    relative = estimate.error / estimate.total if estimate.total else 0.0
+    read = estimate.sampled_bytes / estimate.size if estimate.size else 0.0
+
+    rows = [
+        ('Estimated total lines:', '~{:,}'.format(estimate.total)),
+        ('95% confidence interval:', '±{:,} (±{:.2%})'.format(estimate.error, relative)),
+        ('Objects walked (sampled):', '{:,} ({:,})'.format(estimate.objects, estimate.sampled)),
+        ('Bytes read:', '{:.2%} of {:,}'.format(read, estimate.size))
+    ]
+    if skipped:
+        rows.append(('Sampled objects skipped (counted as 0):', '{:,}'.format(len(skipped))))
+
+    print_header(width, 'estimate', 'stratified sample')
+    for label, value in rows:
+        tab = '\t'.expandtabs(total_width - len(label) - len(value))
+        print(f'{tab4}{label}{tab}{highlight}{value}{rst}')
+    print(tab4 + (horiz * total_width) + '\n')
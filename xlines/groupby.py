@@ -0,0 +1,209 @@
+"""
+Summary.
+
+    Group-by Aggregation Module -- line count summaries keyed by file
+    extension, language, directory, owner, or modification age computed
+    in the same pass as the per-file counts
+
+Module Classes:
+    :GroupBy:  hash aggregation of result records on a single key
+    :RootSummary:  subtotals attributed to each requested --sum path
+
+Module Functions:
+    :print_groupby:  prints summary tables for all GroupBy objects
+
+"""
+import os
+import pwd
+import time
+from functools import lru_cache
+from xlines.core import print_header, print_footer
+from xlines.statics import local_config
+from xlines.variables import *
+
+
+group_keys = ('ext', 'lang', 'dir', 'owner', 'mtime-bucket')
+
+languages = {
+    '.c': 'C', '.h': 'C',
+    '.cc': 'C++', '.cpp': 'C++', '.cxx': 'C++', '.hpp': 'C++',
+    '.cs': 'C#',
+    '.css': 'CSS', '.scss': 'CSS',
+    '.go': 'Go',
+    '.htm': 'HTML', '.html': 'HTML',
+    '.java': 'Java',
+    '.js': 'JavaScript', '.jsx': 'JavaScript', '.mjs': 'JavaScript',
+    '.json': 'JSON',
+    '.md': 'Markdown', '.rst': 'reStructuredText',
+    '.php': 'PHP',
+    '.pl': 'Perl', '.pm': 'Perl',
+    '.py': 'Python', '.pyx': 'Python',
+    '.rb': 'Ruby',
+    '.rs': 'Rust',
+    '.sh': 'Shell', '.bash': 'Shell', '.zsh': 'Shell',
+    '.sql': 'SQL',
+    '.swift': 'Swift',
+    '.ts': 'TypeScript', '.tsx': 'TypeScript',
+    '.yml': 'YAML', '.yaml': 'YAML',
+    '.toml': 'TOML', '.ini': 'INI', '.cfg': 'INI'
+}
+
+# modification age buckets:  (upper bound in seconds, label)
+age_buckets = (
+    (86400, '< 1 day'),
+    (86400 * 7, '< 1 week'),
+    (86400 * 30, '< 1 month'),
+    (86400 * 365, '< 1 year')
+)
+
+
+@lru_cache(maxsize=None)
+def owner_name(uid):
+    """Username for a numeric uid; uid as str when not in passwd db"""
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+class GroupBy():
+    """
+        Hash aggregation of result records.  Keys are derived only from the
+        file name and the metadata already carried in each result record,
+        so grouping adds no filesystem i/o
+    """
+    def __init__(self, key):
+        """
+        Args:
+            :key (str): one of ext, lang, dir, owner, mtime-bucket
+        """
+        if key not in group_keys:
+            raise ValueError('Unknown group-by key "{}". Valid keys: {}'.format(key, ', '.join(group_keys)))
+        self.key = key
+        self.now = time.time()
+        self.groups = {}
+        self.approx = None      # summed error bound of estimated counts
+        self.keyfunc = {
+            'ext': self._ext,
+            'lang': self._lang,
+            'dir': lambda r: os.path.dirname(r['path']),
+            'owner': lambda r: owner_name(r['uid']),
+            'mtime-bucket': self._age
+        }[key]
+
+    def _ext(self, record):
+        return os.path.splitext(record['path'])[1] or '(none)'
+
+    def _lang(self, record):
+        return languages.get(os.path.splitext(record['path'])[1].lower(), 'Other')
+
+    def _age(self, record):
+        age = self.now - record['mtime']
+        for limit, label in age_buckets:
+            if age < limit:
+                return label
+        return '> 1 year'
+
+    def write(self, record):
+        """Adds a result record to its group"""
+        k = self.keyfunc(record)
+        if 'approx' in record:
+            self.approx = (self.approx or 0) + record['approx']
+        objects, count = self.groups.get(k, (0, 0))
+        self.groups[k] = (objects + 1, count + record['count'])
+
+    def close(self):
+        pass
+
+    def results(self):
+        """
+        Returns:
+            (key, objects, line count) tuples, largest line count first;
+            equal line counts in key order
+
+        """
+        return sorted(((k, v[0], v[1]) for k, v in self.groups.items()), key=lambda x: (-x[2], x[0]))
+
+
+class RootSummary():
+    """
+        Line count subtotals attributed back to each path provided with
+        --sum.  Nested or overlapping roots share a single walk; a file
+        object beneath several requested roots adds to each of them
+    """
+    def __init__(self, roots):
+        """
+        Args:
+            :roots (list): filesystem paths as provided with --sum
+        """
+        self.key = 'root'
+        self.roots = []
+        for root in roots:
+            real = os.path.realpath(root)
+            if real not in [x[1] for x in self.roots]:
+                self.roots.append((root, real, os.path.isdir(root)))
+        self.groups = {x[0]: (0, 0) for x in self.roots}
+        self.total = 0
+        self.objects = 0
+        self.approx = None      # summed error bound of estimated counts
+
+    def write(self, record):
+        """Adds a result record to each requested root containing it"""
+        path = os.path.realpath(record['path'])
+        self.total += record['count']
+        self.objects += 1
+        if 'approx' in record:
+            self.approx = (self.approx or 0) + record['approx']
+
+        for root, real, isdir in self.roots:
+            if path == real or (isdir and path.startswith(real.rstrip(os.sep) + os.sep)):
+                objects, count = self.groups[root]
+                self.groups[root] = (objects + 1, count + record['count'])
+
+    def close(self):
+        pass
+
+    def results(self):
+        """
+        Returns:
+            (root, objects, line count) tuples in the order requested
+
+        """
+        return [(x[0],) + self.groups[x[0]] for x in self.roots]
+
+    def totals(self):
+        """Cumulative (line count, object count); each object counted once"""
+        return self.total, self.objects
+
+
+def print_groupby(groups, width, _ct_threshold):
+    """
+        Prints one summary table per GroupBy object in the style
+        of the per-file table
+
+    Args:
+        :groups (list): GroupBy objects
+        :width (int): width in characters of the output pattern
+        :_ct_threshold (int): high line count highlight threshold
+
+    """
+    count_width = local_config['OUTPUT']['COUNT_COLUMN_WIDTH']
+    tab4 = '\t'.expandtabs(4)
+
+    for g in groups:
+        objects_total, lines_total = 0, 0
+        print_header(width, 'group: ' + g.key, 'objects  line count')
+
+        for key, objects, count in g.results():
+            objects_total += objects
+            lines_total += count
+            label = key if len(key) < (width - BUFFER) else key[:width - BUFFER - 3] + '...'
+            ct_format = acct if count > _ct_threshold else bwt
+            tab = '\t'.expandtabs(width + count_width + 1 - len(label) - 20)
+            print(f'{tab4}{text}{label}{rst}{tab}{objects:>8,}  {ct_format}{count:>10,}{rst}')
+
+        if isinstance(g, RootSummary):
+            # overlapping roots; do not sum subtotals
+            lines_total, objects_total = g.totals()
+
+        print_footer(lines_total, objects_total, width, approx=g.approx)
@@ -55,25 +55,103 @@
         $ """ + synopsis_cmd + """
 
                         -s, --sum
+                       [--approx-above <size>  ]
+                       [--cache  ]
+                       [--checkpoint <file>  ]
                        [-c, --configure  ]
+                       [--content-cache <path>  ]
+                       [--deadline <seconds>  ]
                        [-d, --debug  ]
+                       [--dedupe-content  ]
+                       [--estimate [fraction]  ]
                        [-e, --exclude <value>  ]
+                       [--files-from <file|->  ]
+                       [--follow-symlinks  ]
+                       [-g, --group-by <key>  ]
                        [-h, --help   ]
                        [-l, --list-exclusions ]
                        [-m, --multiprocess  ]
+                       [--max-depth <depth>  ]
+                       [--memory-limit <size>  ]
+                       [--no-daemon  ]
                        [-n, --no-whitespace  ]
+                       [-0, --null  ]
+                       [--one-file-system  ]
+                       [-o, --output <FORMAT:PATH>  ]
+                       [--per-root  ]
+                       [--refresh <seconds>  ]
+                       [--resume <file>  ]
+                       [--serve-metrics <[host]:port>  ]
+                       [--shard <i/N>  ]
+                       [--shard-file <file>  ]
+                       [--sort <path|count|size>  ]
+                       [-t, --top <N>  ]
+                       [-T, --total  ]
+                       [--verify  ]
+                       [--watch  ]
                        [-V, --version  ]
+
+        $ """ + ACCENT + PACKAGE + rst + """ merge <file> [<file> ...]  """ + lbrct + """report options""" + rbrct + """
     """ + bdwt + """
   OPTIONS
         -s, --sum""" + rst + """ (string): Sum the counts of all lines contained
             in filesystem objects referenced in the sum parameter
+    """ + bdwt + """
+        --approx-above""" + rst + """ (string):  Estimate line counts of files of at
+            least this size, such as 1G, from the newline density of
+            64 evenly spaced blocks.  Estimates are marked '~' with
+            their 95% error bound next to the exact counts, as are
+            totals which include them.  Counted in-process; not
+            combined with --cache or --content-cache
+    """ + bdwt + """
+        --cache""" + rst + """:  Reuse results of directories unchanged since the
+            previous scan.  Unchanged subtrees cost one stat per
+            directory; see --verify for files edited in place
+    """ + bdwt + """
+        --checkpoint""" + rst + """ (string):  Save the progress of a long scan to this
+            file every 30 seconds and when stopped.  Directories fully
+            counted are kept with their results; see --resume
     """ + bdwt + """
         -c, --configure""" + rst + """:  Configure runtime parameter via the cli
             menu. Change display format, color scheme, etc values
+    """ + bdwt + """
+        --content-cache""" + rst + """ (string):  Line count cache file keyed by file
+            content (git blob SHA-1).  Portable across checkouts and
+            CI runners; caches of parallel jobs merge by concatenation.
+            Files of 4 MiB or more are cached in content-defined
+            chunks, so after an edit only changed chunks are counted
+    """ + bdwt + """
+        --deadline""" + rst + """ (float):  Stop counting after this many seconds and
+            print the results counted so far marked PARTIAL, with a
+            total estimated from the bytes stat'ed but not counted
     """ + bdwt + """
         -d, --debug""" + rst + """:  Print out additional  debugging information
+    """ + bdwt + """
+        --dedupe-content""" + rst + """:  Count each distinct file content once.
+            Byte-identical copies (vendored or generated files) are
+            found by size, then a partial hash, then a full hash, and
+            their lines and bytes are reported apart from the totals.
+            Not combined with --deadline:  all sizes are known before
+            counting starts
+    """ + bdwt + """
+        --estimate""" + rst + """ (float):  Estimate the total line count from a
+            stratified random sample (by extension and file size)
+            reading about this fraction of bytes, with a 95% confidence
+            interval.  DEFAULT: 0.03
     """ + bdwt + """
         -e, --exclude""" + rst + """: Objects to be excluded from the line count
+    """ + bdwt + """
+        --files-from""" + rst + """ (string):  Count the file objects listed in a file,
+            one per line, instead of walking --sum paths.  '-' reads
+            the list from stdin.  Listed paths stream straight into
+            the count; directories are not walked
+    """ + bdwt + """
+        --follow-symlinks""" + rst + """:  Descend symbolic links to directories.
+            A directory reached twice (a link cycle) is walked once.
+            Hard and symbolic links to one file are always counted once
+    """ + bdwt + """
+        -g, --group-by""" + rst + """ (string): Print summary tables grouped by one
+            or more of:  ext, lang, dir, owner, mtime-bucket
     """ + bdwt + """
         -l, --list-exclusions""" + rst + """: Print list of file type extensions
             and directories excluded from line count calculations
@@ -82,9 +160,80 @@
     """ + bdwt + """
         -m, --multiprocess""" + rst + """:  Use multiple  cpu cores for counting
             lines of text in expansive filesystem directories
+    """ + bdwt + """
+        --max-depth""" + rst + """ (integer):  Print du-style line count subtotals
+            for each directory to the depth given instead of per-file
+            results.  Subtotals accumulate while counting; the list of
+            counted file objects is never retained
+    """ + bdwt + """
+        --memory-limit""" + rst + """ (string):  Cap memory held for sorted output,
+            such as 512M or 2G.  Sorted runs spill to temporary files
+            at the cap and are merged when results are printed
+    """ + bdwt + """
+        --no-daemon""" + rst + """:  Count in-process even when an xlinesd daemon
+            is running.  By default a running daemon (see xlinesd
+            --help) answers counts from its warm caches and workers
     """ + bdwt + """
         -w, --no-whitespace""" + rst + """:  Exclude lines containing whitespace
             from total line counts for all objects
+    """ + bdwt + """
+        -0, --null""" + rst + """:  --files-from list is NUL delimited, as written by
+            git ls-files -z or find -print0
+    """ + bdwt + """
+        --one-file-system""" + rst + """:  Do not descend into directories on
+            another filesystem (mount points, /proc) than the --sum path
+    """ + bdwt + """
+        -o, --output""" + rst + """ (string): Additional output sink fed by the same
+            scan.  FORMAT is one of json, jsonl, csv, or ext (per file
+            extension rollup).  PATH '-' writes to stdout in place of
+            the table.  Repeat to write several sinks from one scan
+    """ + bdwt + """
+        --per-root""" + rst + """:  Print line count subtotals for each --sum path.
+            Duplicate and nested --sum paths are always walked once;
+            subtotals of nested paths overlap, totals do not
+    """ + bdwt + """
+        --refresh""" + rst + """ (float):  With --serve-metrics, count every root
+            again at this interval instead of following filesystem
+            events.  DEFAULT: follow events (inotify); else 300
+    """ + bdwt + """
+        --resume""" + rst + """ (string):  Continue a scan from its --checkpoint file
+            with the same --sum paths and options.  Subtrees already
+            counted are not read again; checkpointing continues
+    """ + bdwt + """
+        --serve-metrics""" + rst + """ (string):  Serve line counts per root, file
+            extension, and top-level directory as Prometheus metrics
+            at http://[host]:port/metrics.  Scrapes read results held
+            in memory and never trigger a scan.  DEFAULT host: 127.0.0.1
+    """ + bdwt + """
+        --shard""" + rst + """ (string):  Count shard i of N (such as 2/8) of a scan
+            split across hosts.  Every shard walks the same --sum paths
+            but counts only its own file objects, chosen by a hash of
+            the path.  Results are written to a partial result file;
+            xlines merge <file> ... of all N files prints the same
+            table, totals, and --group-by, --per-root, --sort, --top,
+            or --max-depth reports as a scan on a single host
+    """ + bdwt + """
+        --shard-file""" + rst + """ (string):  Partial result file written by
+            --shard.  DEFAULT: part-i-of-N.xl
+    """ + bdwt + """
+        --sort""" + rst + """ (string):  Output order; one of path, count, or size.
+            Count and size sort largest first.  DEFAULT: count with
+            --top, otherwise path.  Applies to per-file results and to
+            --max-depth directory siblings
+    """ + bdwt + """
+        -t, --top""" + rst + """ (integer):  Print only the N largest file objects
+            by --sort key.  Totals remain exact for all objects counted
+    """ + bdwt + """
+        -T, --total""" + rst + """:  Print only the cumulative line and object totals
+    """ + bdwt + """
+        --verify""" + rst + """:  With --cache, stat every file rather than trusting
+            directory mtimes.  Only files whose inode, size, and mtime
+            are unchanged reuse cached counts; large files which have
+            only grown (logs) have just their new tail counted
+    """ + bdwt + """
+        --watch""" + rst + """:  Keep the table and totals current while files
+            change (Linux inotify).  Only changed files are recounted
+            and only their rows and the totals are redrawn
     """ + bdwt + """
         -V, --version""" + rst + """:  Print package version  and copyright info
     """ + bdwt + """
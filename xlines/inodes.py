@@ -0,0 +1,101 @@
+"""
+Summary.
+
+    Inodes Module -- compact membership set of (device, inode) pairs
+
+    The walk records the identity of every directory and file object it
+    visits, so each physical file is counted once however many hard links
+    or symbolic links lead to it, and symbolic link cycles are detected.
+    A set of tuples costs over 100 bytes per member; InodeSet keeps an
+    open addressing table of 64 bit inode numbers per device, at most half
+    full and at least a quarter full once grown, or 16 - 32 bytes per
+    member:  10 million members take 2**25 slots (268 MB), and while the
+    table doubles the old and new tables are held at once (about 400 MB)
+
+Module Classes:
+    :InodeSet:  compact set of (device, inode) pairs
+
+"""
+from array import array
+
+
+# Fibonacci hashing multiplier (2**64 / golden ratio)
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# initial table size per device, as a power of 2
+_BITS = 10
+
+
+class _Table():
+    """Open addressing (linear probe) table of nonzero 64 bit integers"""
+    __slots__ = ('bits', 'slots', 'used')
+
+    def __init__(self, bits=_BITS):
+        self.bits = bits
+        self.slots = array('Q', bytes(8 << bits))
+        self.used = 0
+
+    def add(self, key):
+        slots, mask = self.slots, (1 << self.bits) - 1
+        i = ((key * _GOLDEN) & _MASK64) >> (64 - self.bits)
+        while True:
+            slot = slots[i]
+            if slot == key:
+                return False
+            if not slot:
+                slots[i] = key
+                self.used += 1
+                if self.used * 2 > len(slots):
+                    self._grow()
+                return True
+            i = (i + 1) & mask
+
+    def __contains__(self, key):
+        slots, mask = self.slots, (1 << self.bits) - 1
+        i = ((key * _GOLDEN) & _MASK64) >> (64 - self.bits)
+        while slots[i]:
+            if slots[i] == key:
+                return True
+            i = (i + 1) & mask
+        return False
+
+    def _grow(self):
+        old = self.slots
+        self.bits += 1
+        self.slots = array('Q', bytes(8 << self.bits))
+        self.used = 0
+        for key in old:
+            if key:
+                self.add(key)
+
+
+class InodeSet():
+    """
+        Compact set of (device, inode) pairs.  Inode 0, which no file
+        object has, is never a member
+    """
+    def __init__(self):
+        self.devices = {}
+
+    def add(self, dev, ino):
+        """
+            Adds a (device, inode) pair
+
+        Returns:
+            True when the pair was not already a member, TYPE: bool
+
+        """
+        if not ino:
+            return True
+        table = self.devices.get(dev)
+        if table is None:
+            table = self.devices[dev] = _Table()
+        return table.add(ino)
+
+    def __contains__(self, pair):
+        table = self.devices.get(pair[0])
+        return bool(pair[1]) and table is not None and pair[1] in table
+
+    def __len__(self):
+        return sum(x.used for x in self.devices.values())
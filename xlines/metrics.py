@@ -0,0 +1,267 @@
+"""
+Summary.
+
+    Metrics Module -- Prometheus / OpenMetrics text exposition of line
+    counts served over HTTP
+
+    Line counts are computed once, then kept current in memory:  with
+    inotify available only the files named by filesystem events are
+    recounted (see watch.TreeWatcher); otherwise every root is counted
+    again on a fixed schedule.  The exposition text is rebuilt after each
+    update, so a scrape only copies a prepared string and never triggers
+    a scan.
+
+    Exposed metrics (gauges unless noted):
+
+        xlines_lines{root}                      line count per --sum root
+        xlines_files{root}                      file objects counted
+        xlines_bytes{root}                      bytes of file objects counted
+        xlines_extension_lines{root,ext}        line count per file extension
+        xlines_extension_files{root,ext}        file objects per file extension
+        xlines_directory_lines{root,directory}  line count per top-level directory
+        xlines_scan_duration_seconds            duration of the last full scan
+        xlines_scan_files_per_second            throughput of the last full scan
+        xlines_scan_bytes_per_second            throughput of the last full scan
+        xlines_last_update_timestamp_seconds    unix time results last changed
+        xlines_updates_total                    updates applied (counter)
+
+Module Classes:
+    :MetricsExporter:  current line count metrics for a set of roots
+
+Module Functions:
+    :parse_address:  converts [host]:port to an address tuple
+    :serve_metrics:  serves metrics over HTTP until interrupted
+
+"""
+import os
+import time
+import inspect
+import threading
+import socketserver
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from xlines import logger
+from xlines.core import iter_fileobjects, iter_records
+from xlines.watch import TreeWatcher
+
+
+# seconds between full scans when filesystem events are unavailable
+DEFAULT_REFRESH = 300
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# root label of result records beneath none of the roots
+UNMATCHED_ROOT = '(other)'
+
+
+def parse_address(value):
+    """
+        Converts a listen address such as :9184 or 0.0.0.0:9184 to an
+        address tuple; an empty host binds the loopback interface
+
+    Returns:
+        (host, port), TYPE: tuple; raises ValueError if not understood
+
+    """
+    host, sep, port = str(value).rpartition(':')
+    if not sep or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError('Unable to parse metrics listen address "{}"; expected [host]:port'.format(value))
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsExporter():
+    """
+        Current line count metrics for a set of roots, held as prepared
+        exposition text
+    """
+    def __init__(self, container, exclusions, exclude=[], whitespace=True, refresh=None):
+        """
+        Args:
+            :container (list): filesystem paths (files or directories)
+            :exclusions (list): file type extensions to be excluded
+            :exclude (list): path substrings to be excluded (--exclude)
+            :whitespace (bool): when False, omit whitespace lines from count
+            :refresh (float): seconds between full scans; when None,
+                results follow filesystem events (inotify) if available
+        """
+        self.container = container
+        self.exclusions = exclusions
+        self.exclude = exclude
+        self.whitespace = whitespace
+        self.refresh = refresh
+        self.roots = {os.path.abspath(x): x for x in container}
+        self.real = {os.path.realpath(x): x for x in container}
+        self.tracker = None
+        self.records = {}
+        self.lock = threading.Lock()
+        self.text = ''
+        self.duration = 0.0
+        self.scanned_files = 0
+        self.scanned_bytes = 0
+        self.updated = 0.0
+        self.updates = 0
+
+        if refresh is None:
+            try:
+                self.tracker = TreeWatcher(container, exclusions, exclude, whitespace)
+                self.records = self.tracker.records
+            except OSError:
+                logger.info('%s: inotify unavailable; full scan every %d seconds' % (
+                    inspect.stack()[0][3], DEFAULT_REFRESH))
+                self.refresh = DEFAULT_REFRESH
+
+    def scan(self):
+        """Counts every root in full and rebuilds the exposition text"""
+        start = time.monotonic()
+
+        if self.tracker:
+            self.tracker.rescan()
+        else:
+            paths = iter_fileobjects(list(self.roots), self.exclusions, self.exclude)
+            self.records = {x['path']: x for x in iter_records(paths, self.whitespace)}
+
+        self.duration = time.monotonic() - start
+        self.scanned_files = len(self.records)
+        self.scanned_bytes = sum(x['size'] for x in self.records.values())
+        self.render()
+
+    @staticmethod
+    def _match(path, roots):
+        """Root (as given) of the longest of roots containing path | None"""
+        if path in roots:
+            return roots[path]
+        best = None
+        for root in roots:
+            if path.startswith(root.rstrip(os.sep) + os.sep) and (best is None or len(root) > len(best)):
+                best = root
+        return None if best is None else roots[best]
+
+    def _root(self, path):
+        """
+            --sum root (as given) a result record belongs to; matched by
+            absolute path, then by resolved path (a record reached through
+            a symbolic link).  UNMATCHED_ROOT when neither matches
+        """
+        root = self._match(path, self.roots)
+        if root is None:
+            root = self._match(os.path.realpath(path), self.real)
+        return UNMATCHED_ROOT if root is None else root
+
+    def render(self):
+        """Aggregates current results into exposition text"""
+        roots, exts, dirs = {}, {}, {}
+
+        for path, record in list(self.records.items()):
+            root = self._root(path)
+            lines, files, size = roots.get(root, (0, 0, 0))
+            roots[root] = (lines + record['count'], files + 1, size + record['size'])
+
+            key = (root, os.path.splitext(path)[1] or '(none)')
+            lines, files = exts.get(key, (0, 0))
+            exts[key] = (lines + record['count'], files + 1)
+
+            rel = os.path.relpath(path, os.path.abspath(root)) if os.path.isdir(root) else '.'
+            key = (root, rel.split(os.sep)[0] if os.sep in rel else '.')
+            dirs[key] = dirs.get(key, 0) + record['count']
+
+        self.updated = time.time()
+        self.updates += 1
+        duration = self.duration or float('inf')
+
+        out = []
+
+        def metric(name, kind, doc, samples):
+            out.append('# HELP {} {}'.format(name, doc))
+            out.append('# TYPE {} {}'.format(name, kind))
+            for labels, value in samples:
+                label = ','.join('{}="{}"'.format(k, _label(v)) for k, v in labels)
+                out.append('{}{} {}'.format(name, '{' + label + '}' if label else '', value))
+
+        metric('xlines_lines', 'gauge', 'Line count per root.',
+               [((('root', k),), v[0]) for k, v in sorted(roots.items())])
+        metric('xlines_files', 'gauge', 'File objects counted per root.',
+               [((('root', k),), v[1]) for k, v in sorted(roots.items())])
+        metric('xlines_bytes', 'gauge', 'Bytes of file objects counted per root.',
+               [((('root', k),), v[2]) for k, v in sorted(roots.items())])
+        metric('xlines_extension_lines', 'gauge', 'Line count per root and file extension.',
+               [((('root', k[0]), ('ext', k[1])), v[0]) for k, v in sorted(exts.items())])
+        metric('xlines_extension_files', 'gauge', 'File objects per root and file extension.',
+               [((('root', k[0]), ('ext', k[1])), v[1]) for k, v in sorted(exts.items())])
+        metric('xlines_directory_lines', 'gauge', 'Line count per root and top-level directory.',
+               [((('root', k[0]), ('directory', k[1])), v) for k, v in sorted(dirs.items())])
+        metric('xlines_scan_duration_seconds', 'gauge', 'Duration of the last full scan.',
+               [((), round(self.duration, 6))])
+        metric('xlines_scan_files_per_second', 'gauge', 'File objects counted per second in the last full scan.',
+               [((), round(self.scanned_files / duration, 3))])
+        metric('xlines_scan_bytes_per_second', 'gauge', 'Bytes counted per second in the last full scan.',
+               [((), round(self.scanned_bytes / duration, 3))])
+        metric('xlines_last_update_timestamp_seconds', 'gauge', 'Unix time results were last updated.',
+               [((), round(self.updated, 3))])
+        metric('xlines_updates_total', 'counter', 'Result updates applied since start.',
+               [((), self.updates)])
+
+        with self.lock:
+            self.text = '\n'.join(out) + '\n'
+
+    def exposition(self):
+        with self.lock:
+            return self.text
+
+    def follow(self):
+        """Keeps results current; runs until the process exits"""
+        while True:
+            if self.tracker:
+                changed = self.tracker.changes()
+                if changed is None:
+                    self.scan()
+                elif changed:
+                    self.render()
+            else:
+                time.sleep(self.refresh)
+                self.scan()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.exporter.exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info('serve_metrics: ' + format % args)
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def serve_metrics(exporter, address):
+    """
+        Serves the exporter's metrics at http://host:port/metrics until
+        interrupted; counts every root before the first request is served
+
+    Args:
+        :exporter (MetricsExporter): metrics source
+        :address (tuple): (host, port) as returned by parse_address
+
+    """
+    server = _Server(address, _Handler)
+    server.exporter = exporter
+    exporter.scan()
+    threading.Thread(target=exporter.follow, daemon=True).start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -8,13 +8,15 @@
 
 """
 import os
+import itertools
 import multiprocessing
 import inspect
 from xlines.usermessage import stdout_message
 from xlines import Colors
 from xlines.core import BUFFER, acct, bwt, text, rst, arrow, div
-from xlines.core import linecount, print_header, print_footer
+from xlines.core import count_record, deadline_approx, print_header, print_footer, watched_counts
 from xlines.export import export_json_object
+from xlines.store import ResultStore
 from xlines import local_config, logger
 from xlines.variables import *
 
@@ -60,29 +62,122 @@ def longest_path_mp(object_list):
 
 
 def mp_linecount(path_list, exclusions, no_whitespace):
-    """Multiprocessing line count"""
+    """
+        Multiprocessing line count.  Puts a result record on the queue
+        for each file object counted, else {'path': path, 'failed': True}
+        when unreadable or abandoned as stalled
+    """
+    files, listed = [], set(path_list)
     for path in path_list:
-        try:
-            if os.path.isfile(path):
+        if os.path.isfile(path):
+            files.append(path)
+        elif os.path.isdir(path):
+            files.extend(os.path.join(path, x) for x in os.listdir(path))
+
+    for path, record in watched_counts(lambda x: count_record(x, no_whitespace), files):
+        if record is None:
+            record = {'path': path, 'failed': True}
+        if path in listed:
+            record['path'] = os.path.abspath(path) if path.startswith('/') else ('./' + os.path.relpath(path))
+        q.put(record)
+
 
-                path_value = os.path.abspath(path) if path.startswith('/') else ('./' + os.path.relpath(path))
+def _count_batch(args):
+    """
+        Pool worker; args (paths, whitespace, approx, expires).  Returns
+        [(path, result record or None)]; a file object whose reads stall
+        is abandoned (None) and the batch goes on (see watched_counts).
+        Paths not started by expires are left out
+    """
+    paths, whitespace, approx, expires = args
+    return watched_counts(
+        lambda x: count_record(x, whitespace, deadline_approx(approx, expires)), paths, expires=expires
+    )
 
-                q.put(
-                        {
-                            'path': path_value,
-                            'count': linecount(path, no_whitespace)
-                        }
-                    )
 
-            elif os.path.isdir(path):
-                for p in [os.path.join(path, x) for x in os.listdir(path)]:
-                    q.put({'path': p, 'count': linecount(p, no_whitespace)})
+def mp_records(paths, whitespace=True, io_fail=None, jobs=None, approx=None, expires=None):
+    """
+        Multiprocessing line count of a stream of file objects.  Paths are
+        dispatched to the worker pool in bounded batches so that neither
+        the input stream nor the results are ever held in memory in full.
+        Workers abandon stalled file objects, which are added to io_fail
 
-        except UnicodeDecodeError:
-            continue
+    Args:
+        :paths (iter): filesystem paths of file objects
+        :whitespace (bool): when False, omit whitespace lines from count
+        :io_fail (list): when provided, collects paths which failed to count
+        :jobs (int): number of worker processes (DEFAULT: up to 4 cores)
+        :approx (int): size in bytes at or above which counts are estimated
+        :expires (float): time.monotonic() deadline; no count is started
+            after it (see iter_records)
 
+    Returns:
+        generator object yielding result records (dict)
+
+    """
+    cores = jobs or (4 if cpu_cores() >= 4 else cpu_cores())
+    batch = cores * 256
+    paths = iter(paths)
+
+    with multiprocessing.Pool(cores) as pool:
+        while True:
+            chunk = list(itertools.islice(paths, batch))
+            if not chunk:
+                break
+            tasks = [(chunk[i:i + 32], whitespace, approx, expires) for i in range(0, len(chunk), 32)]
+            for results in pool.imap_unordered(_count_batch, tasks):
+                for path, record in results:
+                    if record is not None:
+                        yield record
+                    elif io_fail is not None:
+                        io_fail.append(path)
+
+
+def format_row(path, inc, width, _ct_threshold, approx=None):
+    """
+        Formats a single path and line count as a row of the results table,
+        truncating the path to fit the width of the output pattern.  An
+        estimated count (approx: error bound in lines) is marked with '~'
+        and followed by its relative error
+
+    Returns:
+        row with color codes added, TYPE: str
 
-def print_results(object_list, _ct_threshold, width):
+    """
+    count_width = local_config['OUTPUT']['COUNT_COLUMN_WIDTH']
+    highlight = acct if inc > _ct_threshold else Colors.AQUA
+
+    # truncation
+    lpath, fname = os.path.split(path)
+
+    if (len(path) + BUFFER * 2) > width:
+        cutoff = (len(path) + BUFFER * 2) - width
+    else:
+        cutoff = 0
+
+    tab = '\t'.expandtabs(width - len(lpath) - len(fname) - count_width + BUFFER)
+    tab4 = '\t'.expandtabs(4)
+
+    # with color codes added
+    if cutoff == 0:
+        lpath = text + lpath + rst
+    else:
+        lpath = text + os.path.split(path)[0][:len(lpath) - cutoff - BUFFER] + rst + arrow
+        tab = '\t'.expandtabs(width - len(lpath) - len(fname) + count_width + BUFFER + cut_corr)
+
+    fname = highlight + fname + rst
+
+    # incremental count formatting
+    ct_format = acct if inc > _ct_threshold else bwt
+
+    if approx is not None:
+        error = ' ±{:.1%}'.format(approx / inc if inc else 0.0)
+        return f'{tab4}{lpath}{div}{fname}{tab}{ct_format}{"~{:,}".format(inc):>10}{rst}{yl}{error}{rst}'
+
+    return f'{tab4}{lpath}{div}{fname}{tab}{ct_format}{"{:,}".format(inc):>10}{rst}'
+
+
+def print_results(object_list, _ct_threshold, width, sinks=[], table=True, io_fail=None):
     """
         Outputs paths and filesystem objects to which line counts
         were calculated.  Single process operation combines output
@@ -90,7 +185,8 @@ def print_results(object_list, _ct_threshold, width):
         processed separately by each cpu core
 
     Args:
-        :object_list (list):  Format:
+        :object_list (ResultStore | list):  ResultStore, iterated in path
+            order, or a list of result records.  Format:
 
         .. code: json
 
@@ -108,56 +204,47 @@ def print_results(object_list, _ct_threshold, width):
         :_ct_threshold (int): path rec highlight color if object linecount
             is at or above this threshold
         :width (int): width in characters of the output pattern
+        :sinks (list): OutputSink objects each receiving every result record
+        :table (bool): print tabular results to stdout when True
+        :io_fail (list): paths which could not be counted
 
     Returns:
         True | False, TYPE: bool
 
     """
     tcount, tobjects = 0, 0
-    io_fail = []
+    io_fail = list(io_fail or [])
 
-    print_header(width)
-    count_width = local_config['OUTPUT']['COUNT_COLUMN_WIDTH']
+    if table:
+        print_header(width)
 
-    for object_dict in sorted(object_list, key=lambda x: x['path']):
+    if not isinstance(object_list, ResultStore):
+        object_list = sorted(object_list, key=lambda x: x['path'])
+
+    for object_dict in object_list:
 
         try:
             path = object_dict['path']
             inc = object_dict['count']
-            highlight = acct if inc > _ct_threshold else Colors.AQUA
             tcount += inc    # total line count
             tobjects += 1    # increment total number of objects
 
-            # truncation
-            lpath, fname = os.path.split(path)
-
-            if (len(path) + BUFFER * 2) > width:
-                cutoff = (len(path) + BUFFER * 2) - width
-            else:
-                cutoff = 0
+            output_str = format_row(path, inc, width, _ct_threshold)
 
-            tab = '\t'.expandtabs(width - len(lpath) - len(fname) - count_width + BUFFER)
-            tab4 = '\t'.expandtabs(4)
-
-            # with color codes added
-            if cutoff == 0:
-                lpath = text + lpath + rst
-            else:
-                lpath = text + os.path.split(path)[0][:len(lpath) - cutoff - BUFFER] + rst + arrow
-                tab = '\t'.expandtabs(width - len(lpath) - len(fname) + count_width + BUFFER + cut_corr)
+            for sink in sinks:
+                sink.write(object_dict)
 
-            fname = highlight + fname + rst
-
-            # incremental count formatting
-            ct_format = acct if inc > _ct_threshold else bwt
-
-            output_str = f'{tab4}{lpath}{div}{fname}{tab}{ct_format}{"{:,}".format(inc):>10}{rst}'
-            print(output_str)
+            if table:
+                print(output_str)
         except Exception:
             io_fail.append(path)
             continue
 
-    print_footer(tcount, tobjects, width)
+    for sink in sinks:
+        sink.close()
+
+    if table:
+        print_footer(tcount, tobjects, width, skipped=io_fail)
     return True
 
 
@@ -184,7 +271,7 @@ def get_varname(var):
     return [var_name for var_name, var_val in callers_local_vars if var_val is var]
 
 
-def multiprocessing_main(valid_paths, max_width, _threshold, wspace, exclusions, debug):
+def multiprocessing_main(valid_paths, max_width, _threshold, wspace, exclusions, debug, sinks=[], table=True):
     """
         Execute Operations using concurrency (multi-process) model
 
@@ -196,6 +283,8 @@ def multiprocessing_main(valid_paths, max_width, _threshold, wspace, exclusions,
         :wspace (bool): when True, omit whitespace lines from count (DEFAULT:  False)
         :exclusions (ex object): instance of ExcludedTypes
         :debug (boot): debug flag
+        :sinks (list): OutputSink objects fed from the same result stream
+        :table (bool): print tabular results to stdout when True
 
     """
     def debug_messages(flag, paths):
@@ -213,7 +302,7 @@ def queue_generator(q, p):
 
     global q
     q = multiprocessing.Queue()
-    processes, results = [], []
+    processes, results, io_fail = [], ResultStore(), []
     debug_messages(debug, valid_paths)
 
     # maximum cores is 4 due to i/o contention single drive systems
@@ -225,14 +314,18 @@ def queue_generator(q, p):
         processes.append(t)
         t.start()
 
-        results.extend([x for x in queue_generator(q, t)])
+        for record in queue_generator(q, t):
+            if record.get('failed'):
+                io_fail.append(record['path'])
+            else:
+                results.write(record)
 
         if debug:
             print('Completed: list {}'.format(get_varname(i)))    # show progress
 
-    print_results(results, _threshold, max_width)
+    print_results(results, _threshold, max_width, sinks, table, io_fail)
 
     if debug:
-        export_json_object(results, logging=False)
+        export_json_object(list(results), logging=False)
         stdout_message(message='Num of objects: {}'.format(len(results)))
     return 0
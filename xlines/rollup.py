@@ -0,0 +1,136 @@
+"""
+Summary.
+
+    Directory Rollup Module -- du-style line count subtotals per directory,
+    accumulated into a directory prefix tree while results stream in
+
+Module Classes:
+    :RollupNode:  subtotals for a single directory
+    :DirectoryRollup:  directory prefix tree truncated at a maximum depth
+
+Module Functions:
+    :print_rollup:  prints directory subtotals to the maximum depth
+
+"""
+import os
+from xlines.core import print_header, print_footer
+from xlines.statics import local_config
+from xlines.variables import *
+
+
+class RollupNode():
+    """Line count, object count, and byte subtotals of one directory"""
+    __slots__ = ('count', 'objects', 'size', 'children')
+
+    def __init__(self):
+        self.count = 0
+        self.objects = 0
+        self.size = 0
+        self.children = {}
+
+    def add(self, count, size, objects=1):
+        self.count += count
+        self.objects += objects
+        self.size += size
+
+
+class DirectoryRollup():
+    """
+        Directory prefix tree holding subtotals only to max_depth levels
+        beneath each root.  Counts of deeper objects accumulate into their
+        ancestor at max_depth, so memory is bounded by the number of
+        directories displayed and never by the number of files counted
+    """
+    def __init__(self, roots, max_depth, abspath=True):
+        """
+        Args:
+            :roots (list): filesystem paths supplied with --sum
+            :max_depth (int): deepest directory level retained (root is 0)
+            :abspath (bool): True if result paths are absolute
+        """
+        self.max_depth = max_depth
+        self.approx = None      # summed error bound of estimated counts
+        self.roots = []
+        for root in roots:
+            label = root if os.path.isdir(root) else (os.path.dirname(root) or '.')
+            normal = os.path.abspath(label) if abspath else os.path.normpath(os.path.relpath(label))
+            self.roots.append((label, self._split(normal), RollupNode()))
+
+    def _split(self, path):
+        if path == '.':
+            return []
+        return path.rstrip(os.sep).split(os.sep) or ['']
+
+    def write(self, record):
+        """Adds a result record to the subtotals of each ancestor directory"""
+        parts = self._split(os.path.normpath(os.path.dirname(record['path']) or '.'))
+        if 'approx' in record:
+            self.approx = (self.approx or 0) + record['approx']
+
+        for label, rparts, node in self.roots:
+            if parts[:len(rparts)] != rparts:
+                continue
+            node.add(record['count'], record['size'])
+            for name in parts[len(rparts):len(rparts) + self.max_depth]:
+                node = node.children.setdefault(name, RollupNode())
+                node.add(record['count'], record['size'])
+            return
+
+    def close(self):
+        pass
+
+    def rows(self, sort='path'):
+        """
+            Depth-first walk of the prefix tree, siblings ordered by sort key
+
+        Args:
+            :sort (str): sibling order; path, count, or size (descending)
+
+        Returns:
+            generator object yielding (directory path, RollupNode) tuples
+
+        """
+        def order(children):
+            if sort == 'path':
+                return sorted(children.items())
+            return sorted(children.items(), key=lambda x: (-getattr(x[1], sort), x[0]))
+
+        def visit(label, node):
+            yield label, node
+            for name, child in order(node.children):
+                yield from visit(os.path.join(label, name), child)
+
+        for label, _, node in self.roots:
+            yield from visit(label, node)
+
+    def totals(self):
+        """Returns cumulative (line count, object count) of all roots"""
+        return (sum(x[2].count for x in self.roots), sum(x[2].objects for x in self.roots))
+
+
+def print_rollup(rollup, width, _ct_threshold, sort='path', partial=None, skipped=None):
+    """
+        Prints directory subtotals in the style of the per-file table
+
+    Args:
+        :rollup (DirectoryRollup): populated directory prefix tree
+        :width (int): width in characters of the output pattern
+        :_ct_threshold (int): high line count highlight threshold
+        :sort (str): sibling order; path, count, or size
+        :partial (tuple): incomplete results marker (see print_footer)
+        :skipped (list): paths which could not be counted (see print_footer)
+
+    """
+    count_width = local_config['OUTPUT']['COUNT_COLUMN_WIDTH']
+    tab4 = '\t'.expandtabs(4)
+
+    print_header(width, 'directory', 'line count')
+
+    for label, node in rollup.rows(sort):
+        if len(label) > width:
+            label = label[:width - BUFFER] + '...'
+        ct_format = acct if node.count > _ct_threshold else bwt
+        tab = '\t'.expandtabs(width + count_width + 1 - len(label) - 10)
+        print(f'{tab4}{text}{label}{rst}{tab}{ct_format}{node.count:>10,}{rst}')
+
+    print_footer(*rollup.totals(), width, partial, rollup.approx, skipped)
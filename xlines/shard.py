@@ -0,0 +1,187 @@
+"""
+Summary.
+
+    Shard Module -- deterministic partition of one scan across hosts, and
+    the merge of their partial results
+
+    Every shard walks the same roots (metadata only) but counts only the
+    file objects assigned to it:  a file object belongs to shard
+    (hash of its result path mod N) + 1, so any host computes the same
+    assignment without coordination.  Ownership is decided on the raw
+    path stream of the walk, before the binary test, so a shard reads
+    only the file objects it owns.  As the walk itself is unchanged,
+    choices made by the walk (which of several links to a file object is
+    counted, exclusions) are identical on every shard, and the union of
+    the shards is exactly the result of a single-host scan.
+
+    A shard writes its result records to a partial result file, gzip
+    compressed JSON lines:  a header (shard, shard count, roots, and a
+    signature of the options which change results), one JSON array per
+    result record, and a trailer with totals written only when the scan
+    completed.  merge reads the partial files of all N shards back into
+    the result stream of the usual table, totals, and group-by reports.
+
+Module Classes:
+    :Shard:  one shard of N; selects the paths a host counts
+    :PartialResultSink:  writes the partial result file of a shard
+    :PartialResults:  validated set of partial result files to merge
+
+Module Functions:
+    :parse_shard:  parses a shard specification i/N
+
+"""
+import gzip
+import json
+import hashlib
+import inspect
+from xlines import logger
+
+
+VERSION = 1
+
+
+def parse_shard(spec):
+    """
+        Parses a shard specification such as 2/8 (shard 2 of 8)
+
+    Returns:
+        (shard index, shard count), TYPE: tuple; raises ValueError when
+        not of the form i/N with 1 <= i <= N
+
+    """
+    try:
+        index, count = (int(x) for x in spec.split('/'))
+    except ValueError:
+        raise ValueError('Invalid shard "{}". Use i/N, such as 2/8 for shard 2 of 8'.format(spec))
+    if not 1 <= index <= count:
+        raise ValueError('Invalid shard "{}". Shard index must be between 1 and the shard count'.format(spec))
+    return index, count
+
+
+class Shard():
+    """One shard of N; selects the file objects counted by this host"""
+    def __init__(self, index, count):
+        """
+        Args:
+            :index (int): shard index, 1 - count
+            :count (int): number of shards
+        """
+        self.index = index
+        self.count = count
+
+    def owns(self, path):
+        """True when the file object at result path is counted by this shard"""
+        digest = hashlib.sha1(path.encode('utf-8', 'surrogateescape')).digest()
+        return int.from_bytes(digest[:8], 'big') % self.count == self.index - 1
+
+
+class PartialResultSink():
+    """
+        Writes the result records of one shard to a partial result file.
+        Consumes the result stream alongside the other output sinks
+    """
+    def __init__(self, path, shard, signature, roots, abspath):
+        """
+        Args:
+            :path (str): partial result file
+            :shard (Shard): shard written
+            :signature (str): hash of runtime options and roots
+            :roots (list): filesystem paths as provided with --sum
+            :abspath (bool): True if result paths are absolute
+        """
+        self.path = path
+        self.stdout = False
+        self.lines = 0
+        self.objects = 0
+        self.handle = gzip.open(path, 'wt', encoding='utf-8')
+        header = {
+            'version': VERSION,
+            'shard': [shard.index, shard.count],
+            'signature': signature,
+            'roots': roots,
+            'abspath': abspath
+        }
+        self.handle.write(json.dumps(header, sort_keys=True) + '\n')
+
+    def write(self, record):
+        r = record
+        self.handle.write(json.dumps([r['path'], r['count'], r['size'], r['mtime'], r['uid'], r.get('approx')]) + '\n')
+        self.lines += r['count']
+        self.objects += 1
+
+    def close(self):
+        self.handle.write(json.dumps({'complete': True, 'lines': self.lines, 'objects': self.objects}) + '\n')
+        self.handle.close()
+        logger.info('%s: Wrote %s to local filesystem location' % (inspect.stack()[0][3], self.path))
+
+
+class PartialResults():
+    """
+        Partial result files of every shard of one scan.  Opening them
+        validates that all shards are present, once each, written with the
+        same roots and options, and complete
+    """
+    def __init__(self, paths):
+        """
+        Args:
+            :paths (list): partial result files, in any order
+        """
+        if not paths:
+            raise ValueError('merge requires the partial result files of every shard')
+
+        self.paths = {}             # shard index -> partial result file
+        headers = [self._header(x) for x in paths]
+        first = headers[0]
+        self.count = first['shard'][1]
+        self.roots = first['roots']
+        self.abspath = first['abspath']
+
+        for path, header in zip(paths, headers):
+            if header['signature'] != first['signature'] or header['shard'][1] != self.count:
+                raise ValueError('{} is a shard of another scan (other paths, options, or shard count)'.format(path))
+            index = header['shard'][0]
+            if index in self.paths:
+                raise ValueError('Shard {} given twice: {} and {}'.format(index, self.paths[index], path))
+            self.paths[index] = path
+
+        missing = [str(x) for x in range(1, self.count + 1) if x not in self.paths]
+        if missing:
+            raise ValueError('Missing partial results of shard {} of {}'.format(', '.join(missing), self.count))
+
+    def _header(self, path):
+        """Header of a partial result file; its trailer must be present"""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f1:
+                header = json.loads(f1.readline())
+                last = None
+                for last in f1:
+                    pass
+                trailer = json.loads(last) if last else None
+        except (OSError, EOFError, ValueError):
+            raise ValueError('{} is not a readable partial result file'.format(path))
+        if not isinstance(header, dict) or header.get('version') != VERSION:
+            raise ValueError('{} is not a partial result file of this version of xlines'.format(path))
+        if not (isinstance(trailer, dict) and trailer.get('complete')):
+            raise ValueError('{} is incomplete; its shard did not finish'.format(path))
+        return header
+
+    def records(self):
+        """
+            Result records of every shard, in shard order
+
+        Returns:
+            generator object yielding result records (dict)
+
+        """
+        for index in sorted(self.paths):
+            with gzip.open(self.paths[index], 'rt', encoding='utf-8') as f1:
+                f1.readline()
+                for line in f1:
+                    row = json.loads(line)
+                    if isinstance(row, dict):
+                        break
+                    path, count, size, mtime, uid, approx = row
+                    record = {'path': path, 'count': count, 'size': size, 'mtime': mtime, 'uid': uid}
+                    if approx is not None:
+                        record['approx'] = approx
+                    yield record
@@ -0,0 +1,168 @@
+"""
+Summary.
+
+    Output Sink Module -- fan out a single result stream to multiple
+    output destinations (--output FORMAT:PATH)
+
+Module Classes:
+    :OutputSink:  abstract base class; opens destination, consumes result records
+    :JsonSink:  writes all results as a single json array
+    :JsonlSink:  writes one json object per result (json lines)
+    :CsvSink:  writes path, count csv rows
+    :ExtensionSink:  writes per file extension rollup of counts
+
+Module Functions:
+    :output_spec:  validates a FORMAT:PATH specification
+    :parse_output:  creates a sink object from a FORMAT:PATH specification
+    :create_sinks:  creates sink objects for all --output specifications
+
+"""
+import sys
+import csv
+import json
+import inspect
+from abc import ABC, abstractmethod
+from xlines import logger
+from xlines.groupby import GroupBy
+
+
+class OutputSink(ABC):
+    """
+        Abstract base class for output sinks.  Each sink consumes the same
+        stream of result records ({'path': str, 'count': int}) produced by
+        one scan; subclasses implement write
+    """
+    def __init__(self, path):
+        """
+        Args:
+            :path (str): filesystem destination; '-' writes to stdout
+        """
+        self.path = path
+        self.stdout = (path == '-')
+        self.handle = sys.stdout if self.stdout else open(path, 'w')
+
+    @abstractmethod
+    def write(self, record):
+        """Consumes one result record"""
+
+    def close(self):
+        self.handle.flush()
+        if not self.stdout:
+            self.handle.close()
+            logger.info('%s: Wrote %s to local filesystem location' % (inspect.stack()[0][3], self.path))
+
+
+class JsonSink(OutputSink):
+    """Writes results as one json array, streamed element by element"""
+    def __init__(self, path):
+        super().__init__(path)
+        self.handle.write('[')
+        self.first = True
+
+    def write(self, record):
+        self.handle.write(('\n    ' if self.first else ',\n    ') + json.dumps(record, sort_keys=True))
+        self.first = False
+
+    def close(self):
+        self.handle.write('\n]\n')
+        super().close()
+
+
+class JsonlSink(OutputSink):
+    """Writes one json object per line"""
+    def write(self, record):
+        self.handle.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+class CsvSink(OutputSink):
+    """Writes path, count rows with a header row"""
+    def __init__(self, path):
+        super().__init__(path)
+        self.writer = csv.writer(self.handle)
+        self.writer.writerow(['path', 'count'])
+
+    def write(self, record):
+        self.writer.writerow([record['path'], record['count']])
+
+
+class ExtensionSink(OutputSink):
+    """Accumulates line and object totals per file extension"""
+    def __init__(self, path):
+        super().__init__(path)
+        self.totals = GroupBy('ext')
+
+    def write(self, record):
+        self.totals.write(record)
+
+    def close(self):
+        rollup = [
+            {'extension': k, 'objects': objects, 'count': count}
+            for k, objects, count in self.totals.results()
+        ]
+        self.handle.write(json.dumps(rollup, indent=4) + '\n')
+        super().close()
+
+
+sink_types = {
+    'json': JsonSink,
+    'jsonl': JsonlSink,
+    'csv': CsvSink,
+    'ext': ExtensionSink
+}
+
+
+def output_spec(spec):
+    """
+        Validates a single --output parameter without opening its destination
+
+    Args:
+        :spec (str): output specification, format FORMAT:PATH.  When
+            PATH is omitted or '-', output is written to stdout
+
+    Returns:
+        (OutputSink subclass, path), TYPE: tuple; raises ValueError if
+        FORMAT unknown
+
+    """
+    fmt, _, path = spec.partition(':')
+
+    if fmt.lower() not in sink_types:
+        raise ValueError(
+            'Unknown output format "{}". Valid formats: {}'.format(fmt, ', '.join(sink_types))
+        )
+    return sink_types[fmt.lower()], path or '-'
+
+
+def parse_output(spec):
+    """
+    Summary.
+
+        Creates an output sink from a single --output parameter
+
+    Args:
+        :spec (str): output specification (see output_spec)
+
+    Returns:
+        OutputSink instance; raises ValueError if FORMAT unknown
+
+    """
+    sink, path = output_spec(spec)
+    return sink(path)
+
+
+def create_sinks(specs):
+    """
+        Creates output sinks for every --output specification provided.
+        All specifications are validated before any destination is opened
+
+    Args:
+        :specs (list): list of FORMAT:PATH specifications
+
+    Returns:
+        sink objects, TYPE: list
+
+    """
+    parsed = [output_spec(x) for x in specs]
+    if len([x for x in parsed if x[1] == '-']) > 1:
+        raise ValueError('Only one output sink may write to stdout')
+    return [sink(path) for sink, path in parsed]
@@ -0,0 +1,163 @@
+"""
+Summary.
+
+    External Sort Module -- sorted result output under a memory cap
+
+    Result records are buffered in memory until the --memory-limit is
+    reached, then sorted and spilled to a temporary file as a sorted run.
+    Runs are compacted in tiers:  when MAX_RUNS runs of one level
+    accumulate they are merged into a single run of the next level, so
+    each record is rewritten a logarithmic number of times.  At output
+    time all runs are combined with a k-way heap merge, so only one record
+    per run is resident while sorted results are printed
+
+Module Classes:
+    :SpillSorter:  sorts a stream of result records, spilling to disk
+
+Module Functions:
+    :parse_size:  converts a size such as 512M or 2G to bytes
+
+"""
+import os
+import re
+import sys
+import heapq
+import marshal
+import tempfile
+import inspect
+from xlines import logger
+
+
+# number of runs of one level merged at once into a run of the next
+MAX_RUNS = 64
+
+
+def row_size(row):
+    """Resident bytes of a buffered row:  its list slot, the tuple, and its fields"""
+    return 8 + sys.getsizeof(row) + sum(sys.getsizeof(x) for x in row if x is not None)
+
+
+# resident bytes of one buffered row, excluding the characters of its path
+RECORD_OVERHEAD = row_size(('', 1000, 2 ** 40, 2 ** 31 + 1, 100000, None))
+
+
+def parse_size(value):
+    """
+        Converts a human readable size (512M, 2G, 1048576) to bytes
+
+    Returns:
+        size in bytes, TYPE: int; raises ValueError if not understood
+
+    """
+    units = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    m = re.match(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$', str(value), re.IGNORECASE)
+    if not m:
+        raise ValueError('Unable to parse memory size "{}"'.format(value))
+    return int(float(m.group(1)) * units[m.group(2).upper()])
+
+
+class SpillSorter():
+    """
+        Sorts result records by path (ascending) or by count or size
+        (descending), spilling sorted runs to temporary files when the
+        in-memory buffer exceeds the memory limit
+    """
+    def __init__(self, sort='path', limit=None, tmpdir=None):
+        """
+        Args:
+            :sort (str): path, count, or size
+            :limit (int): memory limit in bytes; None never spills
+            :tmpdir (str): directory for sorted runs (DEFAULT: system tmp)
+        """
+        self.sort = sort
+        self.limit = limit
+        self.tmpdir = tmpdir
+        self.buffer = []
+        self.used = 0
+        self.runs = []          # (level, sorted run file); level 0 runs are spilled buffers
+        self.total = 0
+        self.objects = 0
+        self.approx = None      # summed error bound of estimated counts
+
+    def _key(self, row):
+        # row format:  (path, count, size, mtime, uid, approx)
+        if self.sort == 'path':
+            return row[0]
+        return (-row[2 if self.sort == 'size' else 1], row[0])
+
+    def write(self, record):
+        """Buffers a result record; spills a sorted run at the memory limit"""
+        self.total += record['count']
+        self.objects += 1
+        if 'approx' in record:
+            self.approx = (self.approx or 0) + record['approx']
+        path = record['path']
+        self.buffer.append(
+            (path, record['count'], record.get('size', 0), record.get('mtime', 0), record.get('uid', 0),
+             record.get('approx'))
+        )
+        self.used += RECORD_OVERHEAD + len(path)
+
+        if self.limit is not None and self.used >= self.limit:
+            self._spill()
+
+    def _spill(self):
+        self.buffer.sort(key=self._key)
+        self.runs.append((0, self._write_run(self.buffer)))
+        self.buffer, self.used = [], 0
+
+        level = 0
+        while True:
+            tier = [path for x, path in self.runs if x == level]
+            if len(tier) < MAX_RUNS:
+                break
+            rows = heapq.merge(*[self._read_run(x) for x in tier], key=self._key)
+            self.runs = [x for x in self.runs if x[0] != level]
+            level += 1
+            self.runs.append((level, self._write_run(rows)))
+
+    def _write_run(self, rows):
+        fd, path = tempfile.mkstemp(prefix='xlines-run-', dir=self.tmpdir)
+        with os.fdopen(fd, 'wb') as f1:
+            for row in rows:
+                marshal.dump(row, f1)
+        logger.info('%s: spilled sorted run to %s' % (inspect.stack()[0][3], path))
+        return path
+
+    def _read_run(self, path):
+        """Reads one sorted run back one row at a time; removes when done"""
+        with open(path, 'rb') as f1:
+            try:
+                while True:
+                    yield marshal.load(f1)
+            except EOFError:
+                pass
+        os.remove(path)
+
+    def close(self):
+        pass
+
+    def results(self):
+        """
+            k-way merge of all sorted runs with the in-memory buffer
+
+        Returns:
+            generator object yielding result records (dict) in sort order
+
+        """
+        self.buffer.sort(key=self._key)
+        runs = [self._read_run(path) for _, path in self.runs] + [iter(self.buffer)]
+
+        for row in heapq.merge(*runs, key=self._key):
+            record = {'path': row[0], 'count': row[1], 'size': row[2], 'mtime': row[3], 'uid': row[4]}
+            if row[5] is not None:
+                record['approx'] = row[5]
+            yield record
+        self.runs = []
+
+    def __del__(self):
+        for _, path in self.runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
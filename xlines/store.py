@@ -0,0 +1,132 @@
+"""
+Summary.
+
+    Result Store Module -- compact columnar storage of line count results
+
+    Directories are interned in a prefix tree (parent id + name) so each
+    file is stored as the id of its parent directory plus its basename.
+    Line counts and file metadata are held in array-backed columns and
+    basenames in a single encoded buffer, which costs tens of bytes per
+    file instead of one dict and one absolute path string per file
+
+Module Classes:
+    :ResultStore:  columnar store of result records
+
+"""
+from array import array
+
+
+class ResultStore():
+    """
+        Columnar store of result records.  Iteration yields records in path
+        order by walking the directory prefix tree with each directory's
+        entries sorted by name; the full result set is never re-sorted
+    """
+    def __init__(self):
+        # directory prefix tree
+        self._dir_index = {}            # directory path -> dir id
+        self.dir_parent = array('i')    # parent dir id; -1 at top level
+        self.dir_name = []              # final path component
+        self.dir_children = []          # child dir ids per dir
+
+        # file columns
+        self.parent = array('i')        # parent dir id; -1 when no directory
+        self.name_offset = array('Q', [0])
+        self.names = bytearray()
+        self.count = array('q')
+        self.size = array('q')
+        self.mtime = array('q')
+        self.uid = array('I')
+        self.dir_files = {}             # dir id -> array of file indices
+
+    def __len__(self):
+        return len(self.count)
+
+    def _intern(self, dirpath):
+        """Returns dir id for a directory path, adding missing ancestors"""
+        dir_id = self._dir_index.get(dirpath)
+        if dir_id is not None:
+            return dir_id
+
+        if '/' in dirpath:
+            parent_path, _, name = dirpath.rpartition('/')
+            parent = self._intern(parent_path)
+        else:
+            parent, name = -1, dirpath
+
+        dir_id = len(self.dir_name)
+        self._dir_index[dirpath] = dir_id
+        self.dir_parent.append(parent)
+        self.dir_name.append(name)
+        self.dir_children.append([])
+        if parent >= 0:
+            self.dir_children[parent].append(dir_id)
+        return dir_id
+
+    def write(self, record):
+        """Appends a result record to the store"""
+        dirpath, sep, name = record['path'].rpartition('/')
+        parent = self._intern(dirpath) if sep else -1
+        index = len(self.count)
+
+        self.parent.append(parent)
+        self.names.extend(name.encode('utf-8', 'surrogateescape'))
+        self.name_offset.append(len(self.names))
+        self.count.append(record['count'])
+        self.size.append(record.get('size', 0))
+        self.mtime.append(record.get('mtime', 0))
+        self.uid.append(record.get('uid', 0))
+        self.dir_files.setdefault(parent, array('I')).append(index)
+
+    def close(self):
+        pass
+
+    def basename(self, index):
+        start, end = self.name_offset[index], self.name_offset[index + 1]
+        return self.names[start:end].decode('utf-8', 'surrogateescape')
+
+    def dirpath(self, dir_id):
+        """Reconstructs the full path of a directory from the prefix tree"""
+        parts = []
+        while dir_id >= 0:
+            parts.append(self.dir_name[dir_id])
+            dir_id = self.dir_parent[dir_id]
+        return '/'.join(reversed(parts))
+
+    def record(self, index, dirpath=None):
+        """Rebuilds the result record (dict) stored at index"""
+        parent = self.parent[index]
+        if dirpath is None and parent >= 0:
+            dirpath = self.dirpath(parent)
+        name = self.basename(index)
+        return {
+            'path': (dirpath + '/' + name) if parent >= 0 else name,
+            'count': self.count[index],
+            'size': self.size[index],
+            'mtime': self.mtime[index],
+            'uid': self.uid[index]
+        }
+
+    def __iter__(self):
+        """Yields result records in path order"""
+        def entries(dir_id):
+            # directories compare as 'name/' so sibling order matches
+            # the order of a sort of complete path strings
+            files = [(self.basename(i), 0, i) for i in self.dir_files.get(dir_id, ())]
+            dirs = [(self.dir_name[d] + '/', 1, d) for d in children(dir_id)]
+            return sorted(files + dirs)
+
+        def children(dir_id):
+            if dir_id < 0:
+                return [d for d in range(len(self.dir_name)) if self.dir_parent[d] < 0]
+            return self.dir_children[dir_id]
+
+        def visit(dir_id, dirpath):
+            for _, is_dir, i in entries(dir_id):
+                if is_dir:
+                    name = self.dir_name[i]
+                    yield from visit(i, name if dirpath is None else dirpath + '/' + name)
+                else:
+                    yield self.record(i, dirpath)
+
+        yield from visit(-1, None)
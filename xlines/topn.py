@@ -0,0 +1,106 @@
+"""
+Summary.
+
+    Top-N Module -- retains the N largest (or first, by path) results of a
+    streaming line count in a bounded heap while totals remain exact
+
+Module Classes:
+    :TopN:  bounded heap of result records
+
+Module Functions:
+    :print_top:  prints retained results followed by exact totals
+
+"""
+import heapq
+import itertools
+from xlines.core import print_header, print_footer
+from xlines.mp import format_row
+
+
+class _Descending():
+    """Reverses ordering of a path so the heap root is the last path"""
+    __slots__ = ('path',)
+
+    def __init__(self, path):
+        self.path = path
+
+    def __lt__(self, other):
+        return self.path > other.path
+
+    def __eq__(self, other):
+        return self.path == other.path
+
+
+class TopN():
+    """
+        Bounded heap of result records.  The heap root is always the record
+        to evict next, so each result costs O(log N) and memory is O(N)
+        regardless of the number of file objects counted.  Equal keys rank
+        by path, so results do not depend on the order records arrive
+    """
+    def __init__(self, n=None, sort='count'):
+        """
+        Args:
+            :n (int): number of results retained; None retains all
+            :sort (str): count or size (largest first), or path (first N)
+        """
+        self.n = n
+        self.sort = sort
+        self.heap = []
+        self.seq = itertools.count()
+        self.total = 0
+        self.objects = 0
+        self.approx = None      # summed error bound of estimated counts
+
+    def _key(self, record):
+        if self.sort == 'path':
+            return _Descending(record['path'])
+        return record[self.sort]
+
+    def write(self, record):
+        """Adds a result record; totals always include the record"""
+        self.total += record['count']
+        self.objects += 1
+        if 'approx' in record:
+            self.approx = (self.approx or 0) + record['approx']
+        entry = (self._key(record), _Descending(record['path']), next(self.seq), record)
+
+        if self.n is None or len(self.heap) < self.n:
+            heapq.heappush(self.heap, entry)
+        elif self.heap[0][:2] < entry[:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def close(self):
+        pass
+
+    def results(self):
+        """
+        Returns:
+            retained result records in output order, TYPE: list
+
+        """
+        if self.sort == 'path':
+            return sorted((x[3] for x in self.heap), key=lambda x: x['path'])
+        return [x[3] for x in sorted(self.heap, key=lambda x: x[:2], reverse=True)]
+
+
+def print_top(top, width, _ct_threshold, partial=None, skipped=None):
+    """
+        Prints retained results in ranked order, then the exact cumulative
+        totals of every object counted
+
+    Args:
+        :top (TopN | SpillSorter): populated results; any object providing
+            results(), total, objects, and approx
+        :width (int): width in characters of the output pattern
+        :_ct_threshold (int): high line count highlight threshold
+        :partial (tuple): incomplete results marker (see print_footer)
+        :skipped (list): paths which could not be counted (see print_footer)
+
+    """
+    print_header(width)
+
+    for record in top.results():
+        print(format_row(record['path'], record['count'], width, _ct_threshold, record.get('approx')))
+
+    print_footer(top.total, top.objects, width, partial, top.approx, skipped)
@@ -0,0 +1,400 @@
+"""
+Summary.
+
+    Watch Module -- live line count table kept current with inotify
+
+    Every directory beneath the roots is watched through the Linux inotify
+    interface (libc via ctypes).  The process blocks in select() between
+    changes, so an idle watch costs no CPU.  Events arriving in a burst
+    (an editor writing a temporary file, renaming it over the original,
+    and touching metadata) are coalesced until the tree has been quiet
+    for SETTLE seconds, then only the files named by those events are
+    recounted.  On a terminal only the rows which changed and the totals
+    are redrawn in place; the full table is drawn again when rows are
+    added or removed, the path column width changes, or the table does
+    not fit the screen
+
+Module Classes:
+    :Inotify:  minimal ctypes binding of the inotify system calls
+    :TreeWatcher:  result records kept current by inotify events
+    :WatchTable:  line count results with in-place terminal rendering
+
+Module Functions:
+    :watch:  counts, then follows changes beneath the roots until interrupted
+
+"""
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import inspect
+from xlines import logger
+from xlines.core import count_record, illegal_directories, is_legal, relpath_normalize, watched_counts
+from xlines.core import SKIPPED_SHOWN, iter_fileobjects, print_header, print_footer
+from xlines.mp import format_row
+
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+    IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+EVENT_HEADER = struct.Struct('iIII')     # wd, mask, cookie, len
+
+# seconds without events before a burst is processed
+SETTLE = 0.15
+
+# upper bound on seconds a continuous stream of events is deferred
+SETTLE_MAX = 1.0
+
+
+class Inotify():
+    """
+        Minimal binding of inotify_init1, inotify_add_watch, and
+        inotify_rm_watch; raises OSError where inotify is unavailable
+    """
+    def __init__(self):
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        except (OSError, AttributeError):
+            raise OSError('inotify is not supported on this platform')
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.watches = {}       # wd -> directory path
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            logger.info('%s: unable to watch %s: %s' % (
+                inspect.stack()[0][3], path, os.strerror(ctypes.get_errno())))
+            return None
+        self.watches[wd] = path
+        return wd
+
+    def rm_watch(self, wd):
+        self.libc.inotify_rm_watch(self.fd, wd)
+        self.watches.pop(wd, None)
+
+    def read(self, timeout=None):
+        """
+            Waits up to timeout seconds (None: indefinitely) for events
+
+        Returns:
+            [(directory path | None, mask, name)], TYPE: list
+
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+
+        buf = os.read(self.fd, 1 << 16)
+        events, offset = [], 0
+
+        while offset < len(buf):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((self.watches.get(wd), mask, name))
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+        return events
+
+    def settle(self):
+        """
+            Blocks until events arrive, then collects the rest of the burst
+
+        Returns:
+            coalesced events, TYPE: list
+
+        """
+        events = self.read()
+        deadline = time.monotonic() + SETTLE_MAX
+
+        while time.monotonic() < deadline:
+            more = self.read(SETTLE)
+            if not more:
+                break
+            events.extend(more)
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class WatchTable():
+    """
+        Current line count results keyed by absolute path, rendered as the
+        standard results table; redraws only changed rows when possible
+    """
+    def __init__(self, display, maxwidth, _ct_threshold):
+        """
+        Args:
+            :display (callable): display(abspath) -> path as printed
+            :maxwidth (MaxWidth): path column width calculator
+            :_ct_threshold (int): high line count highlight threshold
+        """
+        self.display = display
+        self.maxwidth = maxwidth
+        self._ct_threshold = _ct_threshold
+        self.records = {}
+        self.failed = set()
+        self.order = []
+        self.width = None
+        self.tty = sys.stdout.isatty()
+
+    def total(self):
+        return sum(x['count'] for x in self.records.values())
+
+    def _row(self, path):
+        return format_row(self.display(path), self.records[path]['count'], self.width, self._ct_threshold)
+
+    def _footer(self):
+        skipped = sorted(self.display(x) for x in self.failed)
+        print_footer(self.total(), len(self.records), self.width, skipped=skipped)
+        if self.tty:
+            print('    watching for changes; ctrl-c to exit', end='', flush=True)
+
+    def draw(self):
+        """Draws the complete table"""
+        self.order = sorted(self.records, key=self.display)
+        self.width = self.maxwidth.calc_maxpath([self.display(x) for x in self.order])
+
+        if self.tty:
+            sys.stdout.write('\033[H\033[2J')
+        print_header(self.width)
+        for path in self.order:
+            print(self._row(path))
+        self._footer()
+
+    def update(self, changed):
+        """
+            Redraws the rows of changed paths and the totals in place
+
+        Args:
+            :changed (set): absolute paths recounted, added, or removed
+
+        """
+        if not changed:
+            return
+
+        width = self.maxwidth.calc_maxpath([self.display(x) for x in changed if x in self.records])
+        rows = 3 + len(self.order) + 3 + (min(len(self.failed), SKIPPED_SHOWN) + 2 if self.failed else 0)
+        fits = self.tty and rows < os.get_terminal_size().lines
+
+        if not fits or width != self.width or set(self.order) != set(self.records):
+            self.draw()
+            return
+
+        index = {x: i for i, x in enumerate(self.order)}
+        for path in changed:
+            sys.stdout.write('\033[{};1H\033[2K{}'.format(4 + index[path], self._row(path)))
+        sys.stdout.write('\033[{};1H\033[J'.format(4 + len(self.order)))
+        self._footer()
+
+
+class TreeWatcher():
+    """
+        Result records of every countable file object beneath a set of
+        roots, kept current by recounting only the files named by inotify
+        events
+    """
+    def __init__(self, container, exclusions, exclude=[], whitespace=True):
+        """
+        Args:
+            :container (list): filesystem paths (files or directories)
+            :exclusions (list): file type extensions to be excluded
+            :exclude (list): path substrings to be excluded (--exclude)
+            :whitespace (bool): when False, omit whitespace lines from count
+        """
+        self.inotify = Inotify()
+        self.exclusions = exclusions
+        self.exclude = exclude
+        self.whitespace = whitespace
+        self.illegal_dirs = illegal_directories()
+        self.named = {os.path.abspath(x): x for x in container if os.path.isfile(x)}
+        self.roots = [os.path.abspath(x) for x in container if os.path.isdir(x)]
+        self.records = {}       # absolute path -> result record
+        self.failed = set()     # absolute paths which could not be counted
+
+    def watched(self, dirpath):
+        return '.git' not in dirpath and not any(x in dirpath for x in self.illegal_dirs)
+
+    def tracked(self, path):
+        return path in self.named or any(path.startswith(r.rstrip(os.sep) + os.sep) for r in self.roots)
+
+    def countable(self, path):
+        return (
+            self.tracked(path) and '.git' not in os.path.dirname(path) and
+            not any(x in path for x in self.exclude) and
+            is_legal(path, self.exclusions, self.illegal_dirs)
+        )
+
+    def _add_tree(self, top):
+        """Watches top and its subdirectories; returns files found"""
+        found = []
+        for root, dirs, files in os.walk(top):
+            dirs[:] = [d for d in dirs if self.watched(os.path.join(root, d))]
+            self.inotify.add_watch(root)
+            found.extend(os.path.join(root, f) for f in files)
+        return found
+
+    def _drop_tree(self, top):
+        prefix = top.rstrip(os.sep) + os.sep
+        for wd, path in list(self.inotify.watches.items()):
+            if path == top or path.startswith(prefix):
+                self.inotify.rm_watch(wd)
+        return [x for x in self.records if x.startswith(prefix)]
+
+    def recount(self, paths):
+        """
+        Returns:
+            paths whose result record changed, was added or removed, TYPE: set
+
+        """
+        changed, paths = set(), list(paths)
+        countable = [x for x in paths if os.path.isfile(x) and self.countable(x)]
+        counted = dict(watched_counts(lambda x: count_record(x, self.whitespace), countable))
+
+        for path in paths:
+            old = self.records.get(path)
+            new = counted.get(path)
+            if path in counted and new is None:
+                logger.info('%s: unable to count %s' % (inspect.stack()[0][3], path))
+                self.failed.add(path)
+            else:
+                self.failed.discard(path)
+            if new is None:
+                self.records.pop(path, None)
+            else:
+                self.records[path] = new
+            if new != old:
+                changed.add(path)
+        return changed
+
+    def rescan(self, records=None, io_fail=None):
+        """
+            Watches all directories beneath the roots and counts them in full
+
+        Args:
+            :records (iter): result records of absolute paths already
+                counted (DEFAULT: counted sequentially)
+            :io_fail (list): paths which records failed to count; complete
+                once records is consumed
+
+        """
+        self.records.clear()
+        self.failed.clear()
+        for wd in list(self.inotify.watches):
+            self.inotify.rm_watch(wd)
+        for root in self.roots:
+            self._add_tree(root)
+        for path in self.named:
+            self.inotify.add_watch(os.path.dirname(path))
+
+        if records is None:
+            paths = iter_fileobjects(list(self.named) + self.roots, self.exclusions, self.exclude)
+            self.recount(paths)
+        else:
+            for record in records:
+                self.records[record['path']] = record
+            self.failed.update(io_fail or [])
+
+    def changes(self):
+        """
+            Blocks until a burst of events has settled, then recounts only
+            the files affected
+
+        Returns:
+            changed paths (set) | None when the event queue overflowed
+            and every root was counted again
+
+        """
+        dirty = set()
+
+        for dirpath, mask, name in self.inotify.settle():
+            if mask & IN_Q_OVERFLOW:
+                logger.info('%s: inotify queue overflow; rescanning' % inspect.stack()[0][3])
+                self.rescan()
+                return None
+            if dirpath is None or not name:
+                continue
+
+            path = os.path.join(dirpath, name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.watched(path) and self.tracked(path):
+                    dirty.update(self._add_tree(path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    dirty.update(self._drop_tree(path))
+            else:
+                dirty.add(path)
+
+        return self.recount(dirty)
+
+    def close(self):
+        self.inotify.close()
+
+
+def watch(container, exclusions, exclude, whitespace, abspath, maxwidth, _ct_threshold, records=None, io_fail=None):
+    """
+        Counts all countable file objects beneath the roots, then keeps the
+        table current as files change until interrupted (ctrl-c)
+
+    Args:
+        :container (list): filesystem paths (files or directories)
+        :exclusions (list): file type extensions to be excluded
+        :exclude (list): path substrings to be excluded (--exclude)
+        :whitespace (bool): when False, omit whitespace lines from count
+        :abspath (bool): display absolute paths when True
+        :maxwidth (MaxWidth): path column width calculator
+        :_ct_threshold (int): high line count highlight threshold
+        :records (iter): initial result records of absolute paths
+            (DEFAULT: counted sequentially)
+        :io_fail (list): collects the paths records failed to count
+
+    """
+    tracker = TreeWatcher(container, exclusions, exclude, whitespace)
+
+    def display(path):
+        if path in tracker.named:
+            return tracker.named[path]
+        return path if abspath else relpath_normalize(os.path.relpath(path))
+
+    table = WatchTable(display, maxwidth, _ct_threshold)
+    table.records = tracker.records
+    table.failed = tracker.failed
+
+    try:
+        tracker.rescan(records, io_fail)
+        table.draw()
+
+        while True:
+            changed = tracker.changes()
+            if changed is None:
+                table.draw()
+            else:
+                table.update(changed)
+
+    except KeyboardInterrupt:
+        print()
+    finally:
+        tracker.close()